@@ -4,29 +4,43 @@ This module integrates configuration, audio, and UI components to provide
 a complete speech-to-text application with hotkey support.
 """
 
+import time
+_IMPORT_START = time.perf_counter()
+
 from pathlib import Path
 import keyboard as kb
-import pyautogui
-import time
 import traceback
 from threading import Event
-import numpy as np
 
-from config_schema import AppConfig
+from config_schema import LANGUAGES, AppConfig
+from autotune import apply_profile
 from audio import AudioConfig, AudioRecorder, Transcriber
+from pipeline import TranscriptionPipeline
+from lifecycle import ModelLifecycle
+from preprocess import TARGET_SAMPLE_RATE, prepare_audio
+from vad import VoiceActivityDetector, EnergyDetector, UtteranceSegmenter, create_detector
+from metrics import MetricsRegistry
+from output import create_text_output
 from ui import TrayIcon
+from timing import StageTimer
 from logger import setup_logging, get_logger
 
+_IMPORT_TIME = time.perf_counter() - _IMPORT_START
 logger = get_logger(__name__)
 
 class HotkeyDikte:
     """Main application class that coordinates all components."""
     def __init__(self, config_path: Path = None):
+        self.startup = StageTimer()
+        self.startup.add("imports", _IMPORT_TIME)
+
         # Load and validate configuration
         try:
-            self.config = AppConfig.load(config_path)
+            with self.startup.stage("config"):
+                self.config = AppConfig.load(config_path)
             setup_logging(self.config.log_path)
             logger.info("Configuration loaded successfully")
+            apply_profile(self.config, config_path)
         except Exception as e:
             logger.error(f"Failed to load configuration: {e}")
             raise
@@ -34,88 +48,393 @@ class HotkeyDikte:
         # Initialize components with error handling
         try:
             self.audio_config = self.config.audio
-            self.recorder = AudioRecorder(self.audio_config)
-            self.transcriber = Transcriber(
-                model_size=self.config.transcriber.model_size,
-                language=self.config.transcriber.language,
-                initial_prompt=self.config.transcriber.initial_prompt,
-                use_cuda=self.config.transcriber.use_cuda
+            with self.startup.stage("recorder"):
+                self.recorder = AudioRecorder(self.audio_config)
+            # The model itself is loaded in the background by run()
+            daemon = self.config.daemon
+            self.transcriber = Transcriber.from_config(
+                self.config.transcriber,
+                daemon_url=f"http://{daemon.host}:{daemon.port}" if daemon.client else None,
+                daemon_timeout=daemon.timeout
+            )
+            self.draft_transcriber = self._create_draft_transcriber()
+            with self.startup.stage("output"):
+                self.output = create_text_output(
+                    method=self.config.output.method,
+                    delay=self.config.output.delay,
+                    paste_hotkey=self.config.output.paste_hotkey,
+                    restore_clipboard=self.config.output.restore_clipboard,
+                    chunk_size=self.config.output.chunk_size
+                )
+            self.metrics = MetricsRegistry(
+                history_size=self.config.metrics.history_size,
+                export_path=self.config.metrics.export_path,
+                export_format=self.config.metrics.export_format
+            )
+            self.pipeline = TranscriptionPipeline(
+                self.transcriber,
+                self.type_text,
+                max_queue_size=self.config.pipeline.max_queue_size,
+                vad=self._create_vad(),
+                metrics=self.metrics,
+                max_batch_size=self.config.pipeline.max_batch_size,
+                draft_transcriber=self.draft_transcriber,
+                replace_callback=self.replace_text
+            )
+            self.lifecycle = ModelLifecycle(
+                self.transcriber,
+                idle_timeout=0.0 if daemon.client else self.config.lifecycle.idle_timeout_minutes * 60,
+                min_free_memory_mb=0.0 if daemon.client else self.config.lifecycle.min_free_memory_mb,
+                check_interval=self.config.lifecycle.check_interval,
+                is_busy=self._is_busy,
+                status_callback=lambda status: self.on_pipeline_status("idle")
             )
             logger.info("Components initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize components: {e}")
             raise
         
-        self.tray = TrayIcon(self.config.hotkeys.record_hotkey)
+        with self.startup.stage("tray"):
+            self.tray = TrayIcon(self.config.hotkeys.record_hotkey)
+            self.tray.update_status("loading")
         self.exit_event = Event()
+        self.stream_session = None
+        self.feature_stream = None
+        self.segmenter = None
         
         # Setup callbacks
         self.recorder.set_status_callback(self.tray.update_status)
+        self.pipeline.set_status_callback(self.on_pipeline_status)
+        self.tray.set_stats_provider(self.metrics.summary_lines)
+        self.tray.set_choices("language", LANGUAGES, lambda: self.transcriber.language, self.switch_language)
+        self.tray.set_choices("model", self._model_choices(), lambda: self.transcriber.model_size, self.switch_model)
         self.tray.set_exit_callback(self.stop)
         
+    def _is_busy(self) -> bool:
+        """Whether the model is needed now or any moment."""
+        return self.recorder.is_recording or self.pipeline.is_busy or self.segmenter is not None
+
+    def _create_draft_transcriber(self):
+        """Create the small model for two-pass dictation, or None if disabled."""
+        config = self.config.transcriber
+        if not config.draft_model_size:
+            return None
+        if self.config.daemon.client:
+            # The point of a daemon client is not to hold a model in memory
+            logger.info("Transcribing through a daemon, two-pass dictation disabled")
+            return None
+        return Transcriber(
+            model_size=config.draft_model_size,
+            language=config.language,
+            initial_prompt=config.initial_prompt,
+            use_cuda=config.use_cuda,
+            backend=config.backend,
+            compute_type=config.compute_type,
+            cache_dir=config.cache_dir,
+            profile="fast",
+            cpu_threads=config.cpu_threads,
+            interop_threads=config.interop_threads
+        )
+
+    def _create_vad(self):
+        """Create the voice activity detector, or None if disabled."""
+        vad_config = self.config.vad
+        if not vad_config.enabled:
+            return None
+        if vad_config.backend == "energy":
+            detector = EnergyDetector(threshold_db=vad_config.threshold_db)
+        else:
+            detector = create_detector(vad_config.backend)
+        return VoiceActivityDetector(
+            detector,
+            padding_ms=vad_config.padding_ms,
+            max_pause_ms=vad_config.max_pause_ms
+        )
+
     def on_hotkey(self) -> None:
         """Handle hotkey press event."""
         try:
+            if self.segmenter is not None:
+                logger.info("Continuous mode is active, push-to-talk is ignored")
+                return
             if self.recorder.is_recording:
                 logger.debug("Stopping recording")
                 self.recorder.stop_recording()
                 self.process_recording()
             else:
                 logger.debug("Starting recording")
+                self.lifecycle.preload()
+                self._attach_feature_stream()
                 self.recorder.start_recording()
+                if self.config.transcriber.streaming:
+                    self.stream_session = self.transcriber.start_streaming(
+                        lambda: prepare_audio(self.recorder.peek_recording(), self.audio_config.sample_rate),
+                        TARGET_SAMPLE_RATE,
+                        step=self.config.transcriber.stream_step,
+                        max_window=self.config.transcriber.stream_max_window
+                    )
         except Exception as e:
             logger.error(f"Error in hotkey handler: {e}")
             logger.debug(traceback.format_exc())
             
+    def _attach_feature_stream(self) -> None:
+        """Compute log-mel features while recording, once the model allows it.
+
+        Streaming sessions decode the audio themselves, and features are only
+        computed from audio captured at the model's 16 kHz.
+        """
+        config = self.config.transcriber
+        if (
+            self.feature_stream is not None
+            or not config.incremental_features
+            or config.streaming
+            or self.audio_config.sample_rate != TARGET_SAMPLE_RATE
+        ):
+            return
+        self.feature_stream = self.transcriber.feature_stream()
+        if self.feature_stream is not None:
+            self.recorder.set_feature_stream(self.feature_stream)
+            logger.debug("Computing log-mel features during recording")
+
+    def _model_choices(self):
+        """Model sizes offered for switching, the configured one first."""
+        config = self.config.transcriber
+        return [config.model_size] + [size for size in config.model_choices if size != config.model_size]
+
+    def switch_language(self, language: str) -> None:
+        """Transcribe in another language from the next recording on.
+
+        The prompt comes from `language_prompts`, or is the configured prompt
+        for the configured language.
+
+        Args:
+            language: Language code.
+        """
+        config = self.config.transcriber
+        prompt = config.language_prompts.get(language)
+        if prompt is None:
+            prompt = config.initial_prompt if language == config.language else ""
+        for transcriber in (self.transcriber, self.draft_transcriber):
+            if transcriber is not None:
+                transcriber.switch_language(language, prompt)
+
+    def switch_model(self, model_size: str) -> None:
+        """Transcribe with another model size from the next recording on.
+
+        Args:
+            model_size: Whisper model size name.
+        """
+        try:
+            if self.recorder.is_recording:
+                logger.info("Stop the current recording before switching models")
+                return
+            # Feature streams are tied to the mel filters of the old model
+            self.recorder.set_feature_stream(None)
+            self.feature_stream = None
+            start = time.perf_counter()
+
+            def loaded(success: bool) -> None:
+                if success:
+                    logger.info(f"Model '{model_size}' ready {time.perf_counter() - start:.2f}s after switching")
+                else:
+                    logger.error(f"Model '{model_size}' failed to load")
+                self.on_pipeline_status("idle")
+
+            self.transcriber.switch_model(model_size, loaded)
+            self.on_pipeline_status("idle")
+        except Exception as e:
+            logger.error(f"Error switching model: {e}")
+            logger.debug(traceback.format_exc())
+
+    def cycle_language(self) -> None:
+        """Switch to the next language."""
+        languages = list(LANGUAGES)
+        current = self.transcriber.language
+        index = languages.index(current) if current in languages else -1
+        self.switch_language(languages[(index + 1) % len(languages)])
+
+    def cycle_model(self) -> None:
+        """Switch to the next model size among the choices."""
+        choices = self._model_choices()
+        current = self.transcriber.model_size
+        index = choices.index(current) if current in choices else -1
+        self.switch_model(choices[(index + 1) % len(choices)])
+
+    def toggle_continuous(self) -> None:
+        """Start or stop hands-free dictation split at pauses."""
+        try:
+            if self.segmenter is not None:
+                segmenter, self.segmenter = self.segmenter, None
+                self.recorder.set_block_listener(None)
+                segmenter.stop()
+                logger.info(f"Continuous mode stopped after {segmenter.utterances} utterances")
+                self.on_pipeline_status("idle")
+                return
+            if self.recorder.is_recording:
+                logger.info("Stop the current recording before starting continuous mode")
+                return
+            self.lifecycle.preload()
+            vad_config = self.config.vad
+            self.segmenter = UtteranceSegmenter(
+                self.audio_config.sample_rate,
+                self.on_utterance,
+                threshold_db=vad_config.threshold_db,
+                padding_ms=vad_config.padding_ms,
+                end_silence_ms=vad_config.end_silence_ms,
+                max_utterance_seconds=vad_config.max_utterance_seconds
+            )
+            self.segmenter.start()
+            self.recorder.set_block_listener(self.segmenter.push)
+            logger.info("Continuous mode started, speak and pause to dictate")
+            self.on_pipeline_status("idle")
+        except Exception as e:
+            logger.error(f"Error toggling continuous mode: {e}")
+            logger.debug(traceback.format_exc())
+
+    def on_utterance(self, frames, ended_at: float) -> None:
+        """Queue an utterance cut from the live stream for transcription.
+
+        Called on the segmenter's thread, not the audio thread. The job's
+        timer starts when speech ended, so its perceived latency is the
+        end-of-utterance-to-text time.
+
+        Args:
+            frames: Utterance frames shaped (frames, channels).
+            ended_at: perf_counter() time the speech ended.
+        """
+        timings = StageTimer(started_at=ended_at)
+        timings.add("endpoint", time.perf_counter() - ended_at)
+        if self.pipeline.submit(frames, self.audio_config.sample_rate, timings=timings):
+            self.on_pipeline_status("processing")
+
     def process_recording(self) -> None:
-        """Process recorded audio and convert to text."""
+        """Hand the recorded audio to the transcription pipeline.
+
+        Returns immediately so a new recording can start while the previous
+        one is still being transcribed.
+        """
+        stream, self.stream_session = self.stream_session, None
+        if stream:
+            # The session reads the live buffer, which the next recording reuses
+            stream.stop()
+        timings = StageTimer()
         try:
-            self.tray.update_status("processing")
-            
-            if not self.recorder.audio_frames:
+            with timings.stage("capture"):
+                frames = self.recorder.get_recording()
+            with timings.stage("features"):
+                features = self.recorder.get_features()
+            if frames is None:
                 logger.warning("No audio recorded")
+                if stream:
+                    stream.cancel()
+                self.on_pipeline_status("idle")
                 return
                 
-            # Combine audio frames and transcribe
-            audio_data = np.concatenate(self.recorder.audio_frames).flatten()
-            logger.debug(f"Processing {len(audio_data)} audio samples")
+            # The detached capture buffer is a frozen snapshot for the worker,
+            # which also downmixes and resamples it
+            logger.debug(f"Submitting {len(frames)} audio frames")
             
-            text = self.transcriber.transcribe(
-                audio_data,
-                self.audio_config.sample_rate
-            )
-            
-            if text:
-                time.sleep(0.1)  # Small delay before typing
-                pyautogui.write(text)
-                logger.info(f"Transcribed text: {text}")
+            if self.pipeline.submit(frames, self.audio_config.sample_rate, stream, timings, features):
+                self.on_pipeline_status("processing")
             else:
-                logger.warning("Transcription failed or returned empty result")
-                
-            self.recorder.audio_frames.clear()
+                if stream:
+                    stream.cancel()
+                self.on_pipeline_status("idle")
             
         except Exception as e:
             logger.error(f"Error processing recording: {e}")
             logger.debug(traceback.format_exc())
-        finally:
-            self.tray.update_status("idle")
+            self.on_pipeline_status("idle")
+
+    def type_text(self, text: str) -> None:
+        """Insert transcribed text into the focused window.
+
+        Args:
+            text: Transcribed text to insert.
+        """
+        self.output.write(text)
+        logger.info(f"Transcribed text: {text}")
+
+    def replace_text(self, old: str, new: str) -> None:
+        """Replace a draft that was just inserted with the refined text.
+
+        Args:
+            old: Draft text previously inserted.
+            new: Refined text.
+        """
+        self.output.replace(old, new)
+        logger.info(f"Refined text: {new}")
+
+    def on_pipeline_status(self, status: str) -> None:
+        """Update tray status without hiding an active recording.
+
+        Args:
+            status: Pipeline status ('processing' or 'idle').
+        """
+        if self.recorder.is_recording:
+            return
+        if status == "idle" and self.pipeline.is_busy:
+            status = "processing"
+        if status == "idle" and self.transcriber.evicted:
+            status = "unloaded"
+        if status == "idle" and not self.transcriber.ready.is_set():
+            status = "loading"
+        if status == "idle" and self.segmenter is not None:
+            status = "listening"
+        self.tray.update_status(status)
+
+    def on_model_loaded(self, success: bool) -> None:
+        """Report model load timings and leave the loading state.
+
+        Args:
+            success: Whether the model loaded successfully.
+        """
+        logger.info(self.transcriber.load_timings.report("Model load"))
+        if success:
+            logger.info(f"Model ready {self.startup.elapsed:.2f}s after startup")
+        else:
+            logger.error("Model failed to load, recordings cannot be transcribed")
+        self.on_pipeline_status("idle")
             
     def run(self) -> None:
         """Start the application."""
         try:
             # Start audio stream
             logger.info("Starting audio stream...")
-            self.recorder.start_stream()
+            with self.startup.stage("audio stream"):
+                self.recorder.start_stream()
+                self.pipeline.start()
             
             # Setup UI
-            self.tray.start()
+            with self.startup.stage("tray start"):
+                self.tray.start()
             
             # Register hotkeys
-            kb.add_hotkey(self.config.hotkeys.record_hotkey, self.on_hotkey)
-            kb.add_hotkey(self.config.hotkeys.exit_hotkey, self.stop)
+            with self.startup.stage("hotkeys"):
+                kb.add_hotkey(self.config.hotkeys.record_hotkey, self.on_hotkey)
+                kb.add_hotkey(self.config.hotkeys.exit_hotkey, self.stop)
+                kb.add_hotkey(self.config.hotkeys.continuous_hotkey, self.toggle_continuous)
+                kb.add_hotkey(self.config.hotkeys.language_hotkey, self.cycle_language)
+                kb.add_hotkey(self.config.hotkeys.model_hotkey, self.cycle_model)
+
+            # Recordings made before the model is ready wait in the pipeline
+            if self.draft_transcriber:
+                # The small draft model is ready long before the main one
+                logger.info(f"Loading draft model '{self.config.transcriber.draft_model_size}' in background...")
+                self.draft_transcriber.load_async()
+            if self.config.daemon.client:
+                logger.info("Connecting to transcription daemon in background...")
+            else:
+                logger.info(f"Loading model '{self.config.transcriber.model_size}' in background...")
+            self.transcriber.load_async(self.on_model_loaded)
+            self.lifecycle.start()
+            logger.info(self.startup.report("Startup"))
             
             # Print usage instructions
             logger.info(f"PRESS {self.config.hotkeys.record_hotkey} to start/stop recording")
+            logger.info(f"PRESS {self.config.hotkeys.continuous_hotkey} to start/stop continuous dictation")
+            logger.info(f"PRESS {self.config.hotkeys.language_hotkey} to switch language")
+            logger.info(f"PRESS {self.config.hotkeys.model_hotkey} to switch model size")
             logger.info(f"PRESS {self.config.hotkeys.exit_hotkey} to exit")
             logger.info("Tips: Speak clearly and not too fast")
             logger.info("Program running...")
@@ -136,6 +455,20 @@ class HotkeyDikte:
             
     def cleanup(self) -> None:
         """Clean up resources before exit."""
+        self.recorder.set_block_listener(None)
+        segmenter, self.segmenter = self.segmenter, None
+        if segmenter is not None:
+            segmenter.stop()
+        self.recorder.set_feature_stream(None)
+        self.lifecycle.stop()
+        try:
+            self.pipeline.stop()
+        except Exception as e:
+            logger.error(f"Error stopping transcription pipeline: {e}")
+        try:
+            self.transcriber.close()
+        except Exception as e:
+            logger.error(f"Error closing transcriber: {e}")
         try:
             self.recorder.stop_stream()
             logger.info("Audio stream stopped")
@@ -1,19 +1,29 @@
 """Audio recording and transcription functionality for Hotkey Dikte application.
 
-This module handles audio recording, processing, and transcription using Whisper AI.
+This module handles audio recording and processing. The Whisper transcriber
+lives in `transcriber` and is re-exported here.
 """
 
+import time
 import sounddevice as sd
 import numpy as np
-from typing import List, Optional, Callable
+from typing import Optional, Callable
 from dataclasses import dataclass
-import whisper
-from pathlib import Path
+from threading import Event, Thread
 import traceback
+from capture import CallbackStats, CaptureBuffer
+from features import MelFeatures, MelStream
+from transcriber import Transcriber
 from logger import get_logger
 
 logger = get_logger(__name__)
 
+# Seconds between summaries of audio callback problems
+STATUS_REPORT_INTERVAL = 10.0
+
+# Recordings at least this long report their capture memory at info level
+LONG_RECORDING_SECONDS = 60.0
+
 @dataclass
 class AudioConfig:
     """Audio configuration settings."""
@@ -21,15 +31,25 @@ class AudioConfig:
     device_id: int
     channels: int = 1
     blocksize: int = 1024
+    buffer_seconds: float = 30.0
+    use_native_rate: bool = False
+    capture_dtype: str = "float32"
 
 class AudioRecorder:
     """Handles audio recording and processing."""
     def __init__(self, config: AudioConfig):
         self.config = config
-        self.audio_frames: List[np.ndarray] = []
         self.is_recording = False
+        # True while the audio callback runs, so the recording is only handed
+        # over once the callback has stopped writing to it
+        self._in_callback = False
         self.stream: Optional[sd.InputStream] = None
         self._status_callback: Optional[Callable[[str], None]] = None
+        self._block_listener: Optional[Callable[[np.ndarray], None]] = None
+        self._feature_stream: Optional[MelStream] = None
+        self.callback_stats = CallbackStats()
+        self._stop_reports = Event()
+        self._report_thread: Optional[Thread] = None
 
         # Validate audio device
         try:
@@ -46,6 +66,23 @@ class AudioRecorder:
                 logger.critical(f"No working audio device found: {e}")
                 raise
 
+        # Capture at the device's own rate to avoid resampling in the driver;
+        # the transcription pipeline resamples to 16 kHz
+        if self.config.use_native_rate:
+            try:
+                native_rate = int(sd.query_devices(self.config.device_id)['default_samplerate'])
+                if native_rate != self.config.sample_rate:
+                    logger.info(f"Capturing at native rate {native_rate} Hz")
+                    self.config.sample_rate = native_rate
+            except Exception as e:
+                logger.warning(f"Could not query native sample rate: {e}")
+
+        self.buffer = CaptureBuffer(
+            channels=self.config.channels,
+            initial_capacity=int(self.config.buffer_seconds * self.config.sample_rate),
+            dtype=self.config.capture_dtype
+        )
+
     def set_status_callback(self, callback: Callable[[str], None]) -> None:
         """Set callback for status updates.
 
@@ -59,16 +96,73 @@ class AudioRecorder:
         if self._status_callback:
             self._status_callback(status)
 
+    def set_block_listener(self, listener: Optional[Callable[[np.ndarray], None]]) -> None:
+        """Receive every input block, whether or not a recording is running.
+
+        Args:
+            listener: Called from the audio thread with each block shaped
+                (frames, channels); it must be fast and copy what it keeps.
+                None removes the listener.
+        """
+        self._block_listener = listener
+
+    def set_feature_stream(self, stream: Optional[MelStream]) -> None:
+        """Compute log-mel features of each recording while it is captured.
+
+        Args:
+            stream: Stream fed with the recorded blocks, which must be at
+                16 kHz. None stops computing features.
+        """
+        previous, self._feature_stream = self._feature_stream, stream
+        if previous is not None and previous is not stream:
+            previous.cancel()
+
     def record_callback(self, indata: np.ndarray, frames: int, time: float, status: sd.CallbackFlags) -> None:
-        """Callback for audio recording."""
+        """Callback for audio recording.
+
+        Runs on the real-time audio thread, so it takes no locks and does no
+        I/O: the buffer has a single writer, feature blocks go into a
+        preallocated ring, and problems are only counted in `callback_stats`
+        and reported from another thread.
+        """
+        self._in_callback = True
         try:
             if status:
-                logger.warning(f"Audio callback status: {status}")
+                self.callback_stats.record_status(status)
             if self.is_recording:
-                self.audio_frames.append(indata.copy())
+                self.buffer.write(indata)
+                features = self._feature_stream
+                if features is not None:
+                    features.feed(indata)
+            listener = self._block_listener
+            if listener is not None:
+                listener(indata)
         except Exception as e:
-            logger.error(f"Error in audio callback: {e}")
-            logger.debug(traceback.format_exc())
+            self.callback_stats.record_error(e)
+        finally:
+            self._in_callback = False
+
+    def report_callback_stats(self) -> None:
+        """Log audio callback problems counted since the previous report."""
+        grown = self.callback_stats.since_last_report()
+        if not grown:
+            return
+        totals = self.callback_stats.totals()
+        statuses = [
+            f"{name.replace('_', ' ')} x{count} (total {totals[name]})"
+            for name, count in grown.items() if name != "errors"
+        ]
+        if statuses:
+            logger.warning(f"Audio callback status in the last {STATUS_REPORT_INTERVAL:.0f}s: {', '.join(statuses)}")
+        if "errors" in grown:
+            error = self.callback_stats.last_error
+            logger.error(f"{grown['errors']} errors in audio callback (total {totals['errors']}), last: {error}")
+            logger.debug("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+
+    def _report_loop(self) -> None:
+        """Report audio callback problems periodically."""
+        while not self._stop_reports.wait(STATUS_REPORT_INTERVAL):
+            self.report_callback_stats()
 
     def start_stream(self) -> None:
         """Start the audio input stream."""
@@ -78,9 +172,13 @@ class AudioRecorder:
                 samplerate=self.config.sample_rate,
                 channels=self.config.channels,
                 callback=self.record_callback,
-                blocksize=self.config.blocksize
+                blocksize=self.config.blocksize,
+                dtype=self.config.capture_dtype
             )
             self.stream.start()
+            self._stop_reports.clear()
+            self._report_thread = Thread(target=self._report_loop, name="audio-status", daemon=True)
+            self._report_thread.start()
             logger.info("Audio stream started successfully")
         except Exception as e:
             logger.error(f"Failed to start audio stream: {e}")
@@ -95,71 +193,77 @@ class AudioRecorder:
                 self.stream.close()
                 self.stream = None
                 logger.info("Audio stream stopped and closed")
+                self._stop_reports.set()
+                if self._report_thread:
+                    self._report_thread.join(5)
+                    self._report_thread = None
+                self.report_callback_stats()
+                totals = {name: count for name, count in self.callback_stats.totals().items() if count}
+                if totals:
+                    summary = ", ".join(f"{name.replace('_', ' ')} {count}" for name, count in totals.items())
+                    logger.info(f"Audio callback problems during the session: {summary}")
             except Exception as e:
                 logger.error(f"Error stopping audio stream: {e}")
                 logger.debug(traceback.format_exc())
 
     def start_recording(self) -> None:
         """Start recording audio."""
+        # The callback does not touch the buffer until is_recording is set
+        self.buffer.reset()
+        if self._feature_stream is not None:
+            self._feature_stream.start(self.config.channels, self.config.capture_dtype)
         self.is_recording = True
-        self.audio_frames.clear()
         self._update_status("recording")
         logger.debug("Started recording")
 
     def stop_recording(self) -> None:
-        """Stop recording audio."""
+        """Stop recording audio.
+
+        Waits for a callback that is still writing the last block, so the
+        recording can be handed over without a lock.
+        """
         self.is_recording = False
+        deadline = time.monotonic() + 1.0
+        while self._in_callback and time.monotonic() < deadline:
+            time.sleep(0.001)
         logger.debug("Stopped recording")
 
-class Transcriber:
-    """Handles audio transcription using Whisper AI."""
-    def __init__(self, model_size: str, language: str, initial_prompt: str, use_cuda: bool = True):
-        try:
-            import torch
-            device = "cuda" if use_cuda and torch.cuda.is_available() else "cpu"
-            if device == "cpu" and use_cuda:
-                logger.warning("CUDA requested but not available, falling back to CPU")
-            self.model = whisper.load_model(model_size, device=device)
-            logger.info(f"Loaded Whisper model '{model_size}' on {device}")
-        except Exception as e:
-            logger.error(f"Failed to initialize Whisper model: {e}")
-            logger.debug(traceback.format_exc())
-            raise
-            
-        self.language = language
-        self.initial_prompt = initial_prompt
+    def peek_recording(self) -> np.ndarray:
+        """Return a zero-copy view of the frames recorded so far.
 
-    def transcribe(self, audio_data: np.ndarray, sample_rate: int) -> Optional[str]:
-        """Transcribe audio data to text.
+        Only valid while a recording is running. Once it stops, the buffer is
+        handed over and reset, so a view taken later may be empty or hold
+        frames of the next recording.
 
-        Args:
-            audio_data: Audio data as numpy array.
-            sample_rate: Sample rate of the audio.
+        Returns:
+            Recorded frames shaped (frames, channels).
+        """
+        return self.buffer.view()
+
+    def get_recording(self) -> Optional[np.ndarray]:
+        """Take the frames of the last recording without copying them.
+
+        Frames keep the capture dtype; the pipeline converts them to float32
+        once before transcription.
 
         Returns:
-            Transcribed text if successful, None otherwise.
+            Recorded frames shaped (frames, channels), or None if empty.
         """
-        try:
-            duration = len(audio_data) / sample_rate
-            logger.debug(f"Processing audio: {duration:.2f} seconds")
-
-            if duration < 0.5:
-                logger.warning("Audio too short for transcription")
-                return None
-
-            result = self.model.transcribe(
-                audio_data,
-                language=self.language,
-                task="transcribe",
-                initial_prompt=self.initial_prompt,
-                fp16=True
-            )
+        stats = self.buffer.stats()
+        frames = self.buffer.detach()
+        seconds = stats['frames'] / self.config.sample_rate
+        log = logger.info if seconds >= LONG_RECORDING_SECONDS else logger.debug
+        log(
+            f"Captured {seconds:.1f}s ({stats['frames']} {self.buffer.dtype} frames) with "
+            f"{stats['allocations']} buffer allocations, peak {stats['peak_bytes'] / 1e6:.1f} MB"
+        )
+        return frames if len(frames) else None
 
-            text = result["text"].strip()
-            logger.debug(f"Transcription completed: {len(text)} characters")
-            return text
+    def get_features(self) -> Optional[MelFeatures]:
+        """Take the log-mel frames computed during the last recording.
 
-        except Exception as e:
-            logger.error(f"Transcription error: {e}")
-            logger.debug(traceback.format_exc())
-            return None
\ No newline at end of file
+        Returns:
+            The recording's frames, or None if no feature stream is set.
+        """
+        stream = self._feature_stream
+        return stream.finish() if stream is not None else None
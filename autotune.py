@@ -0,0 +1,319 @@
+"""CPU execution autotuner for Hotkey Dikte application.
+
+This module times `Transcriber.transcribe` on a reference clip for every
+combination of intra-op and inter-op thread counts, backends and compute
+types, and stores the fastest combination as this machine's profile in
+`cpu_profile.json` next to the configuration file. `HotkeyDikte` applies the
+profile at startup.
+
+Each candidate runs in a fresh worker process, because torch only sizes its
+inter-op thread pool once per process. By default one core is left free for
+the audio callback, keyboard hook and tray icon.
+
+Usage:
+    python autotune.py reference.wav --config config.json
+    python autotune.py reference.wav --backends whisper,faster-whisper --compute-types int8,float32
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+PROFILE_NAME = "cpu_profile.json"
+
+# TranscriberConfig fields set by a profile
+PROFILE_SETTINGS = ("backend", "compute_type", "cpu_threads", "interop_threads")
+
+def machine_id() -> str:
+    """Identify this machine by host name, architecture and core count."""
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count()}"
+
+def profile_path(config_path: Optional[Path] = None) -> Path:
+    """Location of the profile file for a configuration file.
+
+    Without a configuration file the profile lives in the working directory,
+    next to the default `config.json`.
+    """
+    return (Path(config_path).parent if config_path else Path.cwd()) / PROFILE_NAME
+
+def thread_candidates(reserve: int = 1) -> List[int]:
+    """Intra-op thread counts worth trying on this machine.
+
+    Powers of two up to the usable cores, plus the usable core count itself.
+
+    Args:
+        reserve: Cores left free for the rest of the application.
+    """
+    usable = max(1, (os.cpu_count() or 1) - reserve)
+    counts = {usable}
+    count = 1
+    while count < usable:
+        counts.add(count)
+        count *= 2
+    return sorted(counts)
+
+@dataclass
+class CpuProfile:
+    """Fastest execution settings measured on one machine.
+
+    Args:
+        model_size: Model size the settings were measured with.
+        backend: Inference backend name.
+        compute_type: Numeric precision.
+        cpu_threads: Intra-op thread count.
+        interop_threads: Inter-op thread count.
+        latency: Median transcription time of the reference clip.
+        device: Device the model ran on.
+        machine: `machine_id()` of the measuring machine.
+        created: UTC time of the measurement.
+        trials: Every candidate's settings and median latency.
+    """
+    model_size: str
+    backend: str
+    compute_type: str
+    cpu_threads: int
+    interop_threads: int
+    latency: float
+    device: str = "cpu"
+    machine: str = field(default_factory=machine_id)
+    created: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    trials: List[Dict[str, Any]] = field(default_factory=list)
+
+    def settings(self) -> Dict[str, Any]:
+        """Return the transcriber settings of the profile."""
+        return {name: getattr(self, name) for name in PROFILE_SETTINGS}
+
+    def save(self, path: Path) -> None:
+        """Store the profile under its machine, keeping other machines' profiles.
+
+        Args:
+            path: Profile file, usually from `profile_path`.
+        """
+        profiles = _read_profiles(path)
+        profiles[self.machine] = asdict(self)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"machines": profiles}, indent=2), encoding="utf-8")
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, machine: Optional[str] = None) -> Optional['CpuProfile']:
+        """Read a machine's profile.
+
+        Args:
+            path: Profile file.
+            machine: Machine to look up, this machine by default.
+
+        Returns:
+            The profile, or None if the file has none for the machine.
+        """
+        data = _read_profiles(path).get(machine or machine_id())
+        if data is None:
+            return None
+        try:
+            return cls(**data)
+        except TypeError as e:
+            logger.warning(f"Ignoring malformed CPU profile in {path}: {e}")
+            return None
+
+def _read_profiles(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Read all machines' profiles from a profile file, if it exists."""
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("machines", {})
+    except (OSError, ValueError, AttributeError) as e:
+        logger.warning(f"Ignoring unreadable CPU profile {path}: {e}")
+        return {}
+
+def apply_profile(config, config_path: Optional[Path] = None) -> Optional[CpuProfile]:
+    """Apply this machine's profile to the transcriber settings.
+
+    The profile is skipped if it was measured with another model size.
+
+    Args:
+        config: AppConfig instance, updated in place.
+        config_path: Configuration file the profile is stored next to.
+
+    Returns:
+        The applied profile, or None if none applies.
+    """
+    path = profile_path(config_path)
+    profile = CpuProfile.load(path)
+    if profile is None:
+        return None
+    if profile.model_size != config.transcriber.model_size:
+        logger.info(
+            f"CPU profile in {path} was tuned for model '{profile.model_size}', "
+            f"not '{config.transcriber.model_size}'; run autotune.py again to use one"
+        )
+        return None
+    for name, value in profile.settings().items():
+        setattr(config.transcriber, name, value)
+    logger.info(
+        f"Applied CPU profile from {profile.created}: {profile.backend} ({profile.compute_type}), "
+        f"{profile.cpu_threads} intra-op and {profile.interop_threads} inter-op threads"
+    )
+    return profile
+
+def time_candidate(clip, settings: Dict[str, Any], candidate: Dict[str, Any], repeats: int = 3) -> Dict[str, Any]:
+    """Time a candidate in a fresh worker process.
+
+    Args:
+        clip: 16 kHz mono float32 reference audio.
+        settings: Transcriber keyword arguments shared by all candidates.
+        candidate: Backend, compute type and thread counts to try.
+        repeats: Timed transcriptions after one untimed warmup.
+
+    Returns:
+        Candidate settings with the median latency, the device and compute
+        type actually used, or the error.
+    """
+    from preprocess import TARGET_SAMPLE_RATE
+    from transcriber import Transcriber
+
+    trial = dict(candidate)
+    transcriber = Transcriber(**settings, **candidate, out_of_process=True)
+    try:
+        transcriber.load()
+        latencies = []
+        for attempt in range(repeats + 1):
+            start = time.perf_counter()
+            # transcribe() reports decode failures as None, not as exceptions
+            if transcriber.transcribe(clip, TARGET_SAMPLE_RATE) is None:
+                raise RuntimeError("transcription failed, see the log")
+            if attempt:
+                latencies.append(time.perf_counter() - start)
+        trial["latency"] = round(statistics.median(latencies), 4)
+        trial["device"] = transcriber.backend.device
+        trial["resolved_compute_type"] = transcriber.backend.compute_type
+    except Exception as e:
+        trial["error"] = str(e)
+    finally:
+        transcriber.close()
+    return trial
+
+def autotune(
+    clip,
+    settings: Dict[str, Any],
+    backends: List[str],
+    compute_types: List[str],
+    cpu_threads: Optional[List[int]] = None,
+    interop_threads: Optional[List[int]] = None,
+    repeats: int = 3
+) -> Optional[CpuProfile]:
+    """Find the fastest execution settings for a reference clip.
+
+    Args:
+        clip: 16 kHz mono float32 reference audio.
+        settings: Transcriber keyword arguments other than the tuned ones.
+        backends: Backends to try.
+        compute_types: Compute types to try.
+        cpu_threads: Intra-op thread counts, `thread_candidates()` by default.
+        interop_threads: Inter-op thread counts, 1 and 2 by default. Only
+            the whisper backend has an inter-op pool.
+        repeats: Timed transcriptions per candidate.
+
+    Returns:
+        Profile of the fastest candidate, or None if every candidate failed.
+    """
+    cpu_threads = cpu_threads or thread_candidates()
+    interop_threads = interop_threads or [1, 2]
+    trials = []
+    for backend, compute_type, threads in itertools.product(backends, compute_types, cpu_threads):
+        for interop in (interop_threads if backend == "whisper" else interop_threads[:1]):
+            candidate = {
+                "backend": backend,
+                "compute_type": compute_type,
+                "cpu_threads": threads,
+                "interop_threads": interop
+            }
+            trial = time_candidate(clip, settings, candidate, repeats)
+            trials.append(trial)
+            if "error" in trial:
+                logger.error(f"Candidate {candidate} failed: {trial['error']}")
+            else:
+                logger.info(f"Candidate {candidate}: {trial['latency']:.3f}s")
+
+    timed = [trial for trial in trials if "error" not in trial]
+    if not timed:
+        return None
+    best = min(timed, key=lambda trial: trial["latency"])
+    return CpuProfile(
+        model_size=settings["model_size"],
+        backend=best["backend"],
+        compute_type=best["compute_type"],
+        cpu_threads=best["cpu_threads"],
+        interop_threads=best["interop_threads"],
+        latency=best["latency"],
+        device=best["device"],
+        trials=trials
+    )
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def main(argv=None) -> int:
+    """Command line entry point."""
+    from config_schema import AppConfig
+    from evaluation import load_wav
+    from preprocess import prepare_audio
+
+    parser = argparse.ArgumentParser(description="Find the fastest CPU settings for this machine")
+    parser.add_argument("clip", type=Path, help="Reference WAV clip, a typical dictation")
+    parser.add_argument("--config", type=Path, help="Configuration file; the profile is saved next to it")
+    parser.add_argument("--backends", type=_split, help="Backends to try (default: the configured one)")
+    parser.add_argument("--compute-types", type=_split, help="Compute types to try (default: the configured one)")
+    parser.add_argument("--threads", type=lambda v: [int(n) for n in _split(v)], help="Intra-op thread counts")
+    parser.add_argument("--interop-threads", type=lambda v: [int(n) for n in _split(v)], default=[1, 2])
+    parser.add_argument("--reserve-cores", type=int, default=1, help="Cores left free for audio and hotkeys")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    config = AppConfig.load(args.config)
+    setup_logging(config.log_path)
+    audio, sample_rate = load_wav(args.clip)
+    clip = prepare_audio(audio, sample_rate)
+    transcriber = config.transcriber
+    settings = {
+        "model_size": transcriber.model_size,
+        "language": transcriber.language,
+        "initial_prompt": transcriber.initial_prompt,
+        "use_cuda": transcriber.use_cuda,
+        "cache_dir": transcriber.cache_dir,
+        "profile": transcriber.decoding_profile
+    }
+    profile = autotune(
+        clip,
+        settings,
+        args.backends or [transcriber.backend],
+        args.compute_types or [transcriber.compute_type],
+        args.threads or thread_candidates(args.reserve_cores),
+        args.interop_threads,
+        args.repeats
+    )
+    if profile is None:
+        logger.error("Every candidate failed, no profile saved")
+        return 1
+    path = profile_path(args.config)
+    profile.save(path)
+    logger.info(
+        f"Fastest: {profile.backend} ({profile.compute_type}), {profile.cpu_threads} intra-op and "
+        f"{profile.interop_threads} inter-op threads, {profile.latency:.3f}s; saved to {path}"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
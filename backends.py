@@ -0,0 +1,698 @@
+"""Inference backends for Hotkey Dikte application.
+
+This module defines the engine interface behind `audio.Transcriber` and its
+implementations: the PyTorch `openai-whisper` engine and a CTranslate2
+`faster-whisper` engine for CPU machines. Every backend returns results in the
+same normalized form so engines can be compared directly.
+"""
+
+import gc
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Type
+
+import numpy as np
+
+import timing
+from features import log_mel_spectrogram
+from streaming import Word
+from timing import StageTimer
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "hotkey-dikte"
+
+@dataclass
+class Segment:
+    """A decoded segment with its quality indicators."""
+    start: float
+    end: float
+    text: str
+    avg_logprob: float = 0.0
+    no_speech_prob: float = 0.0
+    compression_ratio: float = 0.0
+    words: List[Word] = field(default_factory=list)
+    seek: int = 0
+    temperature: float = 0.0
+
+@dataclass
+class TranscriptionResult:
+    """Backend-independent transcription result."""
+    text: str
+    segments: List[Segment] = field(default_factory=list)
+    language: Optional[str] = None
+
+    @property
+    def words(self) -> List[Word]:
+        """All words of all segments, when word timestamps were requested."""
+        return [word for segment in self.segments for word in segment.words]
+
+class InferenceBackend:
+    """Base class for speech recognition engines.
+
+    Args:
+        model_size: Whisper model size name.
+        use_cuda: Use the GPU when available.
+        compute_type: Numeric precision, or 'auto' to pick per device.
+        cache_dir: Directory for converted model files.
+        cpu_threads: Threads used inside one CPU operation, 0 for the
+            engine's default.
+        interop_threads: Threads running independent CPU operations in
+            parallel, 0 for the engine's default.
+    """
+    name = ""
+
+    def __init__(
+        self,
+        model_size: str,
+        use_cuda: bool = True,
+        compute_type: str = "auto",
+        cache_dir: Optional[Path] = None,
+        cpu_threads: int = 0,
+        interop_threads: int = 0
+    ):
+        self.model_size = model_size
+        self.use_cuda = use_cuda
+        self.compute_type = compute_type
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cpu_threads = cpu_threads
+        self.interop_threads = interop_threads
+        self.device = "cpu"
+
+    def load(self, timer: StageTimer) -> None:
+        """Import the engine and load the model.
+
+        Args:
+            timer: Timer recording the load stages.
+        """
+        raise NotImplementedError
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        language: str,
+        initial_prompt: Optional[str],
+        word_timestamps: bool = False,
+        **options
+    ) -> TranscriptionResult:
+        """Transcribe 16 kHz mono float32 audio.
+
+        Args:
+            audio: Audio data as numpy array.
+            language: Language code.
+            initial_prompt: Text to condition the first window on.
+            word_timestamps: Include per-word times in the segments.
+            **options: Extra engine-specific decoding options.
+
+        Returns:
+            Normalized transcription result.
+        """
+        raise NotImplementedError
+
+    def transcribe_batch(
+        self,
+        audios: List[np.ndarray],
+        language: str,
+        initial_prompt: Optional[str],
+        **options
+    ) -> List[TranscriptionResult]:
+        """Transcribe several clips, batched where the engine supports it.
+
+        The default implementation transcribes the clips one by one.
+
+        Args:
+            audios: 16 kHz mono float32 clips.
+            language: Language code.
+            initial_prompt: Text to condition every clip on.
+            **options: Extra engine-specific decoding options.
+
+        Returns:
+            One result per clip, in input order.
+        """
+        return [self.transcribe(audio, language, initial_prompt, **options) for audio in audios]
+
+    def mel_filters(self) -> Optional[np.ndarray]:
+        """Mel filter bank of the loaded model, for features computed outside it.
+
+        Returns:
+            Filters shaped (n_mels, 201), or None if the engine only accepts
+            audio.
+        """
+        return None
+
+    def transcribe_features(
+        self,
+        features: np.ndarray,
+        duration: float,
+        language: str,
+        initial_prompt: Optional[str],
+        **options
+    ) -> TranscriptionResult:
+        """Transcribe a clip of up to 30 seconds from its log-mel features.
+
+        Only called on backends whose `mel_filters` is not None.
+
+        Args:
+            features: Normalized log-mel features shaped (n_mels, frames).
+            duration: Clip length in seconds.
+            language: Language code.
+            initial_prompt: Text to condition the clip on.
+            **options: Extra engine-specific decoding options.
+
+        Returns:
+            Normalized transcription result.
+        """
+        raise NotImplementedError
+
+    def transcribe_short(
+        self,
+        audio: np.ndarray,
+        features: Optional[np.ndarray],
+        margin: float,
+        language: str,
+        initial_prompt: Optional[str],
+        **options
+    ) -> Optional[TranscriptionResult]:
+        """Transcribe a clip of up to 30 seconds with an encoder context sized to it.
+
+        The default implementation declines, so the clip is transcribed with
+        the full 30-second context.
+
+        Args:
+            audio: 16 kHz mono float32 audio.
+            features: Log-mel features of the audio computed in advance, or
+                None.
+            margin: Seconds of padding kept after the audio.
+            language: Language code.
+            initial_prompt: Text to condition the clip on.
+            **options: Extra engine-specific decoding options.
+
+        Returns:
+            Normalized transcription result, or None if the engine cannot
+            shorten its context or the result failed the quality checks.
+        """
+        return None
+
+    def unload(self) -> None:
+        """Free the model's memory; `load` brings it back.
+
+        The default implementation releases what `close` releases.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """Release resources held outside the Python heap, if any."""
+
+    def _cuda_available(self) -> bool:
+        """Whether CUDA was requested and is usable."""
+        if not self.use_cuda:
+            return False
+        try:
+            import torch
+            available = torch.cuda.is_available()
+        except ImportError:
+            available = False
+        if not available:
+            logger.warning("CUDA requested but not available, falling back to CPU")
+        return available
+
+class WhisperBackend(InferenceBackend):
+    """PyTorch engine from the `openai-whisper` package.
+
+    On CUDA the model runs in float16. On CPU the Linear layers are
+    dynamically quantized to int8 by default, and the quantized model is
+    cached in `cache_dir` so later starts skip loading fp32 weights and
+    quantizing.
+    """
+    name = "whisper"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model = None
+
+    def _resolve_precision(self) -> str:
+        """Pick 'float16', 'float32' or 'int8' for the current device."""
+        requested = self.compute_type
+        if self.device == "cuda":
+            if requested in ("int8", "int8_float16", "int16"):
+                logger.warning(f"Compute type '{requested}' is CPU-only for whisper, using float16")
+                return "float16"
+            return "float32" if requested == "float32" else "float16"
+        if requested in ("auto", "int8", "int8_float16"):
+            return "int8"
+        if requested != "float32":
+            logger.warning(f"Compute type '{requested}' is not supported on CPU, using float32")
+        return "float32"
+
+    def load(self, timer: StageTimer) -> None:
+        with timer.stage("import torch"):
+            import torch
+        with timer.stage("import whisper"):
+            import whisper
+        self.device = "cuda" if self._cuda_available() else "cpu"
+        self.compute_type = self._resolve_precision()
+        self._set_threads(torch)
+
+        if self.compute_type == "int8":
+            self.model = self._load_quantized(timer, torch, whisper)
+        else:
+            with timer.stage("load model"):
+                self.model = whisper.load_model(self.model_size, device=self.device)
+        # Hooks hold closures, so they are added after the model was cached
+        install_timing_hooks(self.model, sync_cuda=self.device == "cuda")
+        logger.info(f"Loaded Whisper model '{self.model_size}' on {self.device} ({self.compute_type})")
+
+    def _set_threads(self, torch) -> None:
+        """Apply the configured CPU thread counts to torch.
+
+        They are process-wide, and the inter-op pool can only be sized before
+        torch first uses it, so a second model in the same process keeps
+        the first one's setting.
+        """
+        if self.cpu_threads:
+            torch.set_num_threads(self.cpu_threads)
+        if self.interop_threads and torch.get_num_interop_threads() != self.interop_threads:
+            try:
+                torch.set_num_interop_threads(self.interop_threads)
+            except RuntimeError as e:
+                logger.warning(f"Could not set torch inter-op threads to {self.interop_threads}: {e}")
+        logger.debug(
+            f"torch uses {torch.get_num_threads()} intra-op and {torch.get_num_interop_threads()} inter-op threads"
+        )
+
+    def unload(self) -> None:
+        import torch
+
+        self.model = None
+        gc.collect()
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+
+    def _quantized_cache_path(self, torch, whisper) -> Path:
+        """Cache file name tied to the model and library versions."""
+        whisper_version = getattr(whisper, "__version__", "unknown")
+        return self.cache_dir / f"whisper-{self.model_size}-int8-w{whisper_version}-t{torch.__version__}.pt"
+
+    def _load_quantized(self, timer: StageTimer, torch, whisper):
+        """Load the int8 model from cache, or quantize and cache it."""
+        cache_path = self._quantized_cache_path(torch, whisper)
+        if cache_path.exists():
+            try:
+                with timer.stage("load cached int8 model"):
+                    model = torch.load(cache_path, map_location="cpu", weights_only=False)
+                model.eval()
+                return model
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable quantized model cache {cache_path}: {e}")
+
+        with timer.stage("load model"):
+            model = whisper.load_model(self.model_size, device="cpu")
+        with timer.stage("quantize"):
+            model = quantize_linear_layers(model, torch, whisper)
+        with timer.stage("save int8 cache"):
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_path.with_suffix(".tmp")
+                torch.save(model, tmp_path)
+                tmp_path.replace(cache_path)
+                logger.info(f"Cached quantized model at {cache_path}")
+            except Exception as e:
+                logger.warning(f"Could not cache quantized model: {e}")
+        return model
+
+    def transcribe(self, audio, language, initial_prompt, word_timestamps=False, **options):
+        result = self.model.transcribe(
+            audio,
+            language=language,
+            task="transcribe",
+            initial_prompt=initial_prompt,
+            word_timestamps=word_timestamps,
+            fp16=self.compute_type == "float16",
+            **options
+        )
+        segments = [
+            Segment(
+                start=segment["start"],
+                end=segment["end"],
+                text=segment["text"],
+                avg_logprob=segment.get("avg_logprob", 0.0),
+                no_speech_prob=segment.get("no_speech_prob", 0.0),
+                compression_ratio=segment.get("compression_ratio", 0.0),
+                words=[Word(w["word"], w["start"], w["end"]) for w in segment.get("words", [])],
+                seek=segment.get("seek", 0),
+                temperature=segment.get("temperature", 0.0)
+            )
+            for segment in result["segments"]
+        ]
+        return TranscriptionResult(result["text"].strip(), segments, result.get("language"))
+
+    def mel_filters(self) -> Optional[np.ndarray]:
+        from whisper.audio import mel_filters
+        return mel_filters("cpu", self.model.dims.n_mels).numpy()
+
+    def _decode(self, mel, language, initial_prompt, temperature, options):
+        """Decode a batch of 30-second log-mel windows at one temperature."""
+        import whisper
+
+        fp16 = self.compute_type == "float16"
+        mel = mel.to(self.model.device)
+        if fp16:
+            mel = mel.half()
+        decode_options = whisper.DecodingOptions(
+            task="transcribe",
+            language=language,
+            temperature=temperature,
+            beam_size=options.get("beam_size") if temperature == 0 else None,
+            best_of=options.get("best_of") if temperature > 0 else None,
+            prompt=initial_prompt or None,
+            without_timestamps=True,
+            fp16=fp16
+        )
+        return whisper.decode(self.model, mel, decode_options)
+
+    @staticmethod
+    def _verdict(result, options) -> str:
+        """Judge a decoded window like whisper.transcribe does.
+
+        Returns:
+            'silent' for a window without speech, 'retry' if it fails the
+            fallback thresholds, 'ok' otherwise.
+        """
+        compression_threshold = options.get("compression_ratio_threshold")
+        logprob_threshold = options.get("logprob_threshold")
+        no_speech_threshold = options.get("no_speech_threshold")
+        low_logprob = logprob_threshold is not None and result.avg_logprob < logprob_threshold
+        if no_speech_threshold is not None and result.no_speech_prob > no_speech_threshold and low_logprob:
+            return "silent"
+        repetitive = compression_threshold is not None and result.compression_ratio > compression_threshold
+        return "retry" if repetitive or low_logprob else "ok"
+
+    @staticmethod
+    def _window_result(result, duration: float, language: str) -> TranscriptionResult:
+        """Wrap a decoded window as a one-segment result."""
+        segment = Segment(
+            start=0.0,
+            end=duration,
+            text=result.text,
+            avg_logprob=result.avg_logprob,
+            no_speech_prob=result.no_speech_prob,
+            compression_ratio=result.compression_ratio,
+            temperature=result.temperature
+        )
+        return TranscriptionResult(result.text.strip(), [segment], language)
+
+    @staticmethod
+    def _ladder(options) -> List[float]:
+        """Fallback temperatures of the decoding options as a list."""
+        temperatures = options.get("temperature", 0.0)
+        return list(temperatures) if isinstance(temperatures, (list, tuple)) else [temperatures]
+
+    def transcribe_features(self, features, duration, language, initial_prompt, **options):
+        """Decode one window from precomputed features, walking the fallback ladder."""
+        import torch
+        import whisper
+        from whisper.audio import N_FRAMES
+
+        mel = whisper.pad_or_trim(torch.from_numpy(features), N_FRAMES).unsqueeze(0)
+        for temperature in self._ladder(options):
+            result = self._decode(mel, language, initial_prompt, temperature, options)[0]
+            verdict = self._verdict(result, options)
+            if verdict == "silent":
+                return TranscriptionResult("", [], language)
+            if verdict == "ok":
+                break
+        return self._window_result(result, duration, language)
+
+    @contextmanager
+    def _audio_context(self, n_ctx: int) -> Iterator[None]:
+        """Let the encoder accept `n_ctx` positions instead of the full window.
+
+        The encoder adds its sinusoidal position embedding to the input and
+        rejects any other length, so the embedding is cut to the first
+        `n_ctx` positions for the duration of the block.
+        """
+        encoder = self.model.encoder
+        full = encoder.positional_embedding
+        encoder.positional_embedding = full[:n_ctx]
+        try:
+            yield
+        finally:
+            encoder.positional_embedding = full
+
+    def transcribe_short(self, audio, features, margin, language, initial_prompt, **options):
+        """Decode one window with the encoder context cut to the audio plus margin.
+
+        Only the first temperature of the fallback ladder is tried. Whisper
+        was trained on 30-second windows, so a decode that fails the quality
+        checks is not retried here but left to the full-context path.
+        """
+        import torch
+        import whisper
+        from whisper.audio import HOP_LENGTH, N_FRAMES, SAMPLE_RATE
+
+        if features is None:
+            with timing.stage("model.log-mel"):
+                features = log_mel_spectrogram(audio, self.mel_filters())
+        # The encoder halves the frame rate, so the context is kept even
+        n_frames = len(audio) // HOP_LENGTH + int(margin * SAMPLE_RATE / HOP_LENGTH)
+        n_frames = min(N_FRAMES, n_frames + n_frames % 2)
+        mel = whisper.pad_or_trim(torch.from_numpy(features), n_frames).unsqueeze(0)
+        with self._audio_context(n_frames // 2):
+            result = self._decode(mel, language, initial_prompt, self._ladder(options)[0], options)[0]
+        verdict = self._verdict(result, options)
+        if verdict == "silent":
+            return TranscriptionResult("", [], language)
+        if verdict == "retry":
+            return None
+        return self._window_result(result, len(audio) / SAMPLE_RATE, language)
+
+    def transcribe_batch(self, audios, language, initial_prompt, **options):
+        """Encode clips of up to 30 seconds as one mel batch and decode them together.
+
+        whisper.decode stops each item at its own end-of-text token. Items that
+        fail the fallback thresholds, and clips longer than one window, are
+        transcribed again one by one with the full fallback ladder.
+        """
+        import torch
+        import whisper
+        from whisper.audio import N_FRAMES, N_SAMPLES
+
+        results: List[Optional[TranscriptionResult]] = [None] * len(audios)
+        short = [i for i, audio in enumerate(audios) if len(audio) <= N_SAMPLES]
+        if short:
+            with timing.stage("model.log-mel"):
+                mel = torch.stack([
+                    whisper.pad_or_trim(whisper.log_mel_spectrogram(audios[i], self.model.dims.n_mels), N_FRAMES)
+                    for i in short
+                ])
+            ladder = self._ladder(options)
+            decoded = self._decode(mel, language, initial_prompt, ladder[0], options)
+            for i, result in zip(short, decoded):
+                verdict = self._verdict(result, options)
+                if verdict == "silent":
+                    results[i] = TranscriptionResult("", [], language)
+                elif verdict == "ok" or len(ladder) == 1:
+                    results[i] = self._window_result(result, len(audios[i]) / whisper.audio.SAMPLE_RATE, language)
+
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = self.transcribe(audios[i], language, initial_prompt, **options)
+        return results
+
+class FasterWhisperBackend(InferenceBackend):
+    """CTranslate2 engine from the optional `faster-whisper` package.
+
+    On CPU the model runs with int8 weights by default, which is several
+    times faster than the fp32 PyTorch model.
+    """
+    name = "faster-whisper"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model = None
+
+    def load(self, timer: StageTimer) -> None:
+        with timer.stage("import faster_whisper"):
+            from faster_whisper import WhisperModel
+            import ctranslate2
+        self.device = "cuda" if self.use_cuda and ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        if self.use_cuda and self.device == "cpu":
+            logger.warning("CUDA requested but not available, falling back to CPU")
+        compute_type = self.compute_type
+        if compute_type == "auto":
+            compute_type = "float16" if self.device == "cuda" else "int8"
+        # CTranslate2 runs one operation at a time per model replica, so
+        # there is no inter-op pool to size
+        with timer.stage("load model"):
+            self.model = WhisperModel(
+                self.model_size, device=self.device, compute_type=compute_type, cpu_threads=self.cpu_threads
+            )
+        self.compute_type = compute_type
+        logger.info(f"Loaded faster-whisper model '{self.model_size}' on {self.device} ({compute_type})")
+
+    def transcribe(self, audio, language, initial_prompt, word_timestamps=False, **options):
+        # faster-whisper spells this option differently and uses beam size 1
+        # rather than None for greedy decoding
+        if "logprob_threshold" in options:
+            options["log_prob_threshold"] = options.pop("logprob_threshold")
+        if options.get("beam_size", 1) is None:
+            options["beam_size"] = 1
+        if "best_of" in options and options["best_of"] is None:
+            del options["best_of"]
+        segments_iter, info = self.model.transcribe(
+            audio,
+            language=language,
+            task="transcribe",
+            initial_prompt=initial_prompt,
+            word_timestamps=word_timestamps,
+            **options
+        )
+        segments = [
+            Segment(
+                start=segment.start,
+                end=segment.end,
+                text=segment.text,
+                avg_logprob=segment.avg_logprob,
+                no_speech_prob=segment.no_speech_prob,
+                compression_ratio=segment.compression_ratio,
+                words=[Word(w.word, w.start, w.end) for w in (segment.words or [])],
+                seek=segment.seek,
+                temperature=getattr(segment, "temperature", 0.0)
+            )
+            for segment in segments_iter
+        ]
+        text = "".join(segment.text for segment in segments).strip()
+        return TranscriptionResult(text, segments, info.language)
+
+    def unload(self) -> None:
+        self.model = None
+        gc.collect()
+
+def install_timing_hooks(model, sync_cuda: bool = False) -> None:
+    """Record log-mel, encoder and decoder time on the active timer.
+
+    Encoder and decoder time is measured with forward hooks. Whisper's
+    transcribe() calls log_mel_spectrogram through its own module namespace,
+    so that reference is wrapped once per process.
+
+    Args:
+        model: Loaded Whisper model.
+        sync_cuda: Synchronize CUDA before reading the clock, so GPU kernels
+            are attributed to the stage that launched them.
+    """
+    import torch
+
+    local = threading.local()
+
+    def now() -> float:
+        if sync_cuda and timing.active() is not None:
+            torch.cuda.synchronize()
+        return time.perf_counter()
+
+    def add_hooks(module, name: str) -> None:
+        def pre_hook(module, args):
+            setattr(local, name, now())
+
+        def post_hook(module, args, output):
+            start = getattr(local, name, None)
+            if start is not None:
+                timing.record(name, now() - start)
+
+        module.register_forward_pre_hook(pre_hook)
+        module.register_forward_hook(post_hook)
+
+    add_hooks(model.encoder, "model.encode")
+    add_hooks(model.decoder, "model.decode")
+
+    transcribe_module = sys.modules["whisper.transcribe"]
+    log_mel = transcribe_module.log_mel_spectrogram
+    if not getattr(log_mel, "_timed", False):
+        def timed_log_mel(*args, **kwargs):
+            with timing.stage("model.log-mel"):
+                return log_mel(*args, **kwargs)
+        timed_log_mel._timed = True
+        transcribe_module.log_mel_spectrogram = timed_log_mel
+
+def quantize_linear_layers(model, torch, whisper):
+    """Apply dynamic int8 quantization to the Linear layers of a Whisper model.
+
+    Whisper uses its own Linear subclass, which PyTorch's quantizer does not
+    recognize, so those layers are turned back into plain nn.Linear first.
+    In fp32 their forward is identical.
+
+    Args:
+        model: Whisper model on the CPU.
+        torch: The imported torch module.
+        whisper: The imported whisper module.
+
+    Returns:
+        Quantized model in eval mode.
+    """
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model.eval()
+
+class StubBackend(InferenceBackend):
+    """Model-free engine for benchmarks and tests.
+
+    Returns one 'stub' word per second of audio without any inference, so the
+    surrounding pipeline can be measured on machines without a model.
+    """
+    name = "stub"
+
+    def load(self, timer: StageTimer) -> None:
+        logger.info("Loaded stub backend")
+
+    def transcribe(self, audio, language, initial_prompt, word_timestamps=False, **options):
+        n_words = int(len(audio) // 16000)
+        words = [Word(" stub", float(i), float(i + 1)) for i in range(n_words)]
+        segments = [Segment(0.0, float(n_words), "".join(w.text for w in words), words=words if word_timestamps else [])]
+        return TranscriptionResult(segments[0].text.strip(), segments, language)
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    StubBackend.name: StubBackend
+}
+
+def create_backend(
+    name: str,
+    model_size: str,
+    use_cuda: bool = True,
+    compute_type: str = "auto",
+    cache_dir: Optional[Path] = None,
+    cpu_threads: int = 0,
+    interop_threads: int = 0
+) -> InferenceBackend:
+    """Create an inference backend by name.
+
+    Args:
+        name: Backend name, one of BACKENDS.
+        model_size: Whisper model size name.
+        use_cuda: Use the GPU when available.
+        compute_type: Numeric precision, or 'auto' to pick per device.
+        cache_dir: Directory for converted model files.
+        cpu_threads: Threads used inside one CPU operation, 0 for default.
+        interop_threads: Threads running CPU operations in parallel, 0 for
+            default.
+
+    Returns:
+        Backend instance. The model is not loaded yet.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', must be one of {list(BACKENDS)}")
+    return BACKENDS[name](
+        model_size,
+        use_cuda=use_cuda,
+        compute_type=compute_type,
+        cache_dir=cache_dir,
+        cpu_threads=cpu_threads,
+        interop_threads=interop_threads
+    )
@@ -0,0 +1,237 @@
+"""Headless batch transcription for Hotkey Dikte application.
+
+This module transcribes a directory of recorded audio with the configured
+transcriber settings (model, language, initial prompt, decoding profile).
+Files are discovered and loaded lazily, spread over a thread or process
+pool with a bounded number in flight, and one JSON line per file is appended
+to the output as soon as it is done. Rerunning with the same output skips
+the files that already have a result, so an interrupted run can be resumed.
+
+Usage:
+    python batch_transcribe.py recordings/ --output transcripts.jsonl --workers 4 --pool process
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+import numpy as np
+
+import timing
+from timing import StageTimer
+from logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".m4a")
+
+# Transcriber of the current pool process, or shared by the pool threads
+_transcriber = None
+
+def iter_audio_files(root: Path, extensions: Iterable[str] = AUDIO_EXTENSIONS) -> Iterator[Path]:
+    """Yield audio files below a directory in a stable order, one at a time."""
+    extensions = {ext.lower() for ext in extensions}
+    for directory, subdirs, files in os.walk(root):
+        # Sorting in place makes os.walk descend in a stable order
+        subdirs.sort()
+        for name in sorted(files):
+            path = Path(directory) / name
+            if path.suffix.lower() in extensions:
+                yield path
+
+def load_done(output: Path) -> Set[str]:
+    """Return the files that already have a successful record in the output.
+
+    A partially written last line from an interrupted run is ignored.
+    """
+    done = set()
+    if not output.exists():
+        return done
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in record:
+                done.add(record["path"])
+    return done
+
+def load_audio(path: Path) -> Tuple[np.ndarray, int]:
+    """Read an audio file as float32 samples.
+
+    WAV files are read directly; other formats are decoded with Whisper's
+    ffmpeg loader at 16 kHz mono.
+
+    Returns:
+        Tuple of samples and sample rate.
+    """
+    if path.suffix.lower() == ".wav":
+        from evaluation import load_wav
+        return load_wav(path)
+    from whisper.audio import SAMPLE_RATE, load_audio as whisper_load_audio
+    return whisper_load_audio(str(path)), SAMPLE_RATE
+
+def _init_worker(settings: Dict[str, Any]) -> None:
+    """Create and load the transcriber of a pool process."""
+    global _transcriber
+    from transcriber import Transcriber
+
+    setup_logging()
+    _transcriber = Transcriber(**settings)
+    _transcriber.load()
+
+def transcribe_file(path: Path, root: Path) -> Dict[str, Any]:
+    """Transcribe one file with the pool's transcriber.
+
+    Returns:
+        JSON-compatible record with the text, duration and stage timings,
+        or an error message.
+    """
+    timer = StageTimer()
+    record: Dict[str, Any] = {"path": path.relative_to(root).as_posix()}
+    try:
+        with timing.activate(timer):
+            with timing.stage("load audio"):
+                audio, sample_rate = load_audio(path)
+            with timing.stage("transcribe"):
+                text = _transcriber.transcribe(audio, sample_rate)
+        duration = len(audio) / sample_rate
+        record.update({
+            "text": text or "",
+            "duration": round(duration, 3),
+            "rtf": round(timer.stages["transcribe"] / duration, 4) if duration else None
+        })
+        if text is None:
+            record["error"] = "transcription failed or audio too short"
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        logger.debug(traceback.format_exc())
+    record["timings"] = {name: round(seconds, 4) for name, seconds in timer.stages.items()}
+    record["elapsed"] = round(timer.elapsed, 4)
+    return record
+
+def create_pool(kind: str, workers: int, settings: Dict[str, Any]) -> Executor:
+    """Create the worker pool with a loaded transcriber per process or pool.
+
+    Args:
+        kind: 'thread' to share one model between threads, or 'process' to
+            load one model per process for parallel decoding.
+        workers: Number of threads or processes.
+        settings: Transcriber keyword arguments.
+    """
+    if kind == "process":
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"),
+            initializer=_init_worker, initargs=(settings,)
+        )
+    _init_worker(settings)
+    return ThreadPoolExecutor(max_workers=workers)
+
+def run(
+    root: Path,
+    output: Path,
+    settings: Dict[str, Any],
+    workers: int = 1,
+    pool: str = "thread",
+    max_in_flight: Optional[int] = None
+) -> Dict[str, int]:
+    """Transcribe every pending file below a directory into a JSONL file.
+
+    At most `max_in_flight` files (default twice the workers) are queued or
+    being decoded at any time, so memory use does not grow with the corpus.
+
+    Returns:
+        Counts of transcribed, failed and skipped files.
+    """
+    done = load_done(output)
+    if done:
+        logger.info(f"Resuming: {len(done)} files already transcribed in {output}")
+    max_in_flight = max_in_flight or 2 * workers
+    counts = {"transcribed": 0, "failed": 0, "skipped": 0}
+
+    def pending() -> Iterator[Path]:
+        for path in iter_audio_files(root):
+            if path.relative_to(root).as_posix() in done:
+                counts["skipped"] += 1
+            else:
+                yield path
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.exists() and output.stat().st_size:
+        with open(output, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+        if torn:
+            # End the partial line of an interrupted run so new records stay parseable
+            with open(output, "a", encoding="utf-8") as f:
+                f.write("\n")
+    start = time.perf_counter()
+    with create_pool(pool, workers, settings) as executor, open(output, "a", encoding="utf-8") as out:
+        files = pending()
+        in_flight = set()
+        while True:
+            for path in files:
+                in_flight.add(executor.submit(transcribe_file, path, root))
+                if len(in_flight) >= max_in_flight:
+                    break
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                counts["failed" if "error" in record else "transcribed"] += 1
+                logger.info(f"{record['path']}: {record.get('error') or str(record.get('duration')) + 's'}")
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Done in {elapsed:.1f}s: {counts['transcribed']} transcribed, "
+        f"{counts['failed']} failed, {counts['skipped']} skipped"
+    )
+    return counts
+
+def main(argv=None) -> int:
+    """Command line entry point."""
+    from config_schema import AppConfig
+
+    parser = argparse.ArgumentParser(description="Transcribe a directory of audio files to JSONL")
+    parser.add_argument("directory", type=Path, help="Directory searched recursively for audio files")
+    parser.add_argument("--output", type=Path, required=True, help="JSONL file, appended to and used to resume")
+    parser.add_argument("--config", type=Path, help="Configuration file for transcriber settings")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread",
+                        help="'process' loads one model per worker for parallel decoding")
+    parser.add_argument("--model-size", help="Override the configured model size")
+    parser.add_argument("--backend", help="Override the configured backend")
+    parser.add_argument("--profile", help="Override the configured decoding profile")
+    args = parser.parse_args(argv)
+
+    config = AppConfig.load(args.config)
+    setup_logging(config.log_path)
+    transcriber = config.transcriber
+    settings = {
+        "model_size": args.model_size or transcriber.model_size,
+        "language": transcriber.language,
+        "initial_prompt": transcriber.initial_prompt,
+        "use_cuda": transcriber.use_cuda,
+        "backend": args.backend or transcriber.backend,
+        "compute_type": transcriber.compute_type,
+        "cache_dir": transcriber.cache_dir,
+        "profile": args.profile or transcriber.decoding_profile,
+        "cpu_threads": transcriber.cpu_threads,
+        "interop_threads": transcriber.interop_threads
+    }
+    counts = run(args.directory, args.output, settings, args.workers, args.pool)
+    return 1 if counts["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+"""Offline speed benchmark for Hotkey Dikte application.
+
+This module replays a directory of WAV files through `Transcriber.transcribe`,
+the same path the application uses, across model sizes, backends, compute
+types and decoding settings. It reports per-clip latency and real-time factor,
+latency percentiles, memory use and WER against reference transcripts as
+JSON, so runs can be diffed between commits.
+
+Usage:
+    python benchmark.py clips/ --model-sizes tiny,base --backends whisper,faster-whisper
+    python benchmark.py clips/ --profiles fast,balanced,standard,accurate
+    python benchmark.py clips/ --batch-sizes 1,2,4,8,16
+    python benchmark.py clips/ --context-sweep
+    python benchmark.py --preprocess --preprocess-seconds 600
+    python benchmark.py clips/ --backends stub --output bench.json
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+import timing
+
+from config_schema import TranscriberConfig
+from evaluation import find_clips, load_wav, word_error_rate
+from lifecycle import process_memory_mb
+from capture import CaptureBuffer
+from preprocess import TARGET_SAMPLE_RATE, prepare_audio
+from timing import StageTimer
+from transcriber import Transcriber
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+def rss_growth_mb(before: Optional[float], samples: List[Optional[float]]) -> Optional[float]:
+    """Largest rise of the resident set size over a baseline, in MB.
+
+    The process-wide peak only ever rises, so it would carry one
+    configuration's memory into the next; current RSS samples taken during
+    the run are compared with the RSS before it instead.
+    """
+    known = [sample for sample in samples if sample is not None]
+    if before is None or not known:
+        return None
+    return round(max(known) - before, 1)
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentile of a list, or 0.0 when empty."""
+    return float(np.percentile(values, q)) if values else 0.0
+
+def git_revision() -> Optional[str]:
+    """Commit hash of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def load_corpus(directory: Path) -> List[Dict[str, Any]]:
+    """Load all WAV clips of a corpus as 16 kHz mono float32.
+
+    Clips are preprocessed up front so the timed runs measure the model.
+
+    Args:
+        directory: Directory of WAV files with optional `.txt` references.
+
+    Returns:
+        List of clips with name, audio, sample rate, duration and reference.
+    """
+    clips = []
+    for wav_path, reference in find_clips(directory):
+        audio, sample_rate = load_wav(wav_path)
+        audio = prepare_audio(audio, sample_rate)
+        clips.append({
+            "name": wav_path.name,
+            "audio": audio,
+            "sample_rate": TARGET_SAMPLE_RATE,
+            "duration": len(audio) / TARGET_SAMPLE_RATE,
+            "reference": reference
+        })
+    return clips
+
+def benchmark_preprocess(
+    sample_rates: Iterable[int] = (16000, 22050, 44100, 48000),
+    channel_counts: Iterable[int] = (1, 2),
+    dtypes: Iterable[str] = ("float32", "int16"),
+    seconds: float = 30.0,
+    repeats: int = 5
+) -> List[Dict[str, Any]]:
+    """Measure capture memory and preprocessing cost of a recording.
+
+    The recording is written to a `CaptureBuffer` block by block as the audio
+    callback does, then converted to 16 kHz mono float32.
+
+    Returns:
+        One record per capture format with the capture buffer's peak memory
+        and the best preprocessing time over the repeats.
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for sample_rate, channels, dtype in itertools.product(sample_rates, channel_counts, dtypes):
+        audio = rng.uniform(-0.5, 0.5, (int(seconds * sample_rate), channels)).astype(np.float32)
+        if dtype == "int16":
+            audio = (audio * 32767).astype(np.int16)
+        buffer = CaptureBuffer(channels, initial_capacity=30 * sample_rate, dtype=dtype)
+        for offset in range(0, len(audio), 1024):
+            buffer.write(audio[offset:offset + 1024])
+        peak_bytes = buffer.stats()["peak_bytes"]
+        audio = buffer.detach()
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            prepare_audio(audio, sample_rate)
+            best = min(best, time.perf_counter() - start)
+        results.append({
+            "sample_rate": sample_rate,
+            "channels": channels,
+            "dtype": dtype,
+            "seconds": seconds,
+            "capture_peak_mb": round(peak_bytes / 1e6, 2),
+            "preprocess_ms": round(best * 1000, 2),
+            "ms_per_audio_second": round(best * 1000 / seconds, 4)
+        })
+    return results
+
+def benchmark_config(
+    clips: List[Dict[str, Any]],
+    model_size: str,
+    backend: str,
+    compute_type: str,
+    decode_options: Dict[str, Any],
+    warmup: int = 1,
+    profile: str = "standard"
+) -> Dict[str, Any]:
+    """Benchmark one transcriber configuration over a corpus.
+
+    Args:
+        clips: Clips returned by load_corpus.
+        model_size: Whisper model size name.
+        backend: Inference backend name.
+        compute_type: Numeric precision.
+        decode_options: Decoding options overriding the profile.
+        warmup: Number of untimed passes over the first clip.
+        profile: Decoding profile name.
+
+    Returns:
+        Run record with configuration, per-clip results and summary.
+    """
+    defaults = TranscriberConfig()
+    gc.collect()
+    rss_before = process_memory_mb()
+    transcriber = Transcriber(
+        model_size=model_size,
+        language=defaults.language,
+        initial_prompt=defaults.initial_prompt,
+        use_cuda=False,
+        backend=backend,
+        compute_type=compute_type,
+        decode_options=decode_options,
+        profile=profile
+    )
+    try:
+        start = time.perf_counter()
+        transcriber.load()
+        load_seconds = time.perf_counter() - start
+        rss_samples = [process_memory_mb()]
+
+        for _ in range(warmup if clips else 0):
+            transcriber.transcribe(clips[0]["audio"], clips[0]["sample_rate"])
+
+        results = []
+        for clip in clips:
+            start = time.perf_counter()
+            text = transcriber.transcribe(clip["audio"], clip["sample_rate"]) or ""
+            latency = time.perf_counter() - start
+            rss_samples.append(process_memory_mb())
+            results.append({
+                "clip": clip["name"],
+                "duration": round(clip["duration"], 3),
+                "latency": round(latency, 4),
+                "rtf": round(latency / clip["duration"], 4) if clip["duration"] else None,
+                "wer": round(word_error_rate(clip["reference"], text), 4) if clip["reference"] else None,
+                "text": text
+            })
+
+        latencies = [r["latency"] for r in results]
+        wers = [r["wer"] for r in results if r["wer"] is not None]
+        total_audio = sum(clip["duration"] for clip in clips)
+        return {
+            "config": {
+                "model_size": model_size,
+                "backend": backend,
+                "compute_type": transcriber.backend.compute_type,
+                "device": transcriber.backend.device,
+                "profile": profile,
+                "decode_options": decode_options
+            },
+            "load_seconds": round(load_seconds, 3),
+            "summary": {
+                "clips": len(results),
+                "audio_seconds": round(total_audio, 3),
+                "latency_p50": round(percentile(latencies, 50), 4),
+                "latency_p95": round(percentile(latencies, 95), 4),
+                "latency_mean": round(float(np.mean(latencies)), 4) if latencies else 0.0,
+                "rtf": round(sum(latencies) / total_audio, 4) if total_audio else None,
+                "wer": round(float(np.mean(wers)), 4) if wers else None,
+                "rss_delta_mb": rss_growth_mb(rss_before, rss_samples[-1:]),
+                "peak_rss_delta_mb": rss_growth_mb(rss_before, rss_samples)
+            },
+            "clips": results
+        }
+    finally:
+        # Free the model so the next configuration starts from the same RSS
+        transcriber.unload()
+        transcriber.close()
+
+def benchmark_batching(
+    clips: List[Dict[str, Any]],
+    model_size: str,
+    backend: str,
+    compute_type: str,
+    batch_sizes: Iterable[int],
+    profile: str = "standard"
+) -> List[Dict[str, Any]]:
+    """Compare batched and sequential transcription throughput.
+
+    For each batch size, that many clips (cycling through the corpus) are
+    transcribed once with sequential `transcribe` calls and once with a
+    single `transcribe_batch` call.
+
+    Returns:
+        One record per batch size with clips per second for both methods.
+    """
+    defaults = TranscriberConfig()
+    transcriber = Transcriber(
+        model_size=model_size,
+        language=defaults.language,
+        initial_prompt=defaults.initial_prompt,
+        use_cuda=False,
+        backend=backend,
+        compute_type=compute_type,
+        profile=profile
+    )
+    transcriber.load()
+    # Warm up so the first measurement does not pay one-time costs
+    transcriber.transcribe(clips[0]["audio"], TARGET_SAMPLE_RATE)
+
+    results = []
+    for batch_size in batch_sizes:
+        audios = [clips[i % len(clips)]["audio"] for i in range(batch_size)]
+        start = time.perf_counter()
+        for audio in audios:
+            transcriber.transcribe(audio, TARGET_SAMPLE_RATE)
+        sequential = time.perf_counter() - start
+        start = time.perf_counter()
+        transcriber.transcribe_batch(audios, TARGET_SAMPLE_RATE, batch_size=batch_size)
+        batched = time.perf_counter() - start
+        results.append({
+            "batch_size": batch_size,
+            "sequential_clips_per_second": round(batch_size / sequential, 3),
+            "batched_clips_per_second": round(batch_size / batched, 3),
+            "speedup": round(sequential / batched, 3)
+        })
+        logger.info(f"Batch size {batch_size}: {sequential / batched:.2f}x faster than sequential")
+    return results
+
+def benchmark_context(
+    clips: List[Dict[str, Any]],
+    model_size: str,
+    backend: str,
+    compute_type: str,
+    profile: str = "standard",
+    margin: float = 1.0
+) -> List[Dict[str, Any]]:
+    """Compare encoder time with the full and a shortened encoder context.
+
+    Every clip is transcribed once with the full 30-second context and once
+    with `dynamic_context`, so encoder time can be plotted against clip
+    length. A shortened decode that fell back to the full context is
+    reported with both encoder passes included.
+
+    Returns:
+        One record per clip, ordered by duration.
+    """
+    defaults = TranscriberConfig()
+    transcriber = Transcriber(
+        model_size=model_size,
+        language=defaults.language,
+        initial_prompt=defaults.initial_prompt,
+        use_cuda=False,
+        backend=backend,
+        compute_type=compute_type,
+        profile=profile,
+        context_margin=margin
+    )
+    transcriber.load()
+    transcriber.transcribe(clips[0]["audio"], TARGET_SAMPLE_RATE)
+
+    results = []
+    for clip in sorted(clips, key=lambda c: c["duration"]):
+        record: Dict[str, Any] = {"clip": clip["name"], "duration": round(clip["duration"], 3)}
+        for dynamic, label in ((False, "full"), (True, "short")):
+            transcriber.dynamic_context = dynamic
+            timer = StageTimer()
+            with timing.activate(timer):
+                start = time.perf_counter()
+                text = transcriber.transcribe(clip["audio"], TARGET_SAMPLE_RATE) or ""
+                latency = time.perf_counter() - start
+            record[f"{label}_encode"] = round(timer.stages.get("model.encode", 0.0), 4)
+            record[f"{label}_latency"] = round(latency, 4)
+            if clip["reference"]:
+                record[f"{label}_wer"] = round(word_error_rate(clip["reference"], text), 4)
+        if record["short_encode"]:
+            record["encode_speedup"] = round(record["full_encode"] / record["short_encode"], 3)
+        results.append(record)
+        logger.info(
+            f"{clip['name']} ({clip['duration']:.1f}s): encoder {record['full_encode']:.3f}s full, "
+            f"{record['short_encode']:.3f}s shortened"
+        )
+    return results
+
+def run_benchmark(
+    corpus: Path,
+    model_sizes: Iterable[str],
+    backends: Iterable[str],
+    compute_types: Iterable[str],
+    decode_options: Iterable[Dict[str, Any]],
+    warmup: int = 1,
+    profiles: Iterable[str] = ("standard",)
+) -> Dict[str, Any]:
+    """Benchmark every combination of the given settings.
+
+    Returns:
+        Report with environment metadata and one run per combination.
+    """
+    clips = load_corpus(corpus)
+    logger.info(f"Loaded {len(clips)} clips from {corpus}")
+    runs = []
+    for model_size, backend, compute_type, profile, options in itertools.product(
+        model_sizes, backends, compute_types, list(profiles), list(decode_options)
+    ):
+        logger.info(f"Benchmarking {backend} {model_size} ({compute_type}) {profile} {options}")
+        try:
+            runs.append(benchmark_config(clips, model_size, backend, compute_type, options, warmup, profile))
+        except Exception as e:
+            logger.error(f"Benchmark failed for {backend} {model_size}: {e}")
+            runs.append({
+                "config": {"model_size": model_size, "backend": backend,
+                           "compute_type": compute_type, "profile": profile, "decode_options": options},
+                "error": str(e)
+            })
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": str(corpus)
+        },
+        "runs": runs
+    }
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def main(argv=None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark transcription speed and accuracy")
+    parser.add_argument("corpus", type=Path, nargs="?", help="Directory of WAV files with optional .txt references")
+    parser.add_argument("--model-sizes", type=_split, default=["tiny"])
+    parser.add_argument("--backends", type=_split, default=["whisper"])
+    parser.add_argument("--compute-types", type=_split, default=["auto"])
+    parser.add_argument("--profiles", type=_split, default=["standard"], help="Decoding profiles to compare")
+    parser.add_argument(
+        "--decode-options", type=json.loads, default=[{}],
+        help='JSON list of decoding option sets, e.g. \'[{"beam_size": 1}, {"beam_size": 5}]\''
+    )
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--preprocess", action="store_true", help="Benchmark audio preprocessing instead of models")
+    parser.add_argument("--preprocess-seconds", type=float, default=30.0, help="Recording length for --preprocess")
+    parser.add_argument(
+        "--batch-sizes", type=lambda v: [int(size) for size in _split(v)],
+        help="Compare batched and sequential throughput at these batch sizes, e.g. 1,2,4,8,16"
+    )
+    parser.add_argument(
+        "--context-sweep", action="store_true",
+        help="Compare encoder time with full and shortened encoder context per clip"
+    )
+    parser.add_argument("--context-margin", type=float, default=1.0, help="Seconds of margin for --context-sweep")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.preprocess:
+        report = {"meta": {"revision": git_revision()}, "preprocess": benchmark_preprocess(seconds=args.preprocess_seconds)}
+    elif args.corpus is None:
+        parser.error("corpus is required unless --preprocess is given")
+    elif args.context_sweep:
+        clips = load_corpus(args.corpus)
+        if not clips:
+            parser.error(f"no WAV files in {args.corpus}")
+        report = {
+            "meta": {"revision": git_revision(), "corpus": str(args.corpus)},
+            "context": [
+                {
+                    "config": {"model_size": model_size, "backend": backend, "compute_type": compute_type,
+                               "profile": args.profiles[0], "margin": args.context_margin},
+                    "results": benchmark_context(
+                        clips, model_size, backend, compute_type, args.profiles[0], args.context_margin
+                    )
+                }
+                for model_size, backend, compute_type in itertools.product(
+                    args.model_sizes, args.backends, args.compute_types
+                )
+            ]
+        }
+    elif args.batch_sizes:
+        clips = load_corpus(args.corpus)
+        if not clips:
+            parser.error(f"no WAV files in {args.corpus}")
+        report = {
+            "meta": {"revision": git_revision(), "corpus": str(args.corpus)},
+            "batching": [
+                {
+                    "config": {"model_size": model_size, "backend": backend,
+                               "compute_type": compute_type, "profile": args.profiles[0]},
+                    "results": benchmark_batching(
+                        clips, model_size, backend, compute_type, args.batch_sizes, args.profiles[0]
+                    )
+                }
+                for model_size, backend, compute_type in itertools.product(
+                    args.model_sizes, args.backends, args.compute_types
+                )
+            ]
+        }
+    else:
+        report = run_benchmark(
+            args.corpus, args.model_sizes, args.backends, args.compute_types, args.decode_options, args.warmup,
+            args.profiles
+        )
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+        logger.info(f"Benchmark report written to {args.output}")
+    else:
+        print(text)
+    return 0 if all("error" not in run for run in report.get("runs", [])) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""Contiguous audio capture buffer for Hotkey Dikte application.
+
+This module provides a preallocated, growable NumPy buffer that the audio
+callback fills in place, so recordings do not allocate a new array per block,
+and counters of callback problems that the callback updates without logging.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+class CaptureBuffer:
+    """Preallocated contiguous audio buffer with a write cursor.
+
+    Blocks are copied into a single (samples, channels) array. When the buffer
+    is full its capacity doubles, so the number of allocations grows with the
+    logarithm of the recording length instead of linearly with block count.
+
+    There is a single writer and no lock. `write` replaces a full array with
+    a grown copy, then copies the block, then publishes the new cursor.
+    `view` reads the cursor before the array, so a view taken from another
+    thread while recording covers written samples only. A reset() or
+    detach() in between still yields a valid, possibly empty, array, but
+    not necessarily samples of the same recording.
+    """
+    def __init__(self, channels: int, initial_capacity: int, dtype=np.float32):
+        self.channels = channels
+        self.initial_capacity = max(1, int(initial_capacity))
+        self.dtype = np.dtype(dtype)
+        self._data: Optional[np.ndarray] = None
+        self._cursor = 0
+
+        # Allocation statistics for the current recording
+        self.allocations = 0
+        self.peak_bytes = 0
+
+        self.reset()
+
+    def __len__(self) -> int:
+        return self._cursor
+
+    @property
+    def capacity(self) -> int:
+        """Number of frames the backing array can hold."""
+        return 0 if self._data is None else len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the backing array in bytes."""
+        return 0 if self._data is None else self._data.nbytes
+
+    def reset(self) -> None:
+        """Rewind the cursor, allocating a backing array if it was detached."""
+        self._cursor = 0
+        self.allocations = 0
+        self.peak_bytes = 0
+        if self._data is None:
+            self._allocate(self.initial_capacity)
+        else:
+            self.peak_bytes = self._data.nbytes
+
+    def write(self, block: np.ndarray) -> None:
+        """Copy a block of frames into the buffer at the write cursor.
+
+        Args:
+            block: Audio block shaped (frames, channels).
+        """
+        n = len(block)
+        end = self._cursor + n
+        if self._data is None or end > len(self._data):
+            self._grow(end)
+        self._data[self._cursor:end] = block
+        self._cursor = end
+
+    def view(self) -> np.ndarray:
+        """Return a zero-copy view of the frames written so far.
+
+        The view stays valid but may stop tracking new writes once the buffer
+        grows, and its contents change after reset().
+        """
+        # Cursor first: the array it was published for is at least that long
+        cursor = self._cursor
+        data = self._data
+        if data is None:
+            return np.empty((0, self.channels), dtype=self.dtype)
+        return data[:min(cursor, len(data))]
+
+    def detach(self) -> np.ndarray:
+        """Hand over the recorded frames without copying.
+
+        The buffer gives up its backing array, so the returned view is never
+        overwritten by later recordings. The next reset() allocates a fresh
+        array.
+
+        Returns:
+            View of the recorded frames shaped (frames, channels).
+        """
+        frames = self.view()
+        self._data = None
+        self._cursor = 0
+        return frames
+
+    def stats(self) -> Dict[str, int]:
+        """Return allocation statistics for the current recording."""
+        return {
+            "frames": self._cursor,
+            "capacity": self.capacity,
+            "allocations": self.allocations,
+            "peak_bytes": self.peak_bytes
+        }
+
+    def _allocate(self, capacity: int) -> None:
+        """Replace the backing array with an empty one of the given capacity."""
+        self._data = np.empty((capacity, self.channels), dtype=self.dtype)
+        self.allocations += 1
+        self.peak_bytes = max(self.peak_bytes, self._data.nbytes)
+
+    def _grow(self, required: int) -> None:
+        """Grow the backing array to hold at least `required` frames."""
+        old = self._data
+        capacity = max(required, 2 * self.capacity, self.initial_capacity)
+        new = np.empty((capacity, self.channels), dtype=self.dtype)
+        if old is not None:
+            new[:self._cursor] = old[:self._cursor]
+        self._data = new
+        self.allocations += 1
+        # Old and new arrays are both alive while copying
+        self.peak_bytes = max(self.peak_bytes, new.nbytes + (old.nbytes if old is not None else 0))
+
+class CallbackStats:
+    """Counts of audio callback status flags and errors.
+
+    Only the audio thread writes the counters, as plain integer increments
+    without locks or I/O, so an overflow storm cannot make itself worse by
+    logging. Another thread reads them with `since_last_report` and logs a
+    summary.
+    """
+    FLAGS = ("input_overflow", "input_underflow", "output_overflow", "output_underflow", "priming_output")
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.FLAGS, 0)
+        self.errors = 0
+        self.last_error: Optional[BaseException] = None
+        self._reported = self.totals()
+
+    def record_status(self, status) -> None:
+        """Count the flags set in a callback status; called from the audio callback.
+
+        Args:
+            status: sounddevice CallbackFlags, or any object with the flag attributes.
+        """
+        for flag in self.FLAGS:
+            if getattr(status, flag, False):
+                self.counts[flag] += 1
+
+    def record_error(self, error: BaseException) -> None:
+        """Count an exception raised in the audio callback; called from the callback."""
+        self.errors += 1
+        self.last_error = error
+
+    def totals(self) -> Dict[str, int]:
+        """Return the counts since the stream started."""
+        totals = dict(self.counts)
+        totals["errors"] = self.errors
+        return totals
+
+    def since_last_report(self) -> Dict[str, int]:
+        """Return the counts that grew since the previous call, by how much.
+
+        Called from a single reporting thread.
+        """
+        totals = self.totals()
+        grown = {name: count - self._reported[name] for name, count in totals.items() if count > self._reported[name]}
+        self._reported = totals
+        return grown
@@ -4,17 +4,24 @@ This module defines Pydantic models for configuration validation and provides
 helper functions for loading and validating configuration files.
 """
 
+import json
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, validator
 from loguru import logger
 
+# Languages the transcriber can be set or switched to
+LANGUAGES = ["id", "en"]
+
 class AudioConfig(BaseModel):
     """Audio configuration settings with validation."""
     sample_rate: int = Field(default=16000, ge=8000, le=48000)
     device_id: int = Field(default=1, ge=0)
     channels: int = Field(default=1, ge=1, le=2)
     blocksize: int = Field(default=1024, ge=256, le=4096)
+    buffer_seconds: float = Field(default=30.0, ge=1.0, le=600.0)
+    use_native_rate: bool = Field(default=False)
+    capture_dtype: str = Field(default="float32")
 
     @validator('sample_rate')
     def validate_sample_rate(cls, v):
@@ -22,33 +29,155 @@ class AudioConfig(BaseModel):
             logger.warning(f"Unusual sample rate: {v}")
         return v
 
+    @validator('capture_dtype')
+    def validate_capture_dtype(cls, v):
+        valid_dtypes = ["float32", "int16"]
+        if v not in valid_dtypes:
+            raise ValueError(f"Capture dtype must be one of {valid_dtypes}")
+        return v
+
 class TranscriberConfig(BaseModel):
     """Transcriber configuration settings with validation."""
     model_size: str = Field(default="medium")
+    draft_model_size: Optional[str] = None
     language: str = Field(default="id")
     initial_prompt: str = Field(default="Transkripsi percakapan Bahasa Indonesia dengan jelas dan akurat.")
     use_cuda: bool = Field(default=True)
+    backend: str = Field(default="whisper")
+    compute_type: str = Field(default="auto")
+    cache_dir: Optional[Path] = None
+    decoding_profile: str = Field(default="standard")
+    out_of_process: bool = Field(default=False)
+    streaming: bool = Field(default=False)
+    stream_step: float = Field(default=1.0, ge=0.3, le=10.0)
+    stream_max_window: float = Field(default=20.0, ge=5.0, le=30.0)
+    incremental_features: bool = Field(default=False)
+    dynamic_context: bool = Field(default=False)
+    context_margin: float = Field(default=1.0, ge=0.0, le=10.0)
+    language_prompts: Dict[str, str] = Field(default_factory=lambda: {
+        "en": "Clear and accurate transcription of an English conversation."
+    })
+    model_choices: List[str] = Field(default_factory=lambda: ["small", "medium"])
+    max_loaded_models: int = Field(default=2, ge=1, le=8)
+    max_models_memory_mb: int = Field(default=4096, ge=0, le=1048576)
+    cpu_threads: int = Field(default=0, ge=0, le=256)
+    interop_threads: int = Field(default=0, ge=0, le=64)
 
-    @validator('model_size')
+    @validator('model_size', 'draft_model_size')
     def validate_model_size(cls, v):
         valid_sizes = ["tiny", "base", "small", "medium", "large"]
+        if v is None:  # draft model disabled
+            return v
         if v not in valid_sizes:
             raise ValueError(f"Model size must be one of {valid_sizes}")
         return v
 
+    @validator('model_choices', each_item=True)
+    def validate_model_choice(cls, v):
+        valid_sizes = ["tiny", "base", "small", "medium", "large"]
+        if v not in valid_sizes:
+            raise ValueError(f"Model choices must be among {valid_sizes}")
+        return v
+
+    @validator('backend')
+    def validate_backend(cls, v):
+        valid_backends = ["whisper", "faster-whisper"]
+        if v not in valid_backends:
+            raise ValueError(f"Backend must be one of {valid_backends}")
+        return v
+
+    @validator('compute_type')
+    def validate_compute_type(cls, v):
+        valid_types = ["auto", "int8", "int8_float16", "int16", "float16", "float32"]
+        if v not in valid_types:
+            raise ValueError(f"Compute type must be one of {valid_types}")
+        return v
+
+    @validator('decoding_profile')
+    def validate_decoding_profile(cls, v):
+        valid_profiles = ["fast", "balanced", "standard", "accurate"]
+        if v not in valid_profiles:
+            raise ValueError(f"Decoding profile must be one of {valid_profiles}")
+        return v
+
     @validator('language')
     def validate_language(cls, v):
-        valid_langs = ["id", "en"]
-        if v not in valid_langs:
-            raise ValueError(f"Language must be one of {valid_langs}")
+        if v not in LANGUAGES:
+            raise ValueError(f"Language must be one of {LANGUAGES}")
         return v
 
+class VadConfig(BaseModel):
+    """Voice activity detection settings with validation."""
+    enabled: bool = Field(default=True)
+    backend: str = Field(default="energy")
+    threshold_db: float = Field(default=12.0, ge=3.0, le=40.0)
+    padding_ms: int = Field(default=200, ge=0, le=1000)
+    max_pause_ms: int = Field(default=600, ge=100, le=5000)
+    end_silence_ms: int = Field(default=700, ge=200, le=5000)
+    max_utterance_seconds: float = Field(default=25.0, ge=2.0, le=30.0)
+
+    @validator('backend')
+    def validate_backend(cls, v):
+        valid_backends = ["energy", "webrtc"]
+        if v not in valid_backends:
+            raise ValueError(f"VAD backend must be one of {valid_backends}")
+        return v
+
+class PipelineConfig(BaseModel):
+    """Transcription pipeline settings with validation."""
+    max_queue_size: int = Field(default=8, ge=1, le=64)
+    max_batch_size: int = Field(default=4, ge=1, le=16)
+
+class MetricsConfig(BaseModel):
+    """Dictation timing metrics settings with validation."""
+    history_size: int = Field(default=200, ge=10, le=10000)
+    export_path: Optional[Path] = None
+    export_format: str = Field(default="jsonl")
+
+    @validator('export_format')
+    def validate_export_format(cls, v):
+        valid_formats = ["jsonl", "prometheus"]
+        if v not in valid_formats:
+            raise ValueError(f"Export format must be one of {valid_formats}")
+        return v
+
+class OutputConfig(BaseModel):
+    """Text output settings with validation."""
+    method: str = Field(default="auto")
+    delay: float = Field(default=0.1, ge=0.0, le=2.0)
+    paste_hotkey: Optional[str] = None
+    restore_clipboard: bool = Field(default=True)
+    chunk_size: int = Field(default=64, ge=1, le=4096)
+
+    @validator('method')
+    def validate_method(cls, v):
+        valid_methods = ["auto", "clipboard", "typing"]
+        if v not in valid_methods:
+            raise ValueError(f"Output method must be one of {valid_methods}")
+        return v
+
+class DaemonConfig(BaseModel):
+    """Shared transcription daemon settings with validation."""
+    client: bool = Field(default=False)
+    host: str = Field(default="127.0.0.1")
+    port: int = Field(default=8765, ge=1024, le=65535)
+    timeout: float = Field(default=120.0, ge=1.0, le=3600.0)
+
+class LifecycleConfig(BaseModel):
+    """Model unloading settings with validation."""
+    idle_timeout_minutes: float = Field(default=0.0, ge=0.0, le=1440.0)
+    min_free_memory_mb: int = Field(default=0, ge=0, le=1048576)
+    check_interval: float = Field(default=30.0, ge=1.0, le=3600.0)
+
 class HotkeyConfig(BaseModel):
     """Hotkey configuration settings with validation."""
     record_hotkey: str = Field(default="ctrl+alt+space")
     exit_hotkey: str = Field(default="ctrl+alt+q")
+    continuous_hotkey: str = Field(default="ctrl+alt+c")
+    language_hotkey: str = Field(default="ctrl+alt+l")
+    model_hotkey: str = Field(default="ctrl+alt+m")
 
-    @validator('record_hotkey', 'exit_hotkey')
+    @validator('record_hotkey', 'exit_hotkey', 'continuous_hotkey', 'language_hotkey', 'model_hotkey')
     def validate_hotkey(cls, v):
         valid_modifiers = ['ctrl', 'alt', 'shift', 'win']
         parts = v.lower().split('+')
@@ -67,6 +196,12 @@ class AppConfig(BaseModel):
     audio: AudioConfig = Field(default_factory=AudioConfig)
     transcriber: TranscriberConfig = Field(default_factory=TranscriberConfig)
     hotkeys: HotkeyConfig = Field(default_factory=HotkeyConfig)
+    pipeline: PipelineConfig = Field(default_factory=PipelineConfig)
+    vad: VadConfig = Field(default_factory=VadConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    output: OutputConfig = Field(default_factory=OutputConfig)
+    daemon: DaemonConfig = Field(default_factory=DaemonConfig)
+    lifecycle: LifecycleConfig = Field(default_factory=LifecycleConfig)
     log_path: Optional[Path] = None
 
     class Config:
@@ -0,0 +1,411 @@
+"""Local transcription daemon for Hotkey Dikte application.
+
+This module lets several clients share one loaded model. The daemon serves
+localhost HTTP: clients POST 16 kHz mono float32 audio with their decoding
+options, requests are queued and served by a single model thread, and
+compatible requests that arrive together are decoded as one batch. Each
+response is streamed back as JSON lines, first a 'queued' event and then the
+result with per-request queue and decode timings.
+
+`DaemonBackend` is the client side: an `InferenceBackend` that forwards to
+the daemon, so a `Transcriber` in client mode never loads whisper itself.
+
+Usage:
+    python daemon.py --config config.json --port 8765
+"""
+
+import argparse
+import itertools
+import json
+import queue
+import sys
+import time
+import traceback
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Event, Thread
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import timing
+from backends import InferenceBackend, Segment, TranscriptionResult
+from streaming import Word
+from timing import StageTimer
+from logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+DEFAULT_PORT = 8765
+
+# Largest request body accepted, 30 minutes of 16 kHz float32 audio
+MAX_REQUEST_BYTES = 30 * 60 * 16000 * 4
+
+# Options a client may pass to the backend, with their accepted JSON types
+_NUMBER = (int, float)
+_OPTIONAL_NUMBER = (int, float, type(None))
+ALLOWED_OPTIONS = {
+    "language": (str, type(None)),
+    "initial_prompt": (str, type(None)),
+    "word_timestamps": (bool,),
+    "beam_size": (int, type(None)),
+    "best_of": (int, type(None)),
+    "temperature": _NUMBER + (list,),
+    "compression_ratio_threshold": _OPTIONAL_NUMBER,
+    "logprob_threshold": _OPTIONAL_NUMBER,
+    "no_speech_threshold": _OPTIONAL_NUMBER,
+    "condition_on_previous_text": (bool,)
+}
+
+def parse_options(header: str) -> Dict[str, Any]:
+    """Parse and check the transcription options of a request.
+
+    Args:
+        header: JSON object from the X-Options header.
+
+    Returns:
+        The options, all of them in ALLOWED_OPTIONS.
+
+    Raises:
+        ValueError: If the options are not a JSON object, an option is not
+            allowed or has the wrong type.
+    """
+    options = json.loads(header)
+    if not isinstance(options, dict):
+        raise ValueError("options must be a JSON object")
+    for name, value in options.items():
+        types = ALLOWED_OPTIONS.get(name)
+        if types is None:
+            raise ValueError(f"option '{name}' is not allowed")
+        # JSON booleans are ints in Python
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise ValueError(f"option '{name}' has the wrong type")
+        if name == "temperature" and isinstance(value, list):
+            if not value or not all(isinstance(t, _NUMBER) and not isinstance(t, bool) for t in value):
+                raise ValueError("temperature must be a number or a list of numbers")
+    return options
+
+def result_to_dict(result: TranscriptionResult) -> Dict[str, Any]:
+    """Convert a transcription result to JSON-compatible data."""
+    return asdict(result)
+
+def result_from_dict(data: Dict[str, Any]) -> TranscriptionResult:
+    """Rebuild a transcription result from `result_to_dict` output."""
+    segments = [
+        Segment(**{**segment, "words": [Word(**word) for word in segment.get("words", [])]})
+        for segment in data.get("segments", [])
+    ]
+    return TranscriptionResult(data["text"], segments, data.get("language"))
+
+@dataclass
+class DaemonRequest:
+    """A client request waiting for the model thread."""
+    request_id: int
+    audio: np.ndarray
+    options: Dict[str, Any]
+    received_at: float = field(default_factory=time.perf_counter)
+    done: Event = field(default_factory=Event)
+    result: Optional[TranscriptionResult] = None
+    error: Optional[str] = None
+    timings: StageTimer = field(default_factory=StageTimer)
+    batch_size: int = 1
+
+    @property
+    def batch_key(self) -> Optional[str]:
+        """Requests with the same key can share a batch; None never batches."""
+        if self.options.get("word_timestamps"):
+            return None
+        return json.dumps(self.options, sort_keys=True)
+
+class TranscriptionDaemon:
+    """Serve transcription requests from many clients with one model.
+
+    Args:
+        transcriber: Transcriber holding the shared model. Loaded in the
+            background by `start`.
+        max_batch_size: Maximum number of requests decoded together.
+    """
+    def __init__(self, transcriber, max_batch_size: int = 8):
+        self.transcriber = transcriber
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue[Optional[DaemonRequest]]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._thread: Optional[Thread] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for the model thread."""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Load the model in the background and start the model thread."""
+        self.transcriber.load_async(
+            lambda success: logger.info(self.transcriber.load_timings.report("Daemon model load"))
+        )
+        self._thread = Thread(target=self._run, name="daemon-model", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the model thread after the queued requests."""
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(10)
+            self._thread = None
+
+    def submit(self, audio: np.ndarray, options: Dict[str, Any]) -> DaemonRequest:
+        """Queue audio for transcription.
+
+        Args:
+            audio: 16 kHz mono float32 audio.
+            options: Keyword arguments for the backend's transcribe call.
+
+        Returns:
+            Request whose `done` event is set once it was served.
+        """
+        request = DaemonRequest(next(self._ids), audio, options)
+        self._queue.put(request)
+        return request
+
+    def health(self) -> Dict[str, Any]:
+        """Return model and queue state for clients."""
+        backend = self.transcriber.backend
+        return {
+            "status": "ok",
+            "loaded": self.transcriber.is_loaded,
+            "load_error": str(self.transcriber.load_error) if self.transcriber.load_error else None,
+            "backend": backend.name,
+            "model_size": backend.model_size,
+            "device": backend.device,
+            "compute_type": backend.compute_type,
+            "queue_depth": self.queue_depth
+        }
+
+    def _run(self) -> None:
+        """Model thread: serve queued requests, batching compatible ones."""
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            requests = [request]
+            stopping = False
+            while len(requests) < self.max_batch_size:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    stopping = True
+                    break
+                requests.append(extra)
+
+            groups: Dict[Any, List[DaemonRequest]] = {}
+            for request in requests:
+                key = request.batch_key
+                groups.setdefault(key if key is not None else id(request), []).append(request)
+            for group in groups.values():
+                self._serve(group)
+            if stopping:
+                break
+
+    def _serve(self, requests: List[DaemonRequest]) -> None:
+        """Decode one group of requests and wake their handlers."""
+        started = time.perf_counter()
+        for request in requests:
+            request.timings.add("daemon.queue wait", started - request.received_at)
+            request.batch_size = len(requests)
+        try:
+            if not self.transcriber.ready.wait(timeout=600) or not self.transcriber.is_loaded:
+                raise RuntimeError(f"Model is not available: {self.transcriber.load_error}")
+            backend = self.transcriber.backend
+            options = dict(requests[0].options)
+            # Model stages of a batch are attributed to its first request
+            with timing.activate(requests[0].timings):
+                if len(requests) == 1:
+                    results = [backend.transcribe(requests[0].audio, **options)]
+                else:
+                    results = backend.transcribe_batch([r.audio for r in requests], **options)
+            for request, result in zip(requests, results):
+                request.result = result
+        except Exception as e:
+            logger.error(f"Daemon transcription failed: {e}")
+            logger.debug(traceback.format_exc())
+            for request in requests:
+                request.error = str(e)
+        decode = time.perf_counter() - started
+        for request in requests:
+            request.timings.add("daemon.decode", decode)
+            logger.info(
+                f"Request {request.request_id}: {len(request.audio) / 16000:.2f}s audio, "
+                f"queue {request.timings.stages['daemon.queue wait']:.3f}s, "
+                f"decode {decode:.3f}s, batch {len(requests)}"
+            )
+            request.done.set()
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    """HTTP endpoints of the daemon."""
+    daemon: TranscriptionDaemon = None
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _event(self, data: Dict[str, Any]) -> None:
+        self.wfile.write((json.dumps(data) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.daemon.health())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/transcribe":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError("negative Content-Length")
+            if length > MAX_REQUEST_BYTES:
+                self._send_json(413, {"error": f"audio larger than {MAX_REQUEST_BYTES} bytes"})
+                return
+            options = parse_options(self.headers.get("X-Options", "{}"))
+            audio = np.frombuffer(self.rfile.read(length), dtype="<f4").astype(np.float32, copy=False)
+        except Exception as e:
+            self._send_json(400, {"error": f"bad request: {e}"})
+            return
+
+        request = self.daemon.submit(audio, options)
+        # HTTP/1.0 without Content-Length: events stream until the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        self._event({"event": "queued", "request_id": request.request_id, "queue_depth": self.daemon.queue_depth})
+        request.done.wait()
+        if request.error is not None:
+            self._event({"event": "error", "message": request.error})
+        else:
+            self._event({
+                "event": "result",
+                "result": result_to_dict(request.result),
+                "timings": request.timings.stages,
+                "batch_size": request.batch_size
+            })
+
+def serve(daemon: TranscriptionDaemon, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Start the daemon's model thread and create its HTTP server.
+
+    Returns:
+        Server bound to host and port; call `serve_forever` to run it.
+    """
+    if host not in ("127.0.0.1", "localhost"):
+        logger.warning(f"Daemon listening on {host}, audio may be reachable from other machines")
+    handler = type("DaemonHandler", (_DaemonHandler,), {"daemon": daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    daemon.start()
+    logger.info(f"Transcription daemon listening on http://{host}:{server.server_address[1]}")
+    return server
+
+class DaemonBackend(InferenceBackend):
+    """Client backend that sends audio to a running transcription daemon.
+
+    Args:
+        url: Base URL of the daemon, e.g. 'http://127.0.0.1:8765'.
+        timeout: Seconds to wait for the daemon's model and for each result.
+    """
+    def __init__(self, url: str, timeout: float = 120.0):
+        super().__init__("daemon", use_cuda=False)
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.name = f"daemon at {self.url}"
+
+    def _health(self) -> Dict[str, Any]:
+        with urllib.request.urlopen(f"{self.url}/health", timeout=5) as response:
+            return json.loads(response.read())
+
+    def load(self, timer: StageTimer) -> None:
+        with timer.stage("wait for daemon"):
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    health = self._health()
+                except (urllib.error.URLError, OSError) as e:
+                    raise RuntimeError(f"Transcription daemon not reachable at {self.url}: {e}")
+                if health["loaded"]:
+                    break
+                if health["load_error"]:
+                    raise RuntimeError(f"Transcription daemon failed to load its model: {health['load_error']}")
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Timed out waiting for the transcription daemon's model")
+                time.sleep(0.5)
+        self.model_size = health["model_size"]
+        self.device = health["device"]
+        self.compute_type = health["compute_type"]
+        logger.info(f"Using transcription daemon at {self.url} ({health['backend']} {self.model_size}, {self.device})")
+
+    def transcribe(self, audio, language, initial_prompt, word_timestamps=False, **options) -> TranscriptionResult:
+        options = dict(options, language=language, initial_prompt=initial_prompt, word_timestamps=word_timestamps)
+        if isinstance(options.get("temperature"), tuple):
+            options["temperature"] = list(options["temperature"])
+        request = urllib.request.Request(
+            f"{self.url}/transcribe",
+            data=np.ascontiguousarray(audio, dtype="<f4").tobytes(),
+            headers={"Content-Type": "application/octet-stream", "X-Options": json.dumps(options)},
+            method="POST"
+        )
+        with timing.stage("daemon.request"):
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                for line in response:
+                    event = json.loads(line)
+                    if event["event"] == "queued":
+                        logger.debug(f"Daemon request {event['request_id']} queued behind {event['queue_depth']}")
+                    elif event["event"] == "error":
+                        raise RuntimeError(f"Transcription daemon error: {event['message']}")
+                    elif event["event"] == "result":
+                        for name, seconds in event["timings"].items():
+                            timing.record(name, seconds)
+                        return result_from_dict(event["result"])
+        raise RuntimeError("Transcription daemon closed the connection without a result")
+
+def main(argv=None) -> int:
+    """Run the transcription daemon."""
+    from config_schema import AppConfig
+    from transcriber import Transcriber
+
+    parser = argparse.ArgumentParser(description="Share one transcription model between clients")
+    parser.add_argument("--config", type=Path, help="Configuration file, transcriber settings are used")
+    parser.add_argument("--host", help="Address to listen on (default from config)")
+    parser.add_argument("--port", type=int, help="Port to listen on (default from config)")
+    args = parser.parse_args(argv)
+
+    config = AppConfig.load(args.config)
+    setup_logging(config.log_path)
+    daemon = TranscriptionDaemon(
+        Transcriber.from_config(config.transcriber),
+        max_batch_size=config.pipeline.max_batch_size
+    )
+    server = serve(daemon, args.host or config.daemon.host, args.port or config.daemon.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping transcription daemon")
+    finally:
+        server.server_close()
+        daemon.stop()
+        daemon.transcriber.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
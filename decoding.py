@@ -0,0 +1,95 @@
+"""Decoding profiles for Hotkey Dikte application.
+
+This module defines named decoding presets that trade accuracy for latency.
+A profile sets greedy or beam search, the temperature fallback ladder that
+re-decodes a window when the output looks wrong, the thresholds that trigger
+a fallback and skipping of windows without speech.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    """Decoding settings passed to the inference backend.
+
+    Args:
+        beam_size: Beam width, or None for greedy decoding.
+        best_of: Samples drawn per fallback temperature above zero.
+        temperature: Temperatures tried in order until a decode passes the
+            thresholds. A single value disables fallback.
+        compression_ratio_threshold: Gzip ratio above which a decode is
+            treated as repetitive and retried.
+        logprob_threshold: Average log probability below which a decode is
+            retried.
+        no_speech_threshold: No-speech probability above which a window is
+            skipped when its log probability is also low.
+        condition_on_previous_text: Feed the previous window's text as prompt.
+    """
+    beam_size: Optional[int] = None
+    best_of: Optional[int] = None
+    temperature: Tuple[float, ...] = (0.0,)
+    compression_ratio_threshold: Optional[float] = 2.4
+    logprob_threshold: Optional[float] = -1.0
+    no_speech_threshold: Optional[float] = 0.6
+    condition_on_previous_text: bool = False
+
+    def options(self) -> Dict[str, Any]:
+        """Return the profile as keyword arguments for a backend."""
+        return asdict(self)
+
+DECODING_PROFILES: Dict[str, DecodingProfile] = {
+    # One greedy pass per window, never retried
+    "fast": DecodingProfile(),
+    # Greedy first, with a short fallback ladder for bad windows
+    "balanced": DecodingProfile(best_of=3, temperature=(0.0, 0.4, 0.8)),
+    # Whisper's own transcribe() defaults: greedy at 0, one sample per
+    # fallback temperature, as the model was called before profiles existed
+    "standard": DecodingProfile(
+        temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        condition_on_previous_text=True
+    ),
+    # The standard settings with beam search and best-of-5 sampling
+    "accurate": DecodingProfile(
+        beam_size=5,
+        best_of=5,
+        temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        condition_on_previous_text=True
+    ),
+}
+
+def get_profile(name: str) -> DecodingProfile:
+    """Look up a decoding profile by name.
+
+    Raises:
+        ValueError: If the profile does not exist.
+    """
+    try:
+        return DECODING_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown decoding profile '{name}', expected one of {list(DECODING_PROFILES)}")
+
+def count_decode_passes(segments: Iterable, temperatures: Iterable[float]) -> int:
+    """Infer how many decode passes a transcription took.
+
+    Every 30 second window is decoded at the first temperature and retried
+    at the next one until it passes, so the temperature a window was
+    accepted at tells how many passes it needed. Windows skipped as silence
+    are not counted.
+
+    Args:
+        segments: Segments with `seek` and `temperature` attributes.
+        temperatures: Fallback ladder used for the transcription.
+
+    Returns:
+        Total number of decode passes.
+    """
+    ladder = list(temperatures)
+    accepted = {}
+    for segment in segments:
+        accepted[segment.seek] = segment.temperature
+    passes = 0
+    for temperature in accepted.values():
+        matches = [i for i, t in enumerate(ladder) if abs(t - temperature) < 1e-6]
+        passes += matches[0] + 1 if matches else 1
+    return passes
@@ -0,0 +1,160 @@
+"""Accuracy evaluation for Hotkey Dikte application.
+
+This module computes word error rates and checks that a faster model
+configuration (for example int8 quantization) stays within an accuracy
+threshold of a reference configuration on the same audio.
+
+Usage:
+    python evaluation.py clips/ --model-size small --candidate-compute-type int8 --max-wer 0.05
+"""
+
+import argparse
+import re
+import sys
+import wave
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from preprocess import to_float32
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+def normalize_text(text: str) -> List[str]:
+    """Lowercase text, drop punctuation and split it into words."""
+    return re.sub(r"[^\w\s]", " ", text.lower()).split()
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Compute the word error rate of a hypothesis against a reference.
+
+    Args:
+        reference: Reference transcript.
+        hypothesis: Transcript to score.
+
+    Returns:
+        (substitutions + deletions + insertions) / reference word count.
+    """
+    ref = normalize_text(reference)
+    hyp = normalize_text(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    # Single-row Levenshtein distance over words
+    distances = np.arange(len(hyp) + 1)
+    for i, ref_word in enumerate(ref, start=1):
+        previous_diagonal, distances[0] = distances[0], i
+        for j, hyp_word in enumerate(hyp, start=1):
+            cost = 0 if ref_word == hyp_word else 1
+            previous_diagonal, distances[j] = distances[j], min(
+                distances[j] + 1,
+                distances[j - 1] + 1,
+                previous_diagonal + cost
+            )
+    return float(distances[-1]) / len(ref)
+
+def load_wav(path: Path) -> Tuple[np.ndarray, int]:
+    """Read a PCM WAV file as float32 samples.
+
+    Args:
+        path: Path to a 16-bit or 32-bit PCM WAV file.
+
+    Returns:
+        Tuple of samples shaped (frames, channels) in [-1, 1] and sample rate.
+    """
+    with wave.open(str(path), "rb") as wav:
+        sample_width = wav.getsampwidth()
+        channels = wav.getnchannels()
+        sample_rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+    if sample_width not in dtypes:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+    samples = np.frombuffer(raw, dtype=dtypes[sample_width]).reshape(-1, channels)
+    return to_float32(samples), sample_rate
+
+def find_clips(directory: Path) -> Iterable[Tuple[Path, str]]:
+    """Yield WAV files in a directory with their reference transcripts.
+
+    A reference transcript is a `.txt` file with the same stem. Clips without
+    one get an empty reference.
+    """
+    for wav_path in sorted(Path(directory).glob("*.wav")):
+        txt_path = wav_path.with_suffix(".txt")
+        reference = txt_path.read_text(encoding="utf-8").strip() if txt_path.exists() else ""
+        yield wav_path, reference
+
+def compare_transcribers(reference, candidate, clips: Iterable[Tuple[Path, str]]) -> Dict[str, float]:
+    """Measure the accuracy loss of a candidate transcriber.
+
+    When a clip has a reference transcript both transcribers are scored
+    against it; otherwise the reference transcriber's output is used as the
+    ground truth.
+
+    Args:
+        reference: Transcriber with the baseline configuration.
+        candidate: Transcriber with the configuration under test.
+        clips: Pairs of WAV path and reference transcript.
+
+    Returns:
+        Mean WER of both transcribers and their difference.
+    """
+    reference_wers, candidate_wers = [], []
+    for wav_path, transcript in clips:
+        audio, sample_rate = load_wav(wav_path)
+        reference_text = reference.transcribe(audio, sample_rate) or ""
+        candidate_text = candidate.transcribe(audio, sample_rate) or ""
+        truth = transcript or reference_text
+        reference_wers.append(word_error_rate(truth, reference_text))
+        candidate_wers.append(word_error_rate(truth, candidate_text))
+        logger.debug(f"{wav_path.name}: reference '{reference_text}' | candidate '{candidate_text}'")
+
+    reference_wer = float(np.mean(reference_wers)) if reference_wers else 0.0
+    candidate_wer = float(np.mean(candidate_wers)) if candidate_wers else 0.0
+    return {
+        "clips": len(reference_wers),
+        "reference_wer": reference_wer,
+        "candidate_wer": candidate_wer,
+        "wer_delta": candidate_wer - reference_wer
+    }
+
+def main(argv=None) -> int:
+    """Compare a candidate precision against fp32 and check the WER delta."""
+    from transcriber import Transcriber
+    from config_schema import TranscriberConfig
+
+    parser = argparse.ArgumentParser(description="Check accuracy loss of a model configuration")
+    parser.add_argument("clips", type=Path, help="Directory of WAV files with optional .txt references")
+    parser.add_argument("--model-size", default="small")
+    parser.add_argument("--backend", default="whisper")
+    parser.add_argument("--reference-compute-type", default="float32")
+    parser.add_argument("--candidate-compute-type", default="int8")
+    parser.add_argument("--max-wer", type=float, default=0.05, help="Maximum allowed WER increase")
+    args = parser.parse_args(argv)
+
+    defaults = TranscriberConfig()
+    transcribers = []
+    for compute_type in (args.reference_compute_type, args.candidate_compute_type):
+        transcriber = Transcriber(
+            model_size=args.model_size,
+            language=defaults.language,
+            initial_prompt=defaults.initial_prompt,
+            use_cuda=False,
+            backend=args.backend,
+            compute_type=compute_type
+        )
+        transcriber.load()
+        transcribers.append(transcriber)
+
+    result = compare_transcribers(*transcribers, find_clips(args.clips))
+    passed = result["wer_delta"] <= args.max_wer
+    print(
+        f"{args.candidate_compute_type} vs {args.reference_compute_type} on {result['clips']} clips: "
+        f"WER {result['candidate_wer']:.3f} vs {result['reference_wer']:.3f} "
+        f"(delta {result['wer_delta']:+.3f}, limit {args.max_wer:.3f}) -> {'PASS' if passed else 'FAIL'}"
+    )
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
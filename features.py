@@ -0,0 +1,331 @@
+"""Incremental log-mel features for Hotkey Dikte application.
+
+Whisper computes the log-mel spectrogram of a whole recording only after it
+ended, which puts the STFT on the critical path between releasing the hotkey
+and seeing text. `MelStream` computes the spectrogram frames while the user
+is still speaking, on a helper thread reading a ring the audio callback
+fills, so only a handful of frames at the end and the global normalization
+are left when the recording stops.
+
+The frames follow `whisper.audio.log_mel_spectrogram` as used by
+`whisper.transcribe`: a 400-sample Hann window every 160 samples, reflect
+padding at the start, 30 seconds of zero padding at the end, log10 of the
+mel power clamped at 1e-10, and dynamic range compression to 8 (log10 units)
+below the loudest frame.
+"""
+
+import traceback
+from threading import Event, Lock, Thread
+from typing import List, Optional
+
+import numpy as np
+
+from capture import CaptureBuffer
+from preprocess import TARGET_SAMPLE_RATE, to_float32, to_mono
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+N_FFT = 400
+HOP_LENGTH = 160
+# log10 of the power floor, the value of frames of pure zero padding
+LOG_FLOOR = -10.0
+# Precomputed features are decoded as a single model window
+MAX_FEATURE_SECONDS = 30.0
+
+_WINDOW = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(N_FFT) / N_FFT)).astype(np.float32)
+
+def _log_mel_frames(windows: np.ndarray, filters: np.ndarray) -> np.ndarray:
+    """Unnormalized log-mel values of windows shaped (n_frames, N_FFT).
+
+    Returns:
+        Array shaped (n_frames, n_mels).
+    """
+    if not len(windows):
+        return np.zeros((0, filters.shape[0]), dtype=np.float32)
+    spectrum = np.fft.rfft(windows * _WINDOW, axis=1)
+    power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+    mel = power @ filters.T
+    return np.log10(np.maximum(mel, 1e-10))
+
+def _windows(padded: np.ndarray, first: int, count: int) -> np.ndarray:
+    """View of `count` analysis windows of a padded signal from frame `first`."""
+    if count <= 0:
+        return np.zeros((0, N_FFT), dtype=np.float32)
+    start = first * HOP_LENGTH
+    return np.lib.stride_tricks.sliding_window_view(
+        padded[start:start + (count - 1) * HOP_LENGTH + N_FFT], N_FFT
+    )[::HOP_LENGTH]
+
+def _pad(audio: np.ndarray) -> np.ndarray:
+    """Reflect-pad the start and zero-pad the end like Whisper's STFT."""
+    head = np.pad(audio, (0, max(0, N_FFT // 2 + 1 - len(audio))))[1:N_FFT // 2 + 1][::-1]
+    return np.concatenate([head, audio, np.zeros(N_FFT, dtype=np.float32)]).astype(np.float32, copy=False)
+
+def _tail_frames(audio: np.ndarray) -> range:
+    """Frames after the content that still overlap the audio.
+
+    They are not part of the model input but take part in the normalization.
+    """
+    n_samples = len(audio)
+    return range(n_samples // HOP_LENGTH, (n_samples + N_FFT // 2) // HOP_LENGTH + 1)
+
+def normalize(log_mel: np.ndarray, ceiling: float) -> np.ndarray:
+    """Apply Whisper's dynamic range compression and scaling.
+
+    Args:
+        log_mel: Unnormalized frames shaped (n_frames, n_mels).
+        ceiling: Maximum log-mel value of the whole padded signal.
+
+    Returns:
+        Model input shaped (n_mels, n_frames).
+    """
+    return ((np.maximum(log_mel, ceiling - 8.0) + 4.0) / 4.0).T.astype(np.float32)
+
+def log_mel_spectrogram(audio: np.ndarray, filters: np.ndarray) -> np.ndarray:
+    """Compute the log-mel features of a whole clip at once.
+
+    Args:
+        audio: 16 kHz mono float32 audio.
+        filters: Mel filter bank shaped (n_mels, N_FFT // 2 + 1).
+
+    Returns:
+        Features shaped (n_mels, len(audio) // HOP_LENGTH), as the content
+        frames of `whisper.transcribe` before they are padded to 30 seconds.
+    """
+    padded = _pad(audio)
+    tail = _tail_frames(audio)
+    frames = _log_mel_frames(_windows(padded, 0, tail.stop), filters)
+    ceiling = max(float(frames.max()) if len(frames) else LOG_FLOOR, LOG_FLOOR)
+    return normalize(frames[:tail.start], ceiling)
+
+class MelFeatures:
+    """Log-mel frames of a finished recording.
+
+    Args:
+        n_samples: Number of 16 kHz mono samples the frames were computed from.
+        frames: Unnormalized log-mel frames shaped (n_frames, n_mels) for
+            every frame whose window lies inside the audio.
+        filters: Mel filter bank, used for frames that must be recomputed.
+    """
+    def __init__(self, n_samples: int, frames: np.ndarray, filters: np.ndarray):
+        self.n_samples = n_samples
+        self.frames = frames
+        self.filters = filters
+
+    def for_speech(self, speech: np.ndarray, kept: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the model features of the audio, or of a part of it.
+
+        Frames whose window lies inside one contiguous kept region are taken
+        from the precomputed frames; only frames at the edges and around cut
+        pauses are recomputed from `speech`.
+
+        Args:
+            speech: Audio to be transcribed, the recording or its kept samples.
+            kept: Index into the recording of every sample of `speech`, or
+                None if `speech` is the whole recording.
+
+        Returns:
+            Features shaped (n_mels, len(speech) // HOP_LENGTH), equal to
+            `log_mel_spectrogram(speech, filters)`.
+        """
+        if not len(speech):
+            return np.zeros((self.filters.shape[0], 0), dtype=np.float32)
+        n_samples = len(speech)
+        tail = _tail_frames(speech)
+        centers = np.arange(tail.stop) * HOP_LENGTH
+        half = N_FFT // 2
+        inside = (centers >= half) & (centers + half <= n_samples)
+        reuse = np.zeros(tail.stop, dtype=bool)
+        source = np.zeros(tail.stop, dtype=np.int64)
+        if kept is None:
+            reuse[inside] = True
+            source = centers // HOP_LENGTH
+        else:
+            starts = kept[np.where(inside, centers - half, 0)]
+            ends = kept[np.where(inside, centers + half - 1, 0)]
+            origin = kept[np.where(inside, centers, 0)]
+            reuse = inside & (ends - starts == N_FFT - 1) & (origin % HOP_LENGTH == 0)
+            source = origin // HOP_LENGTH
+        reuse &= source < len(self.frames)
+
+        log_mel = np.empty((tail.stop, self.filters.shape[0]), dtype=np.float32)
+        log_mel[reuse] = self.frames[source[reuse]]
+        recompute = np.flatnonzero(~reuse)
+        if len(recompute):
+            padded = _pad(speech)
+            windows = np.stack([padded[i * HOP_LENGTH:i * HOP_LENGTH + N_FFT] for i in recompute])
+            log_mel[recompute] = _log_mel_frames(windows, self.filters)
+        ceiling = max(float(log_mel.max()) if len(log_mel) else LOG_FLOOR, LOG_FLOOR)
+        return normalize(log_mel[:tail.start], ceiling)
+
+class _Ring:
+    """Preallocated sample ring shared by the audio callback and the helper thread.
+
+    The callback is the only writer: it copies a block in and then publishes
+    the new total in `written`. The helper reads up to the published total and
+    checks afterwards that the callback did not wrap over what it read.
+    """
+    def __init__(self, capacity: int, channels: int, dtype):
+        self.data = np.empty((capacity, channels), dtype=dtype)
+        self.written = 0
+        self.command: Optional[str] = None
+        self.wake = Event()
+        self.result: Optional[MelFeatures] = None
+
+    def write(self, block: np.ndarray) -> None:
+        """Copy a block in; called from the audio callback."""
+        n, capacity = len(block), len(self.data)
+        if n <= capacity:
+            start = self.written % capacity
+            first = min(n, capacity - start)
+            self.data[start:start + first] = block[:first]
+            self.data[:n - first] = block[first:]
+        # A block larger than the ring is an overrun the reader detects
+        self.written += n
+
+    def read(self, start: int, end: int) -> Optional[np.ndarray]:
+        """Copy samples [start, end) out, or return None if they were overwritten."""
+        capacity = len(self.data)
+        if end - start > capacity:
+            return None
+        begin = start % capacity
+        if begin + (end - start) <= capacity:
+            samples = self.data[begin:begin + end - start].copy()
+        else:
+            samples = np.concatenate([self.data[begin:], self.data[:end - start - (capacity - begin)]])
+        # The writer may have wrapped over the copied samples meanwhile
+        return samples if self.written - start <= capacity else None
+
+class MelStream:
+    """Compute log-mel frames of a recording while it is being captured.
+
+    `feed` is called from the audio callback and only copies the block into a
+    preallocated ring, without locks or allocation; a helper thread polls the
+    ring, downmixes new samples and computes every frame whose window is
+    complete. `finish` wakes the thread to catch up and returns the frames.
+    The input must already be at 16 kHz. If the helper falls more than the
+    ring's length behind, the recording's frames are abandoned and the
+    pipeline computes them after the recording instead.
+
+    Args:
+        filters: Mel filter bank of the model, shaped (n_mels, N_FFT // 2 + 1).
+        ring_seconds: Capacity of the ring in seconds of audio.
+        poll_interval: Seconds between checks of the ring for new samples.
+    """
+    def __init__(self, filters: np.ndarray, ring_seconds: float = 10.0, poll_interval: float = 0.05):
+        self.filters = np.asarray(filters, dtype=np.float32)
+        self.ring_seconds = ring_seconds
+        self.poll_interval = poll_interval
+        self._lock = Lock()
+        self._ring: Optional[_Ring] = None
+        self._thread: Optional[Thread] = None
+
+    @property
+    def n_mels(self) -> int:
+        """Number of mel bands."""
+        return self.filters.shape[0]
+
+    def start(self, channels: int = 1, dtype=np.float32) -> None:
+        """Begin the frames of a new recording, discarding an unfinished one.
+
+        Args:
+            channels: Channels of the blocks that will be fed.
+            dtype: Sample type of the blocks that will be fed.
+        """
+        with self._lock:
+            self._stop_thread()
+            self._ring = _Ring(int(self.ring_seconds * TARGET_SAMPLE_RATE), channels, dtype)
+            self._thread = Thread(target=self._run, args=(self._ring,), name="mel-features", daemon=True)
+            self._thread.start()
+
+    def feed(self, block: np.ndarray) -> None:
+        """Copy an input block into the ring; called from the audio callback.
+
+        Args:
+            block: Samples shaped (frames, channels) at 16 kHz, with the
+                channels and dtype given to `start`.
+        """
+        ring = self._ring
+        if ring is not None:
+            ring.write(block)
+
+    def finish(self) -> Optional[MelFeatures]:
+        """Complete the frames of the current recording.
+
+        Must be called after the last `feed` of the recording returned.
+
+        Returns:
+            The recording's frames, or None if no recording was started or
+            computing them failed.
+        """
+        with self._lock:
+            ring, thread = self._ring, self._thread
+            self._ring = self._thread = None
+        if ring is None:
+            return None
+        ring.command = "finish"
+        ring.wake.set()
+        thread.join()
+        return ring.result
+
+    def cancel(self) -> None:
+        """Discard the current recording's frames."""
+        with self._lock:
+            self._stop_thread()
+
+    def _stop_thread(self) -> None:
+        """End the helper thread of an unfinished recording."""
+        if self._ring is not None:
+            self._ring.command = "cancel"
+            self._ring.wake.set()
+            self._thread.join()
+        self._ring = self._thread = None
+
+    def _run(self, ring: _Ring) -> None:
+        """Poll the ring and compute the frames that became complete."""
+        half = N_FFT // 2
+        # Reflect padding followed by the audio, grown geometrically
+        padded = CaptureBuffer(channels=1, initial_capacity=30 * TARGET_SAMPLE_RATE)
+        # Samples received before the reflect padding can be built
+        head: List[np.ndarray] = []
+        frames: List[np.ndarray] = []
+        n_frames = 0
+        read = 0
+        try:
+            while True:
+                ring.wake.wait(self.poll_interval)
+                command = ring.command
+                if command == "cancel":
+                    return
+                written = ring.written
+                if written > read:
+                    block = ring.read(read, written)
+                    if block is None:
+                        logger.warning("Log-mel features fell behind the recording, computing them after it")
+                        return
+                    read = written
+                    samples = to_mono(to_float32(block))
+                    if len(padded):
+                        padded.write(samples.reshape(-1, 1))
+                    else:
+                        head.append(samples)
+                        if sum(len(h) for h in head) > half:
+                            samples = np.concatenate(head)
+                            head = []
+                            padded.write(samples[1:half + 1][::-1].reshape(-1, 1))
+                            padded.write(samples.reshape(-1, 1))
+                    signal = padded.view().reshape(-1)
+                    available = (len(signal) - N_FFT) // HOP_LENGTH + 1 - n_frames
+                    if available > 0:
+                        frames.append(_log_mel_frames(_windows(signal, n_frames, available), self.filters))
+                        n_frames += available
+                if command == "finish":
+                    break
+
+            n_samples = max(len(padded) - half, 0) + sum(len(h) for h in head)
+            log_mel = np.concatenate(frames) if frames else np.zeros((0, self.n_mels), dtype=np.float32)
+            ring.result = MelFeatures(n_samples, log_mel, self.filters)
+        except Exception as e:
+            logger.error(f"Error computing log-mel features: {e}")
+            logger.debug(traceback.format_exc())
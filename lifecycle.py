@@ -0,0 +1,179 @@
+"""Model lifecycle management for Hotkey Dikte application.
+
+This module unloads the transcription model when nobody has dictated for a
+while, or when the machine runs low on memory, and loads it again as soon as
+the user starts a recording, so the reload overlaps with speaking.
+"""
+
+import time
+import traceback
+from threading import Event, Thread
+from typing import Callable, Optional
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+def available_memory_mb() -> Optional[float]:
+    """Memory the system can give to new allocations without swapping, in MB.
+
+    Uses the optional `psutil` package, or /proc/meminfo on Linux.
+
+    Returns:
+        Available memory, or None if it cannot be determined.
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def process_memory_mb() -> Optional[float]:
+    """Resident memory of this process in MB, if it can be measured."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        import resource
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except (ImportError, OSError, ValueError, IndexError):
+        return None
+
+class ModelLifecycle:
+    """Unload an idle transcriber's model and reload it on demand.
+
+    A monitor thread checks every `check_interval` seconds. The model is
+    unloaded when it has not been used for `idle_timeout` seconds, or when
+    available system memory drops below `min_free_memory_mb`, but never while
+    `is_busy` reports work in progress.
+
+    Args:
+        transcriber: Transcriber whose model is managed.
+        idle_timeout: Seconds without transcription before unloading, 0 to
+            never unload for idleness.
+        min_free_memory_mb: Available memory below which the model is
+            unloaded, 0 to ignore memory pressure.
+        check_interval: Seconds between checks.
+        is_busy: Returns True while a recording or transcription is running.
+        status_callback: Called with 'unloaded' after eviction and 'loaded'
+            after a reload.
+    """
+    def __init__(
+        self,
+        transcriber,
+        idle_timeout: float = 0.0,
+        min_free_memory_mb: float = 0.0,
+        check_interval: float = 30.0,
+        is_busy: Callable[[], bool] = lambda: False,
+        status_callback: Optional[Callable[[str], None]] = None
+    ):
+        self.transcriber = transcriber
+        self.idle_timeout = idle_timeout
+        self.min_free_memory_mb = min_free_memory_mb
+        self.check_interval = check_interval
+        self.is_busy = is_busy
+        self._status_callback = status_callback
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self.evictions = 0
+        self.reloads = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any unload condition is configured."""
+        return self.idle_timeout > 0 or self.min_free_memory_mb > 0
+
+    def start(self) -> None:
+        """Start the monitor thread if an unload condition is configured."""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        if self.min_free_memory_mb > 0 and available_memory_mb() is None:
+            logger.warning("Available memory cannot be measured here, memory budget is ignored")
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="model-lifecycle", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the monitor thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(5)
+            self._thread = None
+
+    def preload(self) -> None:
+        """Start reloading an unloaded model, e.g. when a recording starts."""
+        start = time.perf_counter()
+
+        def loaded(success: bool) -> None:
+            if success:
+                self.reloads += 1
+                logger.info(f"Model reloaded in {time.perf_counter() - start:.2f}s")
+            else:
+                logger.error("Model failed to reload")
+            self._update_status("loaded")
+
+        if self.transcriber.reload_async(loaded) is not None:
+            logger.info("Reloading model for the new recording")
+
+    def check(self) -> Optional[str]:
+        """Unload the model if an unload condition holds.
+
+        Returns:
+            The reason the model was unloaded, or None.
+        """
+        if not self.transcriber.is_loaded or self.is_busy():
+            return None
+        idle = time.monotonic() - self.transcriber.last_used
+        reason = None
+        if self.idle_timeout > 0 and idle >= self.idle_timeout:
+            reason = f"idle for {idle / 60:.1f} min"
+        elif self.min_free_memory_mb > 0:
+            available = available_memory_mb()
+            if available is not None and available < self.min_free_memory_mb:
+                reason = f"only {available:.0f} MB memory available"
+        if reason is None:
+            return None
+        self.evict(reason)
+        return reason
+
+    def evict(self, reason: str) -> None:
+        """Unload the model and report what it freed.
+
+        Args:
+            reason: Why the model is unloaded, for the log.
+        """
+        before = available_memory_mb()
+        start = time.perf_counter()
+        if not self.transcriber.unload():
+            return
+        seconds = time.perf_counter() - start
+        after = available_memory_mb()
+        self.evictions += 1
+        freed = f", {after - before:.0f} MB freed" if before is not None and after is not None else ""
+        logger.info(f"Model unloaded ({reason}) in {seconds:.2f}s{freed}")
+        self._update_status("unloaded")
+
+    def _update_status(self, status: str) -> None:
+        """Update status through callback if set."""
+        if self._status_callback:
+            self._status_callback(status)
+
+    def _run(self) -> None:
+        """Monitor loop."""
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error managing model lifecycle: {e}")
+                logger.debug(traceback.format_exc())
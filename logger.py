@@ -1,7 +1,9 @@
 """Logging configuration for Hotkey Dikte application.
 
 This module sets up structured logging using Loguru with proper formatting,
-log rotation, and log level configuration.
+log rotation, and log level configuration. Sinks are queued, so logging only
+enqueues the message and the writes, rotation and compression happen on
+Loguru's worker thread, never on the audio thread.
 """
 
 from pathlib import Path
@@ -21,7 +23,8 @@ def setup_logging(log_path: Path = None) -> None:
     logger.add(
         sys.stderr,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level="INFO"
+        level="INFO",
+        enqueue=True
     )
 
     # Add file handler if log_path is provided
@@ -33,7 +36,8 @@ def setup_logging(log_path: Path = None) -> None:
             retention="1 week",
             compression="zip",
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-            level="DEBUG"
+            level="DEBUG",
+            enqueue=True
         )
 
 def get_logger(name: str = __name__):
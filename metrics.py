@@ -0,0 +1,116 @@
+"""Dictation timing metrics for Hotkey Dikte application.
+
+This module keeps a rolling in-memory history of per-stage timings for every
+dictation and exports it to a local metrics file, either as one JSON line per
+dictation or as a Prometheus textfile-collector histogram.
+"""
+
+import json
+import time
+from collections import deque
+from pathlib import Path
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from timing import StageTimer
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Histogram bucket upper bounds in seconds for the Prometheus export
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class MetricsRegistry:
+    """Rolling per-stage timing history with optional file export.
+
+    Args:
+        history_size: Number of recent dictations kept per stage.
+        export_path: File to write metrics to, or None to keep them in memory.
+        export_format: 'jsonl' to append one record per dictation, or
+            'prometheus' to rewrite a textfile-collector histogram.
+    """
+    def __init__(self, history_size: int = 200, export_path: Optional[Path] = None, export_format: str = "jsonl"):
+        self.history_size = history_size
+        self.export_path = Path(export_path) if export_path else None
+        self.export_format = export_format
+        self._history: Dict[str, Deque[float]] = {}
+        self._count = 0
+        self._lock = Lock()
+
+    def record(self, timer: StageTimer, **fields: Any) -> None:
+        """Store the stage timings of one dictation.
+
+        Args:
+            timer: Timer holding the dictation's stages. Its elapsed time is
+                recorded as the 'total' stage.
+            **fields: Extra values for the exported record, e.g. job id.
+        """
+        stages = dict(timer.stages)
+        stages["total"] = timer.elapsed
+        with self._lock:
+            self._count += 1
+            for name, seconds in stages.items():
+                self._history.setdefault(name, deque(maxlen=self.history_size)).append(seconds)
+
+        logger.debug(timer.report(f"Dictation {fields.get('job_id', self._count)}"))
+        if self.export_path:
+            try:
+                self._export(stages, fields)
+            except Exception as e:
+                logger.warning(f"Failed to export metrics to {self.export_path}: {e}")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return count, mean, p50 and p95 in seconds for every stage."""
+        with self._lock:
+            history = {name: list(values) for name, values in self._history.items()}
+        return {
+            name: {
+                "count": len(values),
+                "mean": float(np.mean(values)),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95))
+            }
+            for name, values in history.items() if values
+        }
+
+    def summary_lines(self) -> List[str]:
+        """Format the summary as short lines for display in the tray menu."""
+        summary = self.summary()
+        if not summary:
+            return ["Belum ada data"]
+        return [
+            f"{name}: p50 {s['p50'] * 1000:.0f} ms, p95 {s['p95'] * 1000:.0f} ms"
+            for name, s in summary.items()
+        ]
+
+    def _export(self, stages: Dict[str, float], fields: Dict[str, Any]) -> None:
+        """Write the latest record or the whole histogram to the export file."""
+        self.export_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.export_format == "prometheus":
+            tmp_path = self.export_path.with_suffix(".tmp")
+            tmp_path.write_text(self._prometheus_text(), encoding="utf-8")
+            # Atomic replace so the node exporter never reads a partial file
+            tmp_path.replace(self.export_path)
+        else:
+            record = {"timestamp": time.time(), **fields, "stages": stages}
+            with open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def _prometheus_text(self) -> str:
+        """Render the rolling history as a Prometheus histogram."""
+        with self._lock:
+            history = {name: list(values) for name, values in self._history.items()}
+        lines = [
+            "# HELP hotkey_dikte_stage_seconds Duration of dictation stages over recent dictations.",
+            "# TYPE hotkey_dikte_stage_seconds histogram"
+        ]
+        for name, values in history.items():
+            values = np.asarray(values)
+            for bound in BUCKETS:
+                lines.append(f'hotkey_dikte_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {int(np.sum(values <= bound))}')
+            lines.append(f'hotkey_dikte_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {len(values)}')
+            lines.append(f'hotkey_dikte_stage_seconds_sum{{stage="{name}"}} {float(values.sum()):.6f}')
+            lines.append(f'hotkey_dikte_stage_seconds_count{{stage="{name}"}} {len(values)}')
+        return "\n".join(lines) + "\n"
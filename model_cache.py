@@ -0,0 +1,107 @@
+"""Cache of loaded models for Hotkey Dikte application.
+
+This module keeps recently used models loaded after the user switches to
+another one, so switching back is instant. The cache is bounded by the number
+of loaded models and by their total memory; the least recently used model is
+released first.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Approximate resident memory of the fp32 models in MB, used when the memory
+# a model took could not be measured
+MODEL_MEMORY_MB = {
+    "tiny": 150,
+    "base": 300,
+    "small": 1000,
+    "medium": 3000,
+    "large": 6000
+}
+
+def estimate_memory_mb(model_size: str) -> float:
+    """Approximate memory of a model size, erring on the large side."""
+    return float(MODEL_MEMORY_MB.get(model_size, MODEL_MEMORY_MB["large"]))
+
+class ModelCache:
+    """LRU cache of loaded inference backends not currently in use.
+
+    Args:
+        max_models: Maximum number of loaded models, counting the one in use.
+        max_memory_mb: Maximum total memory of the loaded models, counting
+            the one in use; 0 for no limit.
+    """
+    def __init__(self, max_models: int = 2, max_memory_mb: float = 0.0):
+        self.max_models = max_models
+        self.max_memory_mb = max_memory_mb
+        self._entries: "OrderedDict[str, Tuple[object, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def memory_mb(self) -> float:
+        """Total memory of the cached models."""
+        return sum(memory for _, memory in self._entries.values())
+
+    def keys(self) -> List[str]:
+        """Cached model keys from least to most recently used."""
+        with self._lock:
+            return list(self._entries)
+
+    def take(self, key: str) -> Optional[Tuple[object, float]]:
+        """Remove a model from the cache to use it.
+
+        Returns:
+            The loaded backend and its memory in MB, or None if not cached.
+        """
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def put(self, key: str, backend, memory_mb: float, active_memory_mb: float = 0.0) -> None:
+        """Keep a loaded model that is no longer in use.
+
+        Least recently used models are released until the cache fits next to
+        the model in use. A model that does not fit on its own is released
+        right away.
+
+        Args:
+            key: Model key, e.g. the model size.
+            backend: Loaded backend.
+            memory_mb: Memory the model takes.
+            active_memory_mb: Memory of the model in use.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (backend, memory_mb)
+            released = []
+            while self._entries and (
+                len(self._entries) > self.max_models - 1
+                or (self.max_memory_mb and self.memory_mb + active_memory_mb > self.max_memory_mb)
+            ):
+                released.append(self._entries.popitem(last=False))
+        for old_key, (old_backend, old_memory) in released:
+            self._release(old_key, old_backend, old_memory)
+
+    def clear(self) -> None:
+        """Release every cached model."""
+        with self._lock:
+            released = list(self._entries.items())
+            self._entries.clear()
+        for key, (backend, memory) in released:
+            self._release(key, backend, memory)
+
+    @staticmethod
+    def _release(key: str, backend, memory_mb: float) -> None:
+        """Free a model's memory."""
+        try:
+            backend.unload()
+            logger.info(f"Released cached model '{key}' (~{memory_mb:.0f} MB)")
+        except Exception as e:
+            logger.error(f"Error releasing cached model '{key}': {e}")
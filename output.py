@@ -0,0 +1,256 @@
+"""Text output for Hotkey Dikte application.
+
+This module injects transcribed text into the focused window. Typing one
+synthetic keystroke per character is slow for long dictations, so text is
+pasted through the clipboard in a single operation when possible, with
+chunked typing as fallback. Sinks are tried from fastest to slowest and a
+sink that fails is skipped for later dictations.
+"""
+
+import os
+import sys
+import time
+from threading import Lock, Timer
+from typing import List, Optional
+
+import timing
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+class TextSink:
+    """Base class for a method of injecting text into the focused window."""
+    name = "base"
+
+    def available(self) -> bool:
+        """Return whether this sink can be used on this system."""
+        return True
+
+    def write(self, text: str) -> None:
+        """Inject text into the focused window.
+
+        Args:
+            text: Text to inject.
+        """
+        raise NotImplementedError
+
+    def erase(self, count: int) -> None:
+        """Delete characters before the cursor with backspace.
+
+        Args:
+            count: Number of characters to delete.
+        """
+        import keyboard
+
+        for _ in range(count):
+            keyboard.send("backspace")
+
+class ClipboardPasteSink(TextSink):
+    """Paste text through the clipboard, restoring its previous contents.
+
+    Requires the optional `pyperclip` package. Only text clipboard contents
+    can be restored.
+
+    Args:
+        paste_hotkey: Key combination that pastes in the target window.
+        restore: Whether to put the previous clipboard text back.
+        restore_delay: Seconds to wait before restoring, so the target
+            window has read the clipboard.
+    """
+    name = "clipboard"
+
+    def __init__(self, paste_hotkey: Optional[str] = None, restore: bool = True, restore_delay: float = 0.3):
+        self.paste_hotkey = paste_hotkey or ("command+v" if sys.platform == "darwin" else "ctrl+v")
+        self.restore = restore
+        self.restore_delay = restore_delay
+        self._lock = Lock()
+        self._saved: Optional[str] = None
+        self._restore_timer: Optional[Timer] = None
+        self._pastes = 0
+
+    def available(self) -> bool:
+        try:
+            import pyperclip
+            pyperclip.paste()
+            return True
+        except Exception as e:
+            logger.debug(f"Clipboard output unavailable: {e}")
+            return False
+
+    def write(self, text: str) -> None:
+        import keyboard
+        import pyperclip
+
+        with self._lock:
+            if self._restore_timer is not None:
+                # A previous paste is still waiting to restore, so the
+                # clipboard holds our own text rather than the user's
+                self._restore_timer.cancel()
+            elif self.restore:
+                self._saved = pyperclip.paste()
+            pyperclip.copy(text)
+            keyboard.send(self.paste_hotkey)
+            self._pastes += 1
+            if self.restore:
+                self._restore_timer = Timer(self.restore_delay, self._restore_clipboard, args=(self._pastes,))
+                self._restore_timer.daemon = True
+                self._restore_timer.start()
+
+    def _restore_clipboard(self, paste: int) -> None:
+        """Put the saved clipboard text back unless another paste followed.
+
+        Args:
+            paste: Number of the paste that scheduled this restore.
+        """
+        import pyperclip
+
+        with self._lock:
+            if paste != self._pastes:
+                return
+            self._restore_timer = None
+            saved, self._saved = self._saved, None
+            try:
+                pyperclip.copy(saved or "")
+            except Exception as e:
+                logger.warning(f"Failed to restore clipboard: {e}")
+
+class ChunkedTypingSink(TextSink):
+    """Type text as synthetic key events in chunks.
+
+    Each chunk is sent without per-key delay; a short pause between chunks
+    keeps slow target windows from dropping input.
+
+    Args:
+        chunk_size: Characters per chunk.
+        chunk_pause: Seconds to pause between chunks.
+    """
+    name = "typing"
+
+    def __init__(self, chunk_size: int = 64, chunk_pause: float = 0.005):
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause
+
+    def available(self) -> bool:
+        try:
+            import keyboard  # noqa: F401
+            return True
+        except Exception as e:
+            logger.debug(f"Typing output unavailable: {e}")
+            return False
+
+    def write(self, text: str) -> None:
+        import keyboard
+
+        for start in range(0, len(text), self.chunk_size):
+            if start:
+                time.sleep(self.chunk_pause)
+            keyboard.write(text[start:start + self.chunk_size], delay=0)
+
+class MemorySink(TextSink):
+    """Collect text in memory instead of injecting it, for tests.
+
+    `texts` holds every write and `value` the text as it would appear in
+    the target window.
+    """
+    name = "memory"
+
+    def __init__(self):
+        self.texts: List[str] = []
+        self.value = ""
+
+    def write(self, text: str) -> None:
+        self.texts.append(text)
+        self.value += text
+
+    def erase(self, count: int) -> None:
+        self.value = self.value[:len(self.value) - count]
+
+class TextOutput:
+    """Inject text with the fastest sink that works.
+
+    Args:
+        sinks: Sinks in order of preference. Unavailable sinks are dropped.
+        delay: Seconds to wait before injecting, so the hotkey's modifier
+            keys are released.
+    """
+    def __init__(self, sinks: List[TextSink], delay: float = 0.1):
+        self.delay = delay
+        self.sinks = [sink for sink in sinks if sink.available()]
+        if not self.sinks:
+            raise RuntimeError("No text output method is available")
+        logger.info(f"Text output via {self.sinks[0].name}")
+
+    def write(self, text: str) -> None:
+        """Inject text, falling back to the next sink on failure.
+
+        Injection time is recorded on the active timer as 'inject.<sink>'
+        and normalized to 'inject.per_1k_chars'.
+
+        Args:
+            text: Text to inject.
+        """
+        if not text:
+            return
+        with timing.stage("inject.delay"):
+            time.sleep(self.delay)
+
+        for sink in list(self.sinks):
+            start = time.perf_counter()
+            try:
+                sink.write(text)
+            except Exception as e:
+                logger.warning(f"Text output via {sink.name} failed: {e}")
+                if len(self.sinks) > 1:
+                    self.sinks.remove(sink)
+                continue
+            seconds = time.perf_counter() - start
+            per_1k = seconds * 1000 / len(text)
+            timing.record(f"inject.{sink.name}", seconds)
+            timing.record("inject.per_1k_chars", per_1k)
+            logger.debug(f"Injected {len(text)} chars via {sink.name} in {seconds * 1000:.1f} ms "
+                         f"({per_1k * 1000:.1f} ms per 1000 chars)")
+            return
+        raise RuntimeError("All text output methods failed")
+
+    def replace(self, old: str, new: str) -> None:
+        """Replace text that was just injected, assuming the cursor is after it.
+
+        Only the part after the common prefix is erased and retyped.
+
+        Args:
+            old: Text previously passed to `write`.
+            new: Text to show instead.
+        """
+        prefix = len(os.path.commonprefix([old, new]))
+        sink = self.sinks[0]
+        with timing.stage("inject.replace"):
+            if len(old) > prefix:
+                sink.erase(len(old) - prefix)
+            if len(new) > prefix:
+                sink.write(new[prefix:])
+        logger.debug(f"Replaced {len(old) - prefix} chars with {len(new) - prefix} via {sink.name}")
+
+def create_text_output(
+    method: str = "auto",
+    delay: float = 0.1,
+    paste_hotkey: Optional[str] = None,
+    restore_clipboard: bool = True,
+    chunk_size: int = 64
+) -> TextOutput:
+    """Create the text output for a configured method.
+
+    Args:
+        method: 'auto' (clipboard, then typing), 'clipboard' or 'typing'. An
+            explicit method is tried first and the other one kept as fallback.
+        delay: Seconds to wait before injecting.
+        paste_hotkey: Key combination that pastes, or None for the platform
+            default.
+        restore_clipboard: Whether clipboard pastes restore the previous text.
+        chunk_size: Characters per chunk for typing.
+
+    Returns:
+        Text output using the first available sink.
+    """
+    sinks = [ClipboardPasteSink(paste_hotkey, restore=restore_clipboard), ChunkedTypingSink(chunk_size)]
+    sinks.sort(key=lambda sink: sink.name != method)
+    return TextOutput(sinks, delay=delay)
@@ -0,0 +1,378 @@
+"""Background transcription pipeline for Hotkey Dikte application.
+
+This module moves transcription and text output off the hotkey thread. Recorded
+audio snapshots are placed on a bounded job queue and served in submission
+order by a single dedicated worker thread. Jobs that pile up while the model
+is busy are transcribed together in one batched model pass.
+
+In two-pass mode a small draft model types a first version of the text right
+away, and the configured model's result replaces it in place once ready.
+"""
+
+import queue
+import time
+import traceback
+from dataclasses import dataclass, field
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import timing
+from timing import StageTimer
+from features import MAX_FEATURE_SECONDS, MelFeatures
+from preprocess import TARGET_SAMPLE_RATE, prepare_audio
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass
+class TranscriptionJob:
+    """A frozen audio snapshot waiting to be transcribed.
+
+    The audio is kept as captured, (frames,) or (frames, channels) at the
+    capture rate, and preprocessed on the worker. `features` holds log-mel
+    frames computed while recording, if any.
+    """
+    job_id: int
+    audio: np.ndarray
+    sample_rate: int
+    stream: Optional[Any] = None
+    features: Optional[MelFeatures] = None
+    timings: StageTimer = field(default_factory=StageTimer)
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+class TranscriptionPipeline:
+    """Bounded job queue served by a single transcription worker.
+
+    A single worker guarantees that results are delivered to the output
+    callback in the same order the recordings were submitted. With
+    `max_batch_size` above one, the worker takes all jobs already waiting (up
+    to that many) and transcribes them with `transcriber.transcribe_batch`.
+
+    With a `draft_transcriber`, each job's draft is output first and then
+    corrected through `replace_callback(draft, text)`. Jobs are then not
+    batched, so a replacement never has later text after it.
+    """
+    def __init__(
+        self,
+        transcriber,
+        output_callback: Callable[[str], None],
+        max_queue_size: int = 8,
+        vad=None,
+        metrics=None,
+        max_batch_size: int = 1,
+        draft_transcriber=None,
+        replace_callback: Optional[Callable[[str, str], None]] = None
+    ):
+        self.transcriber = transcriber
+        self.max_batch_size = max_batch_size
+        self.draft_transcriber = draft_transcriber
+        self._replace_callback = replace_callback
+        self.vad = vad
+        self.metrics = metrics
+        self._output_callback = output_callback
+        self._status_callback: Optional[Callable[[str], None]] = None
+        self._queue: "queue.Queue[Optional[TranscriptionJob]]" = queue.Queue(maxsize=max_queue_size)
+        self._worker: Optional[Thread] = None
+        self._lock = Lock()
+        self._next_job_id = 1
+        self._pending = 0
+
+        # Queue statistics
+        self._submitted = 0
+        self._completed = 0
+        self._dropped = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+        self._drafts = 0
+        self._replaced = 0
+
+    def set_status_callback(self, callback: Callable[[str], None]) -> None:
+        """Set callback for status updates.
+
+        Args:
+            callback: Function to call with 'processing' or 'idle'.
+        """
+        self._status_callback = callback
+
+    def _update_status(self, status: str) -> None:
+        """Update status through callback if set."""
+        if self._status_callback:
+            self._status_callback(status)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for the worker."""
+        return self._queue.qsize()
+
+    @property
+    def is_busy(self) -> bool:
+        """Whether a job is being processed or waiting in the queue."""
+        return self._pending > 0
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._worker and self._worker.is_alive():
+            return
+        self._worker = Thread(target=self._run, name="transcription-worker", daemon=True)
+        self._worker.start()
+        logger.debug("Transcription worker started")
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the worker after it finishes the jobs already queued.
+
+        Args:
+            timeout: Maximum number of seconds to wait for the worker.
+        """
+        if not self._worker:
+            return
+        self._queue.put(None)
+        self._worker.join(timeout)
+        if self._worker.is_alive():
+            logger.warning("Transcription worker did not stop in time")
+        self._worker = None
+
+    def submit(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        stream=None,
+        timings: Optional[StageTimer] = None,
+        features: Optional[MelFeatures] = None
+    ) -> bool:
+        """Queue an audio snapshot for transcription without blocking.
+
+        Args:
+            audio: Audio shaped (frames,) or (frames, channels). Must not be
+                modified afterwards.
+            sample_rate: Sample rate of the audio.
+            stream: Optional streaming session that already decoded part of
+                the audio; only its unconfirmed tail is decoded.
+            timings: Timer already holding stages measured before submission.
+            features: Log-mel frames of the audio computed during recording;
+                the audio must then be at 16 kHz.
+
+        Returns:
+            True if the job was queued, False if the queue is full.
+        """
+        with self._lock:
+            job = TranscriptionJob(
+                self._next_job_id, audio, sample_rate, stream, features, timings or StageTimer()
+            )
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._dropped += 1
+                logger.warning(f"Transcription queue full ({self._queue.maxsize} jobs), recording dropped")
+                return False
+            self._next_job_id += 1
+            self._submitted += 1
+            self._pending += 1
+        logger.debug(f"Queued job {job.job_id} (queue depth {self.queue_depth})")
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue depth and wait time statistics."""
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "dropped": self._dropped,
+                "last_wait": self._last_wait,
+                "max_wait": self._max_wait,
+                "mean_wait": self._total_wait / self._completed if self._completed else 0.0,
+                "drafts": self._drafts,
+                "replaced": self._replaced
+            }
+
+    def _run(self) -> None:
+        """Worker loop processing jobs in submission order."""
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is None:
+                break
+            jobs = [job]
+            # Take the jobs that piled up meanwhile, without waiting for more
+            while len(jobs) < self.max_batch_size:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    stopping = True
+                    break
+                jobs.append(extra)
+            self._process(jobs)
+            with self._lock:
+                self._pending -= len(jobs)
+                drained = self._pending == 0
+            if drained:
+                self._update_status("idle")
+        logger.debug("Transcription worker stopped")
+
+    def _process(self, jobs: List[TranscriptionJob]) -> None:
+        """Transcribe a group of jobs and deliver their text in order."""
+        self._update_status("processing")
+        if len(jobs) > 1:
+            logger.debug(f"Processing jobs {jobs[0].job_id}-{jobs[-1].job_id} as a batch")
+        waits: Dict[int, float] = {}
+        texts: Dict[int, Optional[str]] = {}
+        ready = []
+        for job in jobs:
+            waits[job.job_id] = time.perf_counter() - job.submitted_at
+            logger.debug(
+                f"Processing job {job.job_id}: {len(job.audio)} samples, "
+                f"waited {waits[job.job_id]:.3f}s, {self.queue_depth} more in queue"
+            )
+            try:
+                with timing.activate(job.timings):
+                    timing.record("queue wait", waits[job.job_id])
+                    with timing.stage("preprocess"):
+                        audio = prepare_audio(job.audio, job.sample_rate)
+                    speech, kept = self._detect_speech(job, audio)
+                if speech is not None:
+                    ready.append((job, audio, speech, kept))
+            except Exception as e:
+                logger.error(f"Error processing job {job.job_id}: {e}")
+                logger.debug(traceback.format_exc())
+
+        # Streamed jobs only decode their tail, so only the others are batched
+        batch = [(job, speech) for job, audio, speech, kept in ready if job.stream is None]
+        if len(batch) > 1 and self.draft_transcriber is None:
+            batched = self._transcribe_batch(batch)
+            failed = sum(text is None for text in batched.values())
+            if failed:
+                # transcribe_batch reports a failed batch as None for every job
+                logger.warning(f"Batch transcription failed for {failed} jobs, transcribing them one by one")
+            texts.update({job_id: text for job_id, text in batched.items() if text is not None})
+
+        for job, audio, speech, kept in ready:
+            try:
+                with timing.activate(job.timings):
+                    draft = None
+                    if job.job_id not in texts:
+                        draft = self._draft(job, speech)
+                        texts[job.job_id] = self._transcribe(job, audio, speech, kept)
+                    text = texts[job.job_id]
+                    if draft:
+                        self._refine(draft, text)
+                    elif text:
+                        self._deliver(job, text)
+                    else:
+                        logger.warning("Transcription failed or returned empty result")
+            except Exception as e:
+                logger.error(f"Error processing job {job.job_id}: {e}")
+                logger.debug(traceback.format_exc())
+
+        for job in jobs:
+            self._finish(job, waits[job.job_id], texts.get(job.job_id))
+
+    def _deliver(self, job: TranscriptionJob, text: str) -> None:
+        """Output text and record how long the user waited for it."""
+        latency = job.timings.elapsed
+        timing.record("perceived latency", latency)
+        logger.info(f"Job {job.job_id} text shown {latency:.2f}s after the audio ended")
+        with timing.stage("output"):
+            self._output_callback(text)
+
+    def _draft(self, job: TranscriptionJob, speech: np.ndarray) -> Optional[str]:
+        """Output a quick draft of a job's text, if a draft model is ready."""
+        draft_transcriber = self.draft_transcriber
+        if draft_transcriber is None or job.stream is not None or not draft_transcriber.is_loaded:
+            return None
+        with timing.stage("draft"):
+            draft = draft_transcriber.transcribe(speech, TARGET_SAMPLE_RATE)
+        if draft:
+            self._deliver(job, draft)
+        return draft
+
+    def _refine(self, draft: str, text: Optional[str]) -> None:
+        """Replace an output draft with the refined text if they differ."""
+        replaced = bool(text) and text != draft
+        if replaced:
+            with timing.stage("replace"):
+                self._replace_callback(draft, text)
+        with self._lock:
+            self._drafts += 1
+            self._replaced += replaced
+            rate = self._replaced / self._drafts
+        logger.info(
+            f"Draft {'replaced' if replaced else 'kept'}, "
+            f"replacement rate {rate:.0%} over {self._drafts} dictations"
+        )
+
+    def _finish(self, job: TranscriptionJob, wait: float, text: Optional[str]) -> None:
+        """Update queue statistics and record the job's timings."""
+        with self._lock:
+            self._completed += 1
+            self._total_wait += wait
+            self._last_wait = wait
+            self._max_wait = max(self._max_wait, wait)
+        if self.metrics is not None:
+            self.metrics.record(
+                job.timings,
+                job_id=job.job_id,
+                audio_seconds=round(len(job.audio) / job.sample_rate, 3),
+                chars=len(text or "")
+            )
+
+    def _detect_speech(
+        self,
+        job: TranscriptionJob,
+        audio: np.ndarray
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Trim silence with the VAD.
+
+        Returns:
+            The speech audio, or None if there is no speech, and the index
+            into `audio` of every speech sample, or None if nothing was cut.
+        """
+        if self.vad is None:
+            return audio, None
+        with timing.stage("vad"):
+            keep = self.vad.keep_mask(audio, TARGET_SAMPLE_RATE)
+            speech = None if keep is None else audio[keep]
+        if speech is None:
+            logger.info("No speech detected, skipping transcription")
+            if job.stream is not None:
+                job.stream.cancel()
+            return None, None
+        return speech, np.flatnonzero(keep)
+
+    def _transcribe(
+        self,
+        job: TranscriptionJob,
+        audio: np.ndarray,
+        speech: np.ndarray,
+        kept: Optional[np.ndarray]
+    ) -> Optional[str]:
+        """Run the model on the speech audio of a job."""
+        if job.stream is not None:
+            with timing.stage("transcribe"):
+                # Committed words refer to untrimmed audio times
+                return job.stream.finish(audio)
+        if job.features is None or len(speech) > MAX_FEATURE_SECONDS * TARGET_SAMPLE_RATE:
+            with timing.stage("transcribe"):
+                return self.transcriber.transcribe(speech, TARGET_SAMPLE_RATE)
+        with timing.stage("features"):
+            features = job.features.for_speech(speech, kept)
+        with timing.stage("transcribe"):
+            return self.transcriber.transcribe(speech, TARGET_SAMPLE_RATE, features=features)
+
+    def _transcribe_batch(self, batch: List[tuple]) -> Dict[int, Optional[str]]:
+        """Run the model once on the speech audio of several jobs.
+
+        Every job's 'transcribe' stage is the duration of the whole batch,
+        which is the time its text waited for the model.
+        """
+        start = time.perf_counter()
+        texts = self.transcriber.transcribe_batch([speech for _, speech in batch], TARGET_SAMPLE_RATE)
+        seconds = time.perf_counter() - start
+        logger.debug(f"Transcribed {len(batch)} jobs in one batch in {seconds:.3f}s")
+        for job, _ in batch:
+            job.timings.add("transcribe", seconds)
+        return {job.job_id: text for (job, _), text in zip(batch, texts)}
@@ -0,0 +1,120 @@
+"""Audio preprocessing for Hotkey Dikte application.
+
+This module converts captured audio into the 16 kHz mono float32 signal that
+Whisper expects: vectorized downmix, dtype normalization and a polyphase
+resampler. scipy's resample_poly is used when installed, with an equivalent
+NumPy implementation as fallback.
+"""
+
+from math import gcd
+
+import numpy as np
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+
+def to_float32(audio: np.ndarray) -> np.ndarray:
+    """Convert samples to float32 in [-1, 1].
+
+    Integer samples are scaled by their type's range in one vectorized pass.
+    float32 input is returned unchanged.
+    """
+    if audio.dtype == np.float32:
+        return audio
+    if np.issubdtype(audio.dtype, np.integer):
+        info = np.iinfo(audio.dtype)
+        if info.min == 0:  # unsigned, e.g. 8-bit PCM
+            offset = np.float32((info.max + 1) / 2)
+            return (audio.astype(np.float32) - offset) / offset
+        return audio.astype(np.float32) * np.float32(1.0 / (info.max + 1))
+    return audio.astype(np.float32)
+
+def to_mono(audio: np.ndarray) -> np.ndarray:
+    """Downmix (frames, channels) audio to a 1-D signal.
+
+    Mono input is returned as a view without copying.
+    """
+    if audio.ndim == 1:
+        return audio
+    if audio.shape[1] == 1:
+        return audio.reshape(-1)
+    # A matrix-vector product is much faster than mean() over a short axis
+    weights = np.full(audio.shape[1], 1.0 / audio.shape[1], dtype=audio.dtype)
+    return audio @ weights
+
+def _kaiser_lowpass(up: int, down: int) -> np.ndarray:
+    """Anti-aliasing filter matching scipy.signal.resample_poly's default."""
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    n = np.arange(-half_len, half_len + 1)
+    cutoff = 1.0 / max_rate
+    taps = cutoff * np.sinc(cutoff * n) * np.kaiser(2 * half_len + 1, 5.0)
+    # Unit DC gain, times `up` to make up for the zero-stuffed samples
+    return taps * (up / taps.sum())
+
+def _resample_poly_numpy(audio: np.ndarray, up: int, down: int, chunk: int = 65536) -> np.ndarray:
+    """Polyphase resampling by up/down in NumPy.
+
+    Each output sample only evaluates the filter phase that lines up with
+    real input samples, so the zero-stuffed signal is never materialized.
+    """
+    taps = _kaiser_lowpass(up, down)
+    half_len = (len(taps) - 1) // 2
+    n_phase_taps = -(-len(taps) // up)
+    padded = np.zeros(n_phase_taps * up)
+    padded[:len(taps)] = taps
+    # polyphase[p, i] = taps[p + up * i]
+    polyphase = padded.reshape(n_phase_taps, up).T.astype(np.float32)
+
+    n_in = len(audio)
+    n_out = -(-n_in * up // down)
+    # Zero-pad the input so every gathered index is valid
+    x = np.concatenate([np.zeros(n_phase_taps, dtype=np.float32), audio, np.zeros(n_phase_taps, dtype=np.float32)])
+    out = np.empty(n_out, dtype=np.float32)
+    offsets = np.arange(n_phase_taps)
+    for start in range(0, n_out, chunk):
+        t = np.arange(start, min(start + chunk, n_out), dtype=np.int64) * down + half_len
+        base = t // up
+        phase = t % up
+        indices = base[:, None] - offsets[None, :] + n_phase_taps
+        out[start:start + len(t)] = np.einsum("ij,ij->i", x[indices], polyphase[phase])
+    return out
+
+def resample(audio: np.ndarray, orig_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Resample 1-D float32 audio with a polyphase filter.
+
+    Args:
+        audio: Mono float32 audio.
+        orig_rate: Sample rate of the audio.
+        target_rate: Desired sample rate.
+
+    Returns:
+        Resampled float32 audio, or the input itself if the rates match.
+    """
+    if orig_rate == target_rate or not len(audio):
+        return audio
+    divisor = gcd(int(orig_rate), int(target_rate))
+    up, down = int(target_rate) // divisor, int(orig_rate) // divisor
+    try:
+        from scipy.signal import resample_poly
+    except ImportError:
+        logger.debug("scipy not installed, using NumPy polyphase resampler")
+        return _resample_poly_numpy(audio, up, down)
+    return resample_poly(audio, up, down).astype(np.float32, copy=False)
+
+def prepare_audio(audio: np.ndarray, sample_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Convert captured audio to contiguous mono float32 at the target rate.
+
+    Args:
+        audio: Samples shaped (frames,) or (frames, channels), any PCM dtype.
+        sample_rate: Sample rate of the audio.
+        target_rate: Sample rate expected by the model.
+
+    Returns:
+        1-D float32 audio. 16 kHz mono float32 input is returned as a view.
+    """
+    mono = to_mono(to_float32(audio))
+    return np.ascontiguousarray(resample(mono, sample_rate, target_rate))
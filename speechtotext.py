@@ -7,8 +7,6 @@ and real-time transcription using Whisper AI.
 import sounddevice as sd
 import numpy as np
 from pathlib import Path
-import whisper
-import torch
 from typing import Optional
 
 class SimpleSpeechToText:
@@ -21,8 +19,10 @@ class SimpleSpeechToText:
         self.is_recording = False
         self.audio_frames = []
         
-        # Initialize Whisper model
+        # Initialize Whisper model (imported here, torch is slow to import)
         print("Loading Whisper model...")
+        import torch
+        import whisper
         device = "cuda" if torch.cuda.is_available() else "cpu"
         self.model = whisper.load_model("medium", device=device)
         print(f"Model loaded on {device}")
@@ -0,0 +1,202 @@
+"""Streaming transcription for Hotkey Dikte application.
+
+This module decodes audio in the background while a recording is still
+running. Each pass decodes an overlapping window that starts at the last
+committed word, and words that two consecutive passes agree on are committed.
+When the recording stops only the unconfirmed tail needs to be decoded.
+"""
+
+import re
+import time
+import traceback
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass
+class Word:
+    """A transcribed word with absolute start and end times in seconds."""
+    text: str
+    start: float
+    end: float
+
+    @property
+    def key(self) -> str:
+        """Normalized form used to compare words across passes."""
+        return re.sub(r"[^\w]", "", self.text.lower())
+
+class LocalAgreement:
+    """Commit the prefix that two consecutive hypotheses agree on."""
+    def __init__(self):
+        self.committed: List[Word] = []
+        self._previous: List[Word] = []
+
+    @property
+    def committed_end(self) -> float:
+        """End time of the last committed word, or 0.0."""
+        return self.committed[-1].end if self.committed else 0.0
+
+    @property
+    def text(self) -> str:
+        """Committed text so far."""
+        return "".join(word.text for word in self.committed).strip()
+
+    def insert(self, hypothesis: List[Word]) -> List[Word]:
+        """Add a new hypothesis for the uncommitted audio.
+
+        Args:
+            hypothesis: Words decoded from the audio after `committed_end`.
+
+        Returns:
+            Words newly committed by this hypothesis.
+        """
+        agreed = []
+        for new, old in zip(hypothesis, self._previous):
+            if new.key != old.key:
+                break
+            agreed.append(new)
+        self._previous = hypothesis[len(agreed):]
+        self.committed.extend(agreed)
+        return agreed
+
+    def force_commit(self, hypothesis: List[Word], before: float) -> List[Word]:
+        """Commit the leading words of a hypothesis that end before a time.
+
+        Used to bound the decode window when passes keep disagreeing.
+
+        Args:
+            hypothesis: Latest hypothesis for the uncommitted audio.
+            before: Absolute time in seconds.
+
+        Returns:
+            Words committed by this call.
+        """
+        forced = []
+        for word in hypothesis:
+            if word.end > before:
+                break
+            forced.append(word)
+        self._previous = []
+        self.committed.extend(forced)
+        return forced
+
+class StreamingSession:
+    """Background decoding of a recording while it is being captured.
+
+    Args:
+        decode: Function taking (audio, sample_rate, prompt) and returning words
+            with times relative to the start of the audio.
+        get_audio: Function returning the mono audio captured so far.
+        sample_rate: Sample rate of the audio.
+        step: Seconds of new audio between decoding passes.
+        max_window: Maximum seconds of uncommitted audio before words are
+            force-committed.
+    """
+    def __init__(
+        self,
+        decode: Callable[[np.ndarray, int, str], List[Word]],
+        get_audio: Callable[[], np.ndarray],
+        sample_rate: int,
+        step: float = 1.0,
+        max_window: float = 20.0
+    ):
+        self._decode = decode
+        self._get_audio = get_audio
+        self.sample_rate = sample_rate
+        self.step = step
+        self.max_window = max_window
+        self.agreement = LocalAgreement()
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+        self._decoded_until = 0.0
+        self.passes = 0
+
+    def start(self) -> None:
+        """Start decoding in the background."""
+        self._thread = Thread(target=self._run, name="streaming-transcriber", daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Stop background decoding without waiting for it."""
+        self._stop_event.set()
+
+    def stop(self) -> None:
+        """Stop background passes when the recording ends.
+
+        Must be called before another recording starts, so no pass reads the
+        new recording's audio; `finish` later decodes the remaining tail of
+        this one.
+        """
+        self._stop_event.set()
+
+    def finish(self, audio: np.ndarray) -> str:
+        """Stop background decoding and decode the unconfirmed tail.
+
+        Args:
+            audio: Complete mono recording.
+
+        Returns:
+            Full transcription of the recording.
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+
+        with self._lock:
+            start = time.perf_counter()
+            offset = self.agreement.committed_end
+            tail = audio[int(offset * self.sample_rate):]
+            tail_words = []
+            if len(tail) >= int(0.3 * self.sample_rate):
+                tail_words = self._decode_from(tail, offset)
+            text = (self.agreement.text + "".join(word.text for word in tail_words)).strip()
+
+        logger.debug(
+            f"Streaming finished after {self.passes} passes: "
+            f"{len(self.agreement.committed)} words committed early, "
+            f"{len(tail) / self.sample_rate:.2f}s tail decoded in {time.perf_counter() - start:.3f}s"
+        )
+        return text
+
+    def _run(self) -> None:
+        """Decode each new step of audio until stopped."""
+        while not self._stop_event.wait(self.step / 2):
+            try:
+                audio = self._get_audio()
+                duration = len(audio) / self.sample_rate
+                if duration - self._decoded_until < self.step:
+                    continue
+                with self._lock:
+                    if self._stop_event.is_set():
+                        break
+                    self._decode_pass(audio, duration)
+            except Exception as e:
+                logger.error(f"Streaming transcription error: {e}")
+                logger.debug(traceback.format_exc())
+
+    def _decode_pass(self, audio: np.ndarray, duration: float) -> None:
+        """Decode the uncommitted window and commit agreed words."""
+        offset = self.agreement.committed_end
+        window = audio[int(offset * self.sample_rate):]
+        hypothesis = self._decode_from(window, offset)
+        self._decoded_until = duration
+        self.passes += 1
+
+        committed = self.agreement.insert(hypothesis)
+        if duration - self.agreement.committed_end > self.max_window:
+            committed += self.agreement.force_commit(hypothesis[len(committed):], duration - self.step)
+        if committed:
+            logger.debug(f"Committed: {''.join(word.text for word in committed).strip()}")
+
+    def _decode_from(self, audio: np.ndarray, offset: float) -> List[Word]:
+        """Decode audio starting at `offset` seconds into absolute-time words."""
+        prompt = self.agreement.text[-200:]
+        words = self._decode(audio, self.sample_rate, prompt)
+        return [Word(w.text, w.start + offset, w.end + offset) for w in words]
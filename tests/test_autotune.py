@@ -0,0 +1,56 @@
+"""Unit tests for the CPU execution autotuner.
+
+This module tunes the stub backend and checks storing and applying
+per-machine profiles.
+"""
+
+import os
+
+import numpy as np
+
+from autotune import CpuProfile, apply_profile, autotune, machine_id, profile_path, thread_candidates, time_candidate
+from config_schema import AppConfig
+from transcriber import Transcriber
+
+SETTINGS = {"model_size": "tiny", "language": "id", "initial_prompt": "", "use_cuda": False}
+
+def test_thread_candidates_leave_reserved_cores():
+    """Test that candidates never use the reserved cores."""
+    candidates = thread_candidates(reserve=1)
+    assert candidates == sorted(set(candidates))
+    assert candidates[0] == 1
+    assert candidates[-1] == max(1, os.cpu_count() - 1)
+
+def test_autotune_picks_fastest_candidate():
+    """Test that every candidate is timed and the fastest one is kept."""
+    clip = np.zeros(2 * 16000, dtype=np.float32)
+    profile = autotune(clip, SETTINGS, ["stub"], ["auto"], cpu_threads=[1, 2], repeats=1)
+
+    assert len(profile.trials) == 2
+    assert profile.latency == min(trial["latency"] for trial in profile.trials)
+    assert profile.backend == "stub"
+    assert profile.machine == machine_id()
+
+def test_failed_transcription_is_not_timed(monkeypatch):
+    """Test that a candidate whose transcriptions fail records an error, not a latency."""
+    monkeypatch.setattr(Transcriber, "transcribe", lambda self, audio, sample_rate, **kwargs: None)
+    clip = np.zeros(2 * 16000, dtype=np.float32)
+    trial = time_candidate(clip, SETTINGS, {"backend": "stub", "compute_type": "auto"}, repeats=1)
+
+    assert "error" in trial
+    assert "latency" not in trial
+
+def test_profile_applied_only_for_same_model(tmp_path):
+    """Test that a saved profile updates the config of the model it was tuned for."""
+    config_path = tmp_path / "config.json"
+    CpuProfile("tiny", "faster-whisper", "int8", 3, 1, 0.5).save(profile_path(config_path))
+    CpuProfile("tiny", "whisper", "int8", 8, 2, 0.4, machine="other").save(profile_path(config_path))
+
+    config = AppConfig(transcriber={"model_size": "tiny"})
+    assert apply_profile(config, config_path) is not None
+    assert config.transcriber.backend == "faster-whisper"
+    assert config.transcriber.cpu_threads == 3
+
+    config = AppConfig(transcriber={"model_size": "small"})
+    assert apply_profile(config, config_path) is None
+    assert config.transcriber.cpu_threads == 0
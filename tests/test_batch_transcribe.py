@@ -0,0 +1,61 @@
+"""Unit tests for headless batch transcription.
+
+This module transcribes a small directory with the stub backend and checks
+that an interrupted run resumes without redoing finished files.
+"""
+
+import json
+import wave
+
+import numpy as np
+
+from batch_transcribe import load_done, run
+
+SETTINGS = {"model_size": "tiny", "language": "id", "initial_prompt": "", "use_cuda": False, "backend": "stub"}
+
+def write_clip(path, seconds, sample_rate=16000):
+    """Write a mono 16-bit WAV file of low-level noise."""
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(int(seconds * sample_rate)) * 1000).astype(np.int16)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+
+def test_directory_transcribed_to_jsonl(tmp_path):
+    """Test that every audio file gets one record with text and timings."""
+    corpus = tmp_path / "corpus"
+    (corpus / "sub").mkdir(parents=True)
+    write_clip(corpus / "a.wav", 2)
+    write_clip(corpus / "sub" / "b.wav", 1)
+    (corpus / "notes.txt").write_text("not audio", encoding="utf-8")
+    output = tmp_path / "out.jsonl"
+
+    counts = run(corpus, output, SETTINGS, workers=2)
+
+    assert counts == {"transcribed": 2, "failed": 0, "skipped": 0}
+    records = {r["path"]: r for r in map(json.loads, output.read_text(encoding="utf-8").splitlines())}
+    assert records["a.wav"]["text"] == "stub stub"
+    assert records["sub/b.wav"]["duration"] == 1.0
+    assert {"load audio", "transcribe"} <= set(records["a.wav"]["timings"])
+
+def test_interrupted_run_resumes(tmp_path):
+    """Test that finished files are skipped and a torn last line is ignored."""
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for name in ("a.wav", "b.wav", "c.wav"):
+        write_clip(corpus / name, 1)
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        json.dumps({"path": "a.wav", "text": "stub"}) + "\n"
+        + json.dumps({"path": "b.wav", "error": "boom"}) + "\n"
+        + '{"path": "c.w',
+        encoding="utf-8"
+    )
+    assert load_done(output) == {"a.wav"}
+
+    counts = run(corpus, output, SETTINGS)
+
+    assert counts == {"transcribed": 2, "failed": 0, "skipped": 1}
+    assert load_done(output) == {"a.wav", "b.wav", "c.wav"}
@@ -0,0 +1,72 @@
+"""Unit tests for the offline benchmark.
+
+This module runs the benchmark end to end with the stub backend.
+"""
+
+import json
+import wave
+
+import numpy as np
+
+from benchmark import benchmark_preprocess, main, run_benchmark
+
+def write_clip(path, seconds, sample_rate=16000):
+    """Write a mono 16-bit WAV file of low-level noise."""
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(int(seconds * sample_rate)) * 1000).astype(np.int16)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+
+def test_run_benchmark_with_stub_backend(tmp_path):
+    """Test per-clip and summary metrics for each configuration."""
+    write_clip(tmp_path / "a.wav", 2.0)
+    write_clip(tmp_path / "b.wav", 3.0)
+    (tmp_path / "a.txt").write_text("stub stub", encoding="utf-8")
+
+    report = run_benchmark(tmp_path, ["tiny"], ["stub"], ["auto"], [{}, {"beam_size": 5}])
+
+    assert len(report["runs"]) == 2
+    run = report["runs"][0]
+    assert run["config"]["backend"] == "stub"
+    assert run["summary"]["clips"] == 2
+    assert run["summary"]["audio_seconds"] == 5.0
+    assert run["summary"]["latency_p95"] >= run["summary"]["latency_p50"]
+    assert run["summary"]["wer"] == 0.0
+    assert [clip["clip"] for clip in run["clips"]] == ["a.wav", "b.wav"]
+    assert run["clips"][1]["wer"] is None
+    assert run["summary"]["peak_rss_delta_mb"] >= run["summary"]["rss_delta_mb"]
+    json.dumps(report)
+
+def test_main_writes_json_report(tmp_path):
+    """Test that the command line writes a machine-readable report."""
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    write_clip(corpus / "a.wav", 1.0)
+    output = tmp_path / "bench.json"
+
+    assert main([str(corpus), "--backends", "stub", "--output", str(output)]) == 0
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["runs"][0]["summary"]["clips"] == 1
+
+def test_context_sweep_reports_both_modes(tmp_path):
+    """Test that the context sweep times every clip with both encoder contexts."""
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    write_clip(corpus / "long.wav", 3.0)
+    write_clip(corpus / "short.wav", 1.0)
+    output = tmp_path / "context.json"
+
+    assert main([str(corpus), "--backends", "stub", "--context-sweep", "--output", str(output)]) == 0
+    results = json.loads(output.read_text(encoding="utf-8"))["context"][0]["results"]
+    assert [r["clip"] for r in results] == ["short.wav", "long.wav"]
+    assert {"full_latency", "short_latency", "full_encode", "short_encode"} <= set(results[0])
+
+def test_int16_capture_halves_peak_memory():
+    """Test that the preprocess benchmark reports capture memory per dtype."""
+    results = benchmark_preprocess(sample_rates=[48000], channel_counts=[2], seconds=40.0, repeats=1)
+    peaks = {r["dtype"]: r["capture_peak_mb"] for r in results}
+    assert peaks["int16"] == peaks["float32"] / 2
+    assert all(r["preprocess_ms"] > 0 for r in results)
@@ -0,0 +1,70 @@
+"""Unit tests for the contiguous audio capture buffer.
+
+This module contains tests for in-place writes, growth and zero-copy handoff.
+"""
+
+import numpy as np
+
+from capture import CallbackStats, CaptureBuffer
+
+def test_write_and_view_preserve_samples():
+    """Test that blocks are stored contiguously in arrival order."""
+    buffer = CaptureBuffer(channels=1, initial_capacity=2048)
+    blocks = [np.random.rand(1024, 1).astype(np.float32) for _ in range(5)]
+    for block in blocks:
+        buffer.write(block)
+
+    assert len(buffer) == 5 * 1024
+    np.testing.assert_array_equal(buffer.view(), np.concatenate(blocks))
+
+def test_detach_is_zero_copy_and_frozen():
+    """Test that a detached recording is not overwritten by the next one."""
+    buffer = CaptureBuffer(channels=2, initial_capacity=4096)
+    buffer.write(np.ones((1024, 2), dtype=np.float32))
+    frames = buffer.detach()
+    assert frames.base is not None  # a view, not a copy
+
+    buffer.reset()
+    buffer.write(np.zeros((1024, 2), dtype=np.float32))
+    assert frames.shape == (1024, 2)
+    assert np.all(frames == 1.0)
+
+def test_view_after_detach_is_empty():
+    """Test that a view of a detached buffer is empty instead of failing."""
+    buffer = CaptureBuffer(channels=1, initial_capacity=1024)
+    buffer.write(np.ones((512, 1), dtype=np.float32))
+    buffer.detach()
+    assert buffer.view().shape == (0, 1)
+
+def test_five_minute_recording_allocation_count():
+    """Test that a long recording allocates a handful of arrays, not one per block."""
+    sample_rate, blocksize = 16000, 1024
+    buffer = CaptureBuffer(channels=1, initial_capacity=30 * sample_rate)
+    block = np.zeros((blocksize, 1), dtype=np.float32)
+    n_blocks = 5 * 60 * sample_rate // blocksize
+    for _ in range(n_blocks):
+        buffer.write(block)
+
+    stats = buffer.stats()
+    assert stats["frames"] == n_blocks * blocksize
+    # 30 s doubling to cover 300 s: 30 -> 60 -> 120 -> 240 -> 480
+    assert stats["allocations"] <= 5
+    assert stats["peak_bytes"] <= 3 * stats["frames"] * 4
+
+def test_callback_stats_report_growth_since_last_report():
+    """Test that callback problems are counted and reported once."""
+    class Status:
+        input_overflow = True
+        input_underflow = False
+
+    stats = CallbackStats()
+    for _ in range(3):
+        stats.record_status(Status())
+    stats.record_error(ValueError("bad block"))
+
+    assert stats.since_last_report() == {"input_overflow": 3, "errors": 1}
+    assert stats.since_last_report() == {}
+    stats.record_status(Status())
+    assert stats.since_last_report() == {"input_overflow": 1}
+    assert stats.totals()["input_overflow"] == 4
+    assert str(stats.last_error) == "bad block"
@@ -92,4 +92,27 @@ def test_config_file_handling(tmp_path):
     assert loaded_config.audio.device_id == 2
     assert loaded_config.transcriber.model_size == "small"
     assert loaded_config.transcriber.language == "en"
-    assert loaded_config.hotkeys.record_hotkey == "ctrl+shift+r"
\ No newline at end of file
+    assert loaded_config.hotkeys.record_hotkey == "ctrl+shift+r"
+
+def test_transcriber_backend_validation():
+    """Test inference backend and compute type validation."""
+    for backend in ["whisper", "faster-whisper"]:
+        config = TranscriberConfig(backend=backend, compute_type="int8")
+        assert config.backend == backend
+
+    with pytest.raises(ValueError):
+        TranscriberConfig(backend="invalid")
+
+    with pytest.raises(ValueError):
+        TranscriberConfig(compute_type="int4")
+
+def test_explicit_null_draft_model_keeps_user_config(tmp_path):
+    """Test that "draft_model_size": null disables the draft model without dropping the file."""
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        '{"transcriber": {"model_size": "small", "draft_model_size": null}}',
+        encoding="utf-8"
+    )
+    config = AppConfig.load(config_path)
+    assert config.transcriber.model_size == "small"
+    assert config.transcriber.draft_model_size is None
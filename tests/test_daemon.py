@@ -0,0 +1,77 @@
+"""Unit tests for the transcription daemon.
+
+This module serves the stub backend over localhost HTTP and transcribes
+through a client-mode Transcriber.
+"""
+
+import http.client
+from threading import Thread
+
+import numpy as np
+import pytest
+
+import timing
+from daemon import MAX_REQUEST_BYTES, TranscriptionDaemon, serve
+from timing import StageTimer
+from transcriber import Transcriber
+
+@pytest.fixture
+def daemon_url():
+    daemon = TranscriptionDaemon(Transcriber("tiny", "id", "", use_cuda=False, backend="stub"), max_batch_size=4)
+    server = serve(daemon, "127.0.0.1", 0)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    daemon.stop()
+
+def test_client_transcribes_through_daemon(daemon_url):
+    """Test that a client gets results and per-request timings back."""
+    client = Transcriber("tiny", "id", "", backend="stub", daemon_url=daemon_url)
+    client.load()
+    assert client.is_loaded
+
+    timer = StageTimer()
+    with timing.activate(timer):
+        assert client.transcribe(np.zeros(3 * 16000, dtype=np.float32), 16000) == "stub stub stub"
+    assert {"daemon.queue wait", "daemon.decode", "daemon.request"} <= set(timer.stages)
+
+    words = client.transcribe_words(np.zeros(2 * 16000, dtype=np.float32), 16000)
+    assert [(w.text, w.start, w.end) for w in words] == [(" stub", 0.0, 1.0), (" stub", 1.0, 2.0)]
+
+def test_concurrent_clients_are_served(daemon_url):
+    """Test that requests from several clients all get their own result."""
+    clients = [Transcriber("tiny", "id", "", backend="stub", daemon_url=daemon_url) for _ in range(4)]
+    results = {}
+
+    def run(i, client):
+        client.load()
+        results[i] = client.transcribe(np.zeros((i + 1) * 16000, dtype=np.float32), 16000)
+
+    threads = [Thread(target=run, args=(i, client)) for i, client in enumerate(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert results == {i: " ".join(["stub"] * (i + 1)) for i in range(4)}
+
+def post(url, body=b"", options="{}", headers=None):
+    """POST to the transcribe endpoint and return the status code."""
+    host, port = url.rsplit("/", 1)[1].split(":")
+    connection = http.client.HTTPConnection(host, int(port), timeout=5)
+    connection.request("POST", "/transcribe", body=body, headers={"X-Options": options, **(headers or {})})
+    status = connection.getresponse().status
+    connection.close()
+    return status
+
+def test_unknown_or_mistyped_options_are_rejected(daemon_url):
+    """Test that clients can only set whitelisted decoding options."""
+    audio = np.zeros(16000, dtype="<f4").tobytes()
+    assert post(daemon_url, audio, '{"fp16": true}') == 400
+    assert post(daemon_url, audio, '{"beam_size": "5"}') == 400
+    assert post(daemon_url, audio, '{"temperature": [0.0, "hot"]}') == 400
+    assert post(daemon_url, audio, '["language"]') == 400
+
+def test_oversized_body_is_rejected(daemon_url):
+    """Test that a huge Content-Length is refused without reading the body."""
+    assert post(daemon_url, b"", headers={"Content-Length": str(MAX_REQUEST_BYTES + 4)}) == 413
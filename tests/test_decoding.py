@@ -0,0 +1,56 @@
+"""Unit tests for decoding profiles.
+
+This module contains tests for profile lookup, option overrides and
+counting decode passes.
+"""
+
+import numpy as np
+import pytest
+
+from backends import Segment
+from decoding import DECODING_PROFILES, count_decode_passes, get_profile
+from transcriber import Transcriber
+
+def test_profiles_trade_passes_for_accuracy():
+    """Test that only slower profiles use fallback and beam search."""
+    assert DECODING_PROFILES["fast"].temperature == (0.0,)
+    assert DECODING_PROFILES["fast"].beam_size is None
+    assert len(DECODING_PROFILES["balanced"].temperature) > 1
+    assert DECODING_PROFILES["accurate"].beam_size == 5
+    with pytest.raises(ValueError):
+        get_profile("instant")
+
+def test_standard_profile_matches_plain_transcribe():
+    """Test that the default profile decodes like whisper's transcribe() defaults."""
+    profile = get_profile(Transcriber("tiny", "id", "", use_cuda=False, backend="stub").profile)
+    assert profile.beam_size is None and profile.best_of is None
+    assert profile.temperature == (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+    assert profile.condition_on_previous_text is True
+    assert (profile.compression_ratio_threshold, profile.logprob_threshold, profile.no_speech_threshold) == (2.4, -1.0, 0.6)
+
+def test_decode_options_override_profile():
+    """Test that explicit options take precedence over the profile."""
+    transcriber = Transcriber("tiny", "id", "", use_cuda=False, backend="stub",
+                              profile="fast", decode_options={"beam_size": 3})
+    assert transcriber.decode_options["beam_size"] == 3
+    assert transcriber.decode_options["temperature"] == (0.0,)
+    assert transcriber.decode_options["condition_on_previous_text"] is False
+
+def test_count_decode_passes():
+    """Test that fallback retries are counted once per window."""
+    ladder = (0.0, 0.4, 0.8)
+    segments = [
+        Segment(0.0, 2.0, "a", seek=0, temperature=0.0),
+        Segment(2.0, 4.0, "b", seek=0, temperature=0.0),
+        Segment(30.0, 32.0, "c", seek=3000, temperature=0.8),
+    ]
+    assert count_decode_passes(segments, ladder) == 1 + 3
+    assert count_decode_passes([], ladder) == 0
+
+def test_transcribe_batch_maps_results_to_inputs():
+    """Test that batched results come back in input order."""
+    transcriber = Transcriber("tiny", "id", "", use_cuda=False, backend="stub")
+    transcriber.load()
+    clips = [np.zeros(n * 16000, dtype=np.float32) for n in (3, 1, 2)] + [np.zeros(100, dtype=np.float32)]
+    texts = transcriber.transcribe_batch(clips, 16000, batch_size=2)
+    assert texts == ["stub stub stub", "stub", "stub stub", None]
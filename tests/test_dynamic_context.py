@@ -0,0 +1,88 @@
+"""Unit tests for the shortened encoder context.
+
+This module runs a tiny randomly initialised Whisper model, so the shortened
+path, its full-context fallback and the restored position embedding are
+checked without downloading weights.
+"""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+whisper = pytest.importorskip("whisper")
+
+from transcriber import Transcriber
+
+def tiny_model():
+    """Build a one-layer Whisper model with random weights."""
+    torch.manual_seed(0)
+    dims = whisper.model.ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=1,
+        n_vocab=51865, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=1
+    )
+    return whisper.model.Whisper(dims).eval()
+
+def loaded_transcriber(**decode_options) -> Transcriber:
+    """Transcriber with dynamic context whose backend holds the tiny model."""
+    transcriber = Transcriber(
+        "tiny", "id", "", use_cuda=False, backend="whisper", profile="fast",
+        decode_options=decode_options, dynamic_context=True, context_margin=1.0
+    )
+    backend = transcriber.backend
+    backend.model = tiny_model()
+    backend.device = "cpu"
+    backend.compute_type = "float32"
+    transcriber.is_loaded = True
+    transcriber.ready.set()
+    return transcriber
+
+def encoder_lengths(transcriber):
+    """Record the number of positions of every encoder pass."""
+    lengths = []
+    transcriber.backend.model.encoder.register_forward_hook(
+        lambda module, inputs, output: lengths.append(output.shape[1])
+    )
+    return lengths
+
+def test_short_clip_uses_shortened_context():
+    """Test that a 2-second clip is encoded over the audio plus margin only."""
+    transcriber = loaded_transcriber(
+        compression_ratio_threshold=None, logprob_threshold=None, no_speech_threshold=None
+    )
+    lengths = encoder_lengths(transcriber)
+    audio = 0.1 * np.random.default_rng(0).standard_normal(2 * 16000).astype(np.float32)
+
+    assert transcriber.transcribe(audio, 16000) is not None
+    # 3 seconds of frames at 100 per second, halved by the encoder
+    assert lengths == [150]
+
+def test_failed_quality_check_falls_back_to_full_context():
+    """Test that a shortened decode failing the checks is redone with 30 seconds."""
+    transcriber = loaded_transcriber(
+        compression_ratio_threshold=None, logprob_threshold=None, no_speech_threshold=None
+    )
+    # Whether a random model passes the thresholds is up to chance
+    transcriber.backend._verdict = lambda result, options: "retry"
+    lengths = encoder_lengths(transcriber)
+    audio = 0.1 * np.random.default_rng(0).standard_normal(2 * 16000).astype(np.float32)
+
+    assert transcriber.transcribe(audio, 16000) is not None
+    assert lengths[0] == 150
+    assert lengths[1:] and all(length == 1500 for length in lengths[1:])
+
+def test_position_embedding_restored_after_error():
+    """Test that the full embedding is put back when decoding raises."""
+    transcriber = loaded_transcriber()
+    backend = transcriber.backend
+    encoder = backend.model.encoder
+    full = encoder.positional_embedding
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("decode failed")
+
+    backend._decode = fail
+    audio = np.zeros(16000, dtype=np.float32)
+    with pytest.raises(RuntimeError):
+        backend.transcribe_short(audio, None, 1.0, "id", None)
+    assert encoder.positional_embedding is full
+    assert encoder.positional_embedding.shape[0] == 1500
@@ -0,0 +1,34 @@
+"""Unit tests for accuracy evaluation helpers.
+
+This module contains tests for word error rate and WAV loading.
+"""
+
+import wave
+
+import numpy as np
+import pytest
+
+from evaluation import load_wav, word_error_rate
+
+def test_word_error_rate():
+    """Test substitutions, deletions, insertions and normalization."""
+    assert word_error_rate("halo apa kabar", "Halo, apa kabar?") == 0.0
+    assert word_error_rate("halo apa kabar", "halo apa") == pytest.approx(1 / 3)
+    assert word_error_rate("halo apa kabar", "halo siapa kabar baik") == pytest.approx(2 / 3)
+    assert word_error_rate("", "") == 0.0
+    assert word_error_rate("", "halo") == 1.0
+
+def test_load_wav_int16_stereo(tmp_path):
+    """Test that 16-bit PCM is scaled to [-1, 1] with channels kept."""
+    path = tmp_path / "clip.wav"
+    samples = np.array([[0, 16384], [-32768, 32767]], dtype=np.int16)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+
+    audio, sample_rate = load_wav(path)
+    assert sample_rate == 16000
+    assert audio.dtype == np.float32
+    np.testing.assert_allclose(audio, [[0.0, 0.5], [-1.0, 32767 / 32768]])
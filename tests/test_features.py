@@ -0,0 +1,85 @@
+"""Unit tests for incremental log-mel features.
+
+This module contains tests comparing features computed during recording
+with the batch computation, with and without VAD trimming.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from features import MelStream, log_mel_spectrogram
+
+def filters(n_mels: int = 80) -> np.ndarray:
+    """Generate a nonnegative stand-in for a mel filter bank."""
+    return np.random.default_rng(1).random((n_mels, 201)).astype(np.float32) / 50
+
+def speech(seconds: float) -> np.ndarray:
+    """Generate noise with a loud middle part."""
+    audio = 0.01 * np.random.default_rng(0).standard_normal(int(seconds * 16000))
+    audio[len(audio) // 3:2 * len(audio) // 3] *= 30
+    return audio.astype(np.float32)
+
+def record(stream: MelStream, audio: np.ndarray, blocksize: int = 1024):
+    """Feed audio to a stream in callback-sized blocks."""
+    stream.start()
+    for start in range(0, len(audio), blocksize):
+        stream.feed(audio[start:start + blocksize].reshape(-1, 1))
+    return stream.finish()
+
+@pytest.mark.parametrize("seconds", [0.01, 0.5, 3.3])
+def test_streamed_features_match_batch(seconds):
+    """Test that features computed during recording equal the batch ones."""
+    audio = speech(seconds)
+    features = record(MelStream(filters()), audio).for_speech(audio)
+    expected = log_mel_spectrogram(audio, filters())
+    assert features.shape == (80, len(audio) // 160)
+    np.testing.assert_allclose(features, expected, atol=1e-4)
+
+def test_features_of_trimmed_audio_match_batch():
+    """Test that cutting pauses only recomputes frames around the cuts."""
+    audio = speech(4.0)
+    keep = np.ones(len(audio), dtype=bool)
+    keep[:3000] = False
+    keep[20000:29000] = False
+    keep[-777:] = False
+    kept = np.flatnonzero(keep)
+    features = record(MelStream(filters()), audio).for_speech(audio[kept], kept)
+    np.testing.assert_allclose(features, log_mel_spectrogram(audio[kept], filters()), atol=1e-4)
+
+def test_unfinished_recording_is_discarded():
+    """Test that a restarted stream only holds the new recording."""
+    stream = MelStream(filters())
+    stream.start()
+    stream.feed(np.ones((16000, 1), dtype=np.float32))
+    audio = speech(1.0)
+    result = record(stream, audio)
+    assert result.n_samples == len(audio)
+    assert stream.finish() is None
+
+def test_ring_wraps_around_while_features_keep_up():
+    """Test that a ring shorter than the recording gives the same features."""
+    audio = speech(3.3)
+    stream = MelStream(filters(), ring_seconds=0.25, poll_interval=0.001)
+    stream.start()
+    for start in range(0, len(audio), 1024):
+        stream.feed(audio[start:start + 1024].reshape(-1, 1))
+        time.sleep(0.02)
+    features = stream.finish().for_speech(audio)
+    np.testing.assert_allclose(features, log_mel_spectrogram(audio, filters()), atol=1e-4)
+
+def test_overrun_ring_abandons_features():
+    """Test that features are dropped when the helper falls a ring behind."""
+    stream = MelStream(filters(), ring_seconds=0.1, poll_interval=10.0)
+    assert record(stream, speech(1.0)) is None
+
+def test_batch_features_match_whisper():
+    """Test the batch computation against Whisper's own spectrogram."""
+    torch = pytest.importorskip("torch")
+    whisper_audio = pytest.importorskip("whisper.audio")
+    audio = speech(2.0)
+    bank = whisper_audio.mel_filters("cpu", 80).numpy()
+    mel = whisper_audio.log_mel_spectrogram(torch.from_numpy(audio), 80, padding=whisper_audio.N_SAMPLES)
+    expected = mel[:, :mel.shape[-1] - whisper_audio.N_FRAMES].numpy()
+    np.testing.assert_allclose(log_mel_spectrogram(audio, bank), expected, atol=1e-3)
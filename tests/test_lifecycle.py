@@ -0,0 +1,56 @@
+"""Unit tests for model lifecycle management.
+
+This module unloads and reloads the stub backend's model.
+"""
+
+import time
+
+import numpy as np
+
+from lifecycle import ModelLifecycle
+from transcriber import Transcriber
+
+def loaded_transcriber() -> Transcriber:
+    transcriber = Transcriber("tiny", "id", "", use_cuda=False, backend="stub")
+    transcriber.load()
+    return transcriber
+
+def test_idle_model_is_unloaded_and_reloaded_on_use():
+    """Test that an idle model is evicted and the next transcription reloads it."""
+    transcriber = loaded_transcriber()
+    statuses = []
+    lifecycle = ModelLifecycle(transcriber, idle_timeout=60, status_callback=statuses.append)
+    assert lifecycle.check() is None
+
+    transcriber.last_used -= 120
+    assert lifecycle.check().startswith("idle")
+    assert not transcriber.is_loaded and transcriber.evicted
+    assert statuses == ["unloaded"]
+
+    assert transcriber.transcribe(np.zeros(2 * 16000, dtype=np.float32), 16000) == "stub stub"
+    assert transcriber.is_loaded and not transcriber.evicted
+
+def test_busy_model_is_kept():
+    """Test that nothing is unloaded while a recording or job is running."""
+    transcriber = loaded_transcriber()
+    lifecycle = ModelLifecycle(transcriber, idle_timeout=1, is_busy=lambda: True)
+    transcriber.last_used -= 10
+    assert lifecycle.check() is None
+    assert transcriber.is_loaded
+
+def test_preload_reloads_in_background():
+    """Test that preloading brings an unloaded model back."""
+    transcriber = loaded_transcriber()
+    statuses = []
+    lifecycle = ModelLifecycle(transcriber, idle_timeout=1, status_callback=statuses.append)
+    lifecycle.evict("test")
+    lifecycle.preload()
+    assert transcriber.ready.wait(5)
+    deadline = time.time() + 5
+    while len(statuses) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert transcriber.is_loaded
+    assert statuses == ["unloaded", "loaded"]
+    # A loaded model is not reloaded again
+    lifecycle.preload()
+    assert lifecycle.reloads == 1
@@ -0,0 +1,70 @@
+"""Unit tests for dictation timing metrics.
+
+This module contains tests for the rolling history, file export and the
+stages recorded by the transcription pipeline.
+"""
+
+import json
+
+import numpy as np
+
+import timing
+from metrics import MetricsRegistry
+from pipeline import TranscriptionPipeline
+from timing import StageTimer
+
+def make_timer(**stages):
+    timer = StageTimer()
+    for name, seconds in stages.items():
+        timer.add(name, seconds)
+    return timer
+
+def test_summary_keeps_rolling_history():
+    """Test that only the most recent dictations are summarized."""
+    metrics = MetricsRegistry(history_size=3)
+    for seconds in [10.0, 0.1, 0.2, 0.3]:
+        metrics.record(make_timer(transcribe=seconds))
+
+    summary = metrics.summary()
+    assert summary["transcribe"]["count"] == 3
+    assert summary["transcribe"]["p50"] == 0.2
+    assert "total" in summary
+
+def test_jsonl_export(tmp_path):
+    """Test that each dictation is appended as one JSON line."""
+    path = tmp_path / "metrics.jsonl"
+    metrics = MetricsRegistry(export_path=path)
+    metrics.record(make_timer(vad=0.01), job_id=1)
+    metrics.record(make_timer(vad=0.02), job_id=2)
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["job_id"] for r in records] == [1, 2]
+    assert records[1]["stages"]["vad"] == 0.02
+
+def test_prometheus_export(tmp_path):
+    """Test that the textfile contains cumulative histogram buckets."""
+    path = tmp_path / "hotkey_dikte.prom"
+    metrics = MetricsRegistry(export_path=path, export_format="prometheus")
+    metrics.record(make_timer(transcribe=0.3))
+    metrics.record(make_timer(transcribe=3.0))
+
+    text = path.read_text()
+    assert 'hotkey_dikte_stage_seconds_bucket{stage="transcribe",le="0.5"} 1' in text
+    assert 'hotkey_dikte_stage_seconds_bucket{stage="transcribe",le="+Inf"} 2' in text
+    assert 'hotkey_dikte_stage_seconds_count{stage="transcribe"} 2' in text
+
+def test_pipeline_records_stages():
+    """Test that the pipeline times queue wait, model and output stages."""
+    class Transcriber:
+        def transcribe(self, audio, sample_rate):
+            timing.record("model.encode", 0.05)
+            return "halo"
+
+    metrics = MetricsRegistry()
+    pipeline = TranscriptionPipeline(Transcriber(), lambda text: None, metrics=metrics)
+    pipeline.start()
+    pipeline.submit(np.zeros(16000, dtype=np.float32), 16000, timings=make_timer(capture=0.001))
+    pipeline.stop()
+
+    stages = set(metrics.summary())
+    assert {"capture", "queue wait", "transcribe", "model.encode", "output", "total"} <= stages
@@ -0,0 +1,111 @@
+"""Unit tests for runtime model switching.
+
+This module checks the LRU cache of loaded models and switches the stub
+backend's model.
+"""
+
+import time
+from threading import Event, Thread
+
+import numpy as np
+
+from model_cache import ModelCache
+from transcriber import Transcriber
+
+class FakeBackend:
+    """Backend that records whether it was unloaded."""
+    def __init__(self):
+        self.unloaded = False
+
+    def unload(self):
+        self.unloaded = True
+
+def test_least_recently_used_model_is_released():
+    """Test that the cache keeps at most max_models - 1 idle models."""
+    cache = ModelCache(max_models=3)
+    small, medium, large = FakeBackend(), FakeBackend(), FakeBackend()
+    cache.put("small", small, 1000)
+    cache.put("medium", medium, 3000)
+    cache.put("large", large, 6000)
+    assert cache.keys() == ["medium", "large"]
+    assert small.unloaded and not medium.unloaded
+
+def test_memory_budget_counts_the_active_model():
+    """Test that models are released until the cache fits next to the active one."""
+    cache = ModelCache(max_models=4, max_memory_mb=5000)
+    small, medium = FakeBackend(), FakeBackend()
+    cache.put("small", small, 1000, active_memory_mb=300)
+    cache.put("medium", medium, 3000, active_memory_mb=1500)
+    assert cache.keys() == ["medium"]
+    assert small.unloaded
+    # A model that does not fit on its own is not kept
+    cache.put("large", FakeBackend(), 6000)
+    assert cache.keys() == []
+
+def test_switching_back_uses_the_cached_model():
+    """Test that a model switched away from is reused without loading."""
+    transcriber = Transcriber("tiny", "id", "", use_cuda=False, backend="stub", max_loaded_models=2)
+    transcriber.load()
+    tiny = transcriber.backend
+
+    loader = transcriber.switch_model("base")
+    assert loader is not None
+    loader.join(5)
+    assert transcriber.is_loaded and transcriber.model_size == "base"
+    assert transcriber.model_cache.keys() == ["tiny"]
+
+    transcriber.switch_model("tiny").join(5)
+    assert transcriber.ready.is_set() and transcriber.backend is tiny
+    assert transcriber.model_cache.keys() == ["base"]
+    assert transcriber.transcribe(np.zeros(16000, dtype=np.float32), 16000) == "stub"
+
+def test_switch_language_sets_prompt():
+    """Test that switching language replaces the prompt."""
+    transcriber = Transcriber("tiny", "id", "halo", use_cuda=False, backend="stub")
+    transcriber.switch_language("en", "hello")
+    assert (transcriber.language, transcriber.initial_prompt) == ("en", "hello")
+
+def test_switching_does_not_wait_for_a_running_transcription():
+    """Test that switches return while a decode holds the model lock."""
+    transcriber = Transcriber("tiny", "id", "halo", use_cuda=False, backend="stub", max_loaded_models=2)
+    transcriber.load()
+    backend = transcriber.backend
+    decode = backend.transcribe
+    started, release = Event(), Event()
+    seen = []
+
+    def blocked(audio, **options):
+        seen.append(options["language"])
+        started.set()
+        release.wait(5)
+        return decode(audio, **options)
+
+    backend.transcribe = blocked
+    worker = Thread(target=transcriber.transcribe, args=(np.zeros(16000, dtype=np.float32), 16000))
+    worker.start()
+    assert started.wait(5)
+
+    begin = time.perf_counter()
+    transcriber.switch_language("en", "hello")
+    switcher = transcriber.switch_model("base")
+    assert time.perf_counter() - begin < 0.5
+    assert transcriber.language == "en" and transcriber.model_size == "tiny"
+
+    release.set()
+    worker.join(5)
+    switcher.join(5)
+    assert seen == ["id"]
+    assert transcriber.model_size == "base" and transcriber.is_loaded
+
+def test_features_of_another_model_are_ignored():
+    """Test that features with the previous model's mel bands are not decoded."""
+    transcriber = Transcriber("tiny", "id", "", use_cuda=False, backend="stub")
+    transcriber.load()
+    transcriber.backend.mel_filters = lambda: np.zeros((128, 201), dtype=np.float32)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("80-band features reached a 128-band model")
+
+    transcriber.backend.transcribe_features = fail
+    features = np.zeros((80, 100), dtype=np.float32)
+    assert transcriber.transcribe(np.zeros(16000, dtype=np.float32), 16000, features=features) == "stub"
@@ -0,0 +1,59 @@
+"""Unit tests for text output.
+
+This module contains tests for sink selection, fallback and timing of text
+injection.
+"""
+
+import pytest
+
+import timing
+from output import MemorySink, TextOutput, TextSink
+from timing import StageTimer
+
+class FailingSink(TextSink):
+    name = "failing"
+
+    def write(self, text):
+        raise OSError("no display")
+
+class UnavailableSink(MemorySink):
+    name = "unavailable"
+
+    def available(self):
+        return False
+
+def test_unavailable_sinks_are_skipped():
+    """Test that the first available sink is used."""
+    sink = MemorySink()
+    output = TextOutput([UnavailableSink(), sink], delay=0)
+    output.write("halo dunia")
+    assert sink.texts == ["halo dunia"]
+    with pytest.raises(RuntimeError):
+        TextOutput([UnavailableSink()])
+
+def test_failing_sink_falls_back_and_is_dropped():
+    """Test that a failing sink hands over to the next one for good."""
+    sink = MemorySink()
+    output = TextOutput([FailingSink(), sink], delay=0)
+    output.write("satu")
+    output.write("dua")
+    assert sink.texts == ["satu", "dua"]
+    assert [s.name for s in output.sinks] == ["memory"]
+
+def test_injection_time_is_recorded():
+    """Test that injection is timed per sink and per 1000 characters."""
+    output = TextOutput([MemorySink()], delay=0)
+    timer = StageTimer()
+    with timing.activate(timer):
+        output.write("x" * 2000)
+    assert {"inject.delay", "inject.memory", "inject.per_1k_chars"} <= set(timer.stages)
+    assert timer.stages["inject.per_1k_chars"] == pytest.approx(timer.stages["inject.memory"] / 2)
+
+def test_replace_only_retypes_the_changed_tail():
+    """Test that a draft is corrected by erasing just the differing part."""
+    sink = MemorySink()
+    output = TextOutput([sink], delay=0)
+    output.write("Halo dunia ini")
+    output.replace("Halo dunia ini", "Halo dunia itu.")
+    assert sink.value == "Halo dunia itu."
+    assert sink.texts[-1] == "tu."
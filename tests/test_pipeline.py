@@ -0,0 +1,147 @@
+"""Unit tests for the background transcription pipeline.
+
+This module contains tests for job ordering, queue bounds and statistics.
+"""
+
+import time
+from threading import Event
+
+import numpy as np
+
+from pipeline import TranscriptionPipeline
+
+class FakeTranscriber:
+    """Transcriber stand-in that returns the first sample as text."""
+    def __init__(self, delay: float = 0.0, gate: Event = None):
+        self.delay = delay
+        self.gate = gate
+
+    def transcribe(self, audio_data, sample_rate):
+        if self.gate:
+            self.gate.wait(5)
+        time.sleep(self.delay)
+        return str(int(audio_data[0]))
+
+def test_results_delivered_in_submission_order():
+    """Test that text is output in the order recordings were submitted."""
+    output = []
+    pipeline = TranscriptionPipeline(FakeTranscriber(delay=0.01), output.append)
+    pipeline.start()
+    for i in range(5):
+        assert pipeline.submit(np.full(16000, i, dtype=np.float32), 16000)
+    pipeline.stop()
+
+    assert output == ["0", "1", "2", "3", "4"]
+    stats = pipeline.stats()
+    assert stats["submitted"] == 5
+    assert stats["completed"] == 5
+    assert stats["max_wait"] >= stats["mean_wait"] > 0
+
+def test_submit_does_not_block_when_queue_full():
+    """Test that a full queue drops the recording instead of blocking."""
+    gate = Event()
+    output = []
+    pipeline = TranscriptionPipeline(FakeTranscriber(gate=gate), output.append, max_queue_size=1)
+    pipeline.start()
+
+    assert pipeline.submit(np.zeros(10), 16000)
+    # Wait for the worker to pick up the first job
+    deadline = time.time() + 5
+    while pipeline.queue_depth and time.time() < deadline:
+        time.sleep(0.01)
+    assert pipeline.submit(np.ones(10), 16000)
+
+    start = time.perf_counter()
+    assert not pipeline.submit(np.ones(10), 16000)
+    assert time.perf_counter() - start < 0.5
+    assert pipeline.is_busy
+
+    gate.set()
+    pipeline.stop()
+    assert output == ["0", "1"]
+    assert pipeline.stats()["dropped"] == 1
+
+def test_status_callback_reports_idle_when_drained():
+    """Test that the worker reports idle once the queue is empty."""
+    statuses = []
+    pipeline = TranscriptionPipeline(FakeTranscriber(), lambda text: None)
+    pipeline.set_status_callback(statuses.append)
+    pipeline.start()
+    pipeline.submit(np.zeros(10), 16000)
+    pipeline.stop()
+
+    assert statuses[0] == "processing"
+    assert statuses[-1] == "idle"
+
+class BatchingTranscriber(FakeTranscriber):
+    """Transcriber stand-in that records the size of every batch."""
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def transcribe_batch(self, audio_list, sample_rate):
+        self.batches.append(len(audio_list))
+        return [str(int(audio[0])) for audio in audio_list]
+
+def test_piled_up_jobs_are_batched_in_order():
+    """Test that waiting jobs share one batch and keep their order."""
+    output = []
+    transcriber = BatchingTranscriber()
+    pipeline = TranscriptionPipeline(transcriber, output.append, max_batch_size=3)
+    # Queue everything before the worker starts so the jobs pile up
+    for i in range(5):
+        assert pipeline.submit(np.full(16000, i, dtype=np.float32), 16000)
+    pipeline.start()
+    pipeline.stop()
+
+    assert output == ["0", "1", "2", "3", "4"]
+    assert transcriber.batches == [3, 2]
+    assert pipeline.stats()["completed"] == 5
+
+class FailingBatchTranscriber(BatchingTranscriber):
+    """Transcriber stand-in whose batched passes always fail."""
+    def transcribe_batch(self, audio_list, sample_rate):
+        self.batches.append(len(audio_list))
+        return [None] * len(audio_list)
+
+def test_failed_batch_falls_back_to_single_jobs():
+    """Test that a failed batch does not drop its dictations."""
+    output = []
+    transcriber = FailingBatchTranscriber()
+    pipeline = TranscriptionPipeline(transcriber, output.append, max_batch_size=3)
+    for i in range(3):
+        assert pipeline.submit(np.full(16000, i, dtype=np.float32), 16000)
+    pipeline.start()
+    pipeline.stop()
+
+    assert transcriber.batches == [3]
+    assert output == ["0", "1", "2"]
+
+class DraftTranscriber:
+    """Draft model stand-in returning a fixed text."""
+    is_loaded = True
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def transcribe(self, audio_data, sample_rate):
+        return self.text
+
+def test_draft_is_output_then_replaced():
+    """Test that the draft is typed first and corrected once refined."""
+    events = []
+    pipeline = TranscriptionPipeline(
+        FakeTranscriber(), lambda text: events.append(("output", text)),
+        draft_transcriber=DraftTranscriber("7"),
+        replace_callback=lambda old, new: events.append(("replace", old, new)),
+        max_batch_size=4
+    )
+    for i in (7, 3):
+        pipeline.submit(np.full(16000, i, dtype=np.float32), 16000)
+    pipeline.start()
+    pipeline.stop()
+
+    assert events == [("output", "7"), ("output", "7"), ("replace", "7", "3")]
+    stats = pipeline.stats()
+    assert stats["drafts"] == 2
+    assert stats["replaced"] == 1
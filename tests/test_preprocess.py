@@ -0,0 +1,51 @@
+"""Unit tests for audio preprocessing.
+
+This module contains tests for downmix, dtype normalization and resampling.
+"""
+
+import numpy as np
+import pytest
+
+from preprocess import _resample_poly_numpy, prepare_audio, resample, to_float32, to_mono
+
+def sine(freq, seconds, rate):
+    t = np.arange(int(seconds * rate)) / rate
+    return np.sin(2 * np.pi * freq * t).astype(np.float32)
+
+def test_16k_mono_float32_is_not_copied():
+    """Test that audio already in model format passes through as a view."""
+    frames = np.zeros((16000, 1), dtype=np.float32)
+    audio = prepare_audio(frames, 16000)
+    assert audio.shape == (16000,)
+    assert np.shares_memory(audio, frames)
+
+def test_stereo_is_downmixed_not_interleaved():
+    """Test that stereo frames are averaged per frame."""
+    frames = np.array([[1.0, 0.0], [0.5, 0.5], [-1.0, 1.0]], dtype=np.float32)
+    np.testing.assert_allclose(to_mono(frames), [0.5, 0.5, 0.0])
+
+def test_int16_normalized_to_float32():
+    """Test that int16 samples are scaled to [-1, 1]."""
+    audio = to_float32(np.array([-32768, 0, 16384], dtype=np.int16))
+    assert audio.dtype == np.float32
+    np.testing.assert_allclose(audio, [-1.0, 0.0, 0.5])
+
+@pytest.mark.parametrize("rate", [8000, 22050, 44100, 48000])
+def test_resample_preserves_tone(rate):
+    """Test that a 440 Hz tone survives resampling to 16 kHz."""
+    out = _resample_poly_numpy(sine(440, 1.0, rate), *{
+        8000: (2, 1), 22050: (320, 441), 44100: (160, 441), 48000: (1, 3)
+    }[rate])
+    expected = sine(440, 1.0, 16000)
+    assert len(out) == 16000
+    # Ignore filter edge effects at both ends
+    np.testing.assert_allclose(out[500:-500], expected[500:-500], atol=1e-2)
+
+def test_numpy_resampler_matches_scipy():
+    """Test the NumPy fallback against scipy's resample_poly."""
+    signal = pytest.importorskip("scipy.signal")
+    audio = np.random.default_rng(0).standard_normal(44100).astype(np.float32)
+    np.testing.assert_allclose(
+        _resample_poly_numpy(audio, 160, 441), signal.resample_poly(audio, 160, 441), atol=1e-5
+    )
+    assert resample(audio, 44100).shape == (16000,)
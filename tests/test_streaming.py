@@ -0,0 +1,63 @@
+"""Unit tests for streaming transcription.
+
+This module contains tests for local agreement and tail-only decoding at stop.
+"""
+
+import numpy as np
+
+from streaming import LocalAgreement, StreamingSession, Word
+
+SAMPLE_RATE = 100
+
+def fake_decode(audio, sample_rate, prompt):
+    """Decode one word per second; the last, incomplete word is unstable."""
+    words = []
+    n_seconds = len(audio) // sample_rate
+    for i in range(n_seconds):
+        value = int(audio[i * sample_rate])
+        words.append(Word(f" w{value}", float(i), float(i + 1)))
+    if len(audio) % sample_rate:
+        words.append(Word(f" partial{len(audio)}", float(n_seconds), len(audio) / sample_rate))
+    fake_decode.calls.append(len(audio))
+    return words
+
+def test_local_agreement_commits_common_prefix():
+    """Test that only words confirmed by two passes are committed."""
+    agreement = LocalAgreement()
+    assert agreement.insert([Word(" halo", 0, 1), Word(" dunia", 1, 2)]) == []
+    committed = agreement.insert([Word(" Halo,", 0, 1), Word(" semua", 1, 2)])
+
+    assert [word.text for word in committed] == [" Halo,"]
+    assert agreement.text == "Halo,"
+    assert agreement.committed_end == 1
+
+def test_finish_decodes_only_unconfirmed_tail():
+    """Test that committed audio is not decoded again at stop."""
+    fake_decode.calls = []
+    audio = np.repeat(np.arange(10, dtype=np.float32), SAMPLE_RATE)
+    session = StreamingSession(fake_decode, lambda: audio, SAMPLE_RATE)
+
+    # Two passes over the growing recording commit the agreed words
+    session._decode_pass(audio[:450], 4.5)
+    session._decode_pass(audio[:650], 6.5)
+    assert session.agreement.text == "w0 w1 w2 w3"
+
+    text = session.finish(audio)
+    assert text == "w0 w1 w2 w3 w4 w5 w6 w7 w8 w9"
+    # Only the 6 seconds after the last committed word were decoded at stop
+    assert fake_decode.calls[-1] == 6 * SAMPLE_RATE
+
+def test_stopped_session_ignores_the_next_recording():
+    """Test that no pass reads audio recorded after the session was stopped."""
+    fake_decode.calls = []
+    recording = [np.zeros(3 * SAMPLE_RATE, dtype=np.float32)]
+    session = StreamingSession(fake_decode, lambda: recording[0], SAMPLE_RATE, step=0.02)
+    session.stop()
+    session.start()
+    # The next recording replaces the live buffer while the job is queued
+    recording[0] = np.full(5 * SAMPLE_RATE, 7, dtype=np.float32)
+    session._thread.join(1)
+
+    assert not session._thread.is_alive()
+    assert fake_decode.calls == []
+    assert session.finish(np.zeros(2 * SAMPLE_RATE, dtype=np.float32)) == "w0 w0"
@@ -0,0 +1,102 @@
+"""Unit tests for voice activity detection.
+
+This module contains tests for silence trimming, pause shortening and
+skipping clips without speech.
+"""
+
+import threading
+
+import numpy as np
+
+from vad import UtteranceSegmenter, VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+
+def tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    """Generate a speech-level sine tone."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def silence(seconds: float) -> np.ndarray:
+    """Generate low-level background noise."""
+    rng = np.random.default_rng(0)
+    return (0.0005 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+def test_silent_clip_is_skipped():
+    """Test that a clip without speech returns None."""
+    vad = VoiceActivityDetector()
+    assert vad.process(silence(2.0), SAMPLE_RATE) is None
+    assert vad.process(np.zeros(SAMPLE_RATE, dtype=np.float32), SAMPLE_RATE) is None
+
+def test_leading_and_trailing_silence_trimmed():
+    """Test that silence around speech is cut down to the padding."""
+    vad = VoiceActivityDetector(padding_ms=150)
+    audio = np.concatenate([silence(1.0), tone(1.0), silence(1.5)])
+    trimmed = vad.process(audio, SAMPLE_RATE)
+
+    assert trimmed is not None
+    assert 1.0 <= len(trimmed) / SAMPLE_RATE <= 1.4
+
+def test_long_pause_shortened():
+    """Test that a long internal pause is shortened to max_pause_ms."""
+    vad = VoiceActivityDetector(padding_ms=0, max_pause_ms=600)
+    audio = np.concatenate([tone(1.0), silence(3.0), tone(1.0)])
+    trimmed = vad.process(audio, SAMPLE_RATE)
+
+    assert trimmed is not None
+    assert abs(len(trimmed) / SAMPLE_RATE - 2.6) < 0.1
+
+def test_continuous_speech_is_kept():
+    """Test that a clip of speech from start to end is not cut."""
+    vad = VoiceActivityDetector()
+    audio = tone(2.0) * np.linspace(0.5, 1.0, 2 * SAMPLE_RATE, dtype=np.float32)
+    trimmed = vad.process(audio, SAMPLE_RATE)
+
+    assert trimmed is not None
+    assert len(trimmed) == len(audio)
+
+def feed_blocks(segmenter, audio, blocksize=1024):
+    """Feed mono audio to a segmenter in (frames, 1) blocks."""
+    for start in range(0, len(audio), blocksize):
+        segmenter.feed(audio[start:start + blocksize, None])
+
+def test_segmenter_splits_stream_at_pauses():
+    """Test that each utterance is emitted once its pause is long enough."""
+    utterances = []
+    segmenter = UtteranceSegmenter(SAMPLE_RATE, lambda frames, ended_at: utterances.append(frames))
+    feed_blocks(segmenter, np.concatenate([
+        silence(1.0), tone(1.0), silence(1.0), tone(0.5), silence(1.0)
+    ]))
+
+    assert len(utterances) == 2
+    assert 1.0 <= len(utterances[0]) / SAMPLE_RATE < 2.0
+    assert 0.5 <= len(utterances[1]) / SAMPLE_RATE < 1.5
+    assert utterances[0].shape[1] == 1
+    assert not segmenter.in_utterance
+
+def test_segmenter_ignores_clicks_and_flushes():
+    """Test that short bursts are ignored and flush emits unfinished speech."""
+    utterances = []
+    segmenter = UtteranceSegmenter(SAMPLE_RATE, lambda frames, ended_at: utterances.append(frames))
+    feed_blocks(segmenter, np.concatenate([silence(1.0), tone(0.05), silence(1.0)]))
+    assert utterances == []
+
+    feed_blocks(segmenter, tone(1.0))
+    assert segmenter.in_utterance
+    segmenter.flush()
+    assert len(utterances) == 1
+
+def test_pushed_blocks_are_segmented_off_the_callback_thread():
+    """Test that push only queues blocks and the segmenter thread emits utterances."""
+    threads = []
+    segmenter = UtteranceSegmenter(
+        SAMPLE_RATE, lambda frames, ended_at: threads.append(threading.current_thread().name)
+    )
+    segmenter.start()
+    audio = np.concatenate([silence(1.0), tone(1.0), silence(1.0), tone(0.5)])
+    for start in range(0, len(audio), 1024):
+        segmenter.push(audio[start:start + 1024, None])
+    segmenter.stop()
+
+    # One utterance ended at the pause, the other was emitted by stop()
+    assert threads == ["utterance-segmenter", "MainThread"]
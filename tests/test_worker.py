@@ -0,0 +1,39 @@
+"""Unit tests for out-of-process inference.
+
+This module runs the stub backend in a worker process and checks shared
+memory handoff and automatic restarts.
+"""
+
+import os
+import signal
+
+import numpy as np
+import pytest
+
+from transcriber import Transcriber
+
+@pytest.fixture
+def transcriber():
+    transcriber = Transcriber("tiny", "id", "", use_cuda=False, backend="stub", out_of_process=True)
+    transcriber.load()
+    yield transcriber
+    transcriber.close()
+
+def test_transcribes_in_worker_process(transcriber):
+    """Test that single and batched requests are served by the worker."""
+    assert transcriber.backend.pid != os.getpid()
+    assert transcriber.transcribe(np.zeros(3 * 16000, dtype=np.float32), 16000) == "stub stub stub"
+    # A longer batch grows the shared memory block
+    clips = [np.zeros(n * 16000, dtype=np.float32) for n in (1, 40, 2)]
+    assert transcriber.transcribe_batch(clips, 16000) == ["stub", " ".join(["stub"] * 40), "stub stub"]
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_worker_restarted_after_crash(transcriber):
+    """Test that a killed worker is replaced on the next request."""
+    pid = transcriber.backend.pid
+    os.kill(pid, signal.SIGKILL)
+    transcriber.backend._process.join(5)
+
+    assert transcriber.transcribe(np.zeros(2 * 16000, dtype=np.float32), 16000) == "stub stub"
+    assert transcriber.backend.restarts == 1
+    assert transcriber.backend.pid not in (None, pid)
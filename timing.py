@@ -0,0 +1,107 @@
+"""Timing helpers for Hotkey Dikte application.
+
+This module provides a small stage timer used to report where time is spent
+during startup and other multi-step operations. A timer can be activated for
+the current thread so that code deep in the call stack (backends, text output)
+can record stages without the timer being passed through every call.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+class StageTimer:
+    """Accumulate wall-clock durations of named stages in order.
+
+    Args:
+        started_at: perf_counter() value to measure elapsed time from.
+            Defaults to now.
+    """
+    def __init__(self, started_at: Optional[float] = None):
+        self.stages: Dict[str, float] = {}
+        self.started_at = time.perf_counter() if started_at is None else started_at
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as the named stage.
+
+        Args:
+            name: Stage name. Repeated stages are summed.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add a measured duration to the named stage.
+
+        Args:
+            name: Stage name.
+            seconds: Duration in seconds.
+        """
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the timer was created."""
+        return time.perf_counter() - self.started_at
+
+    def report(self, title: str) -> str:
+        """Format the stage durations as a single log line.
+
+        Args:
+            title: Prefix describing what was timed.
+
+        Returns:
+            Report such as 'Startup: config 0.010s | tray 0.120s | total 0.140s'.
+        """
+        parts = [f"{name} {seconds:.3f}s" for name, seconds in self.stages.items()]
+        parts.append(f"total {self.elapsed:.3f}s")
+        return f"{title}: " + " | ".join(parts)
+
+_active_timer: ContextVar[Optional[StageTimer]] = ContextVar("active_timer", default=None)
+
+@contextmanager
+def activate(timer: StageTimer) -> Iterator[StageTimer]:
+    """Make a timer the target of `stage` and `record` in this thread.
+
+    Args:
+        timer: Timer collecting the stages of the current operation.
+    """
+    token = _active_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _active_timer.reset(token)
+
+def active() -> Optional[StageTimer]:
+    """Return the timer activated in this thread, if any."""
+    return _active_timer.get()
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block on the active timer, if there is one.
+
+    Args:
+        name: Stage name.
+    """
+    timer = _active_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+def record(name: str, seconds: float) -> None:
+    """Add a duration to the active timer, if there is one.
+
+    Args:
+        name: Stage name.
+        seconds: Duration in seconds.
+    """
+    timer = _active_timer.get()
+    if timer is not None:
+        timer.add(name, seconds)
@@ -0,0 +1,533 @@
+"""Speech transcription for Hotkey Dikte application.
+
+This module provides the Transcriber used by the application, benchmarks and
+tools. It wraps an inference backend and does not depend on the audio device
+libraries, so it can run on machines without PortAudio.
+"""
+
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+from threading import Event, Lock, Thread
+import time
+import traceback
+from backends import create_backend
+from decoding import count_decode_passes, get_profile
+from features import MAX_FEATURE_SECONDS, MelStream
+from lifecycle import process_memory_mb
+from model_cache import ModelCache, estimate_memory_mb
+from preprocess import TARGET_SAMPLE_RATE, prepare_audio
+from streaming import StreamingSession, Word
+from timing import StageTimer
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+class Transcriber:
+    """Handles audio transcription using Whisper AI.
+
+    The speech recognition engine is an `InferenceBackend` chosen by name.
+    The model is not loaded on construction. Call `load` or `load_async`;
+    transcription calls made before the model is ready wait for it.
+
+    With `out_of_process`, the backend runs in a worker process and audio is
+    handed over through shared memory. With `daemon_url`, audio is sent to a
+    shared transcription daemon and no model is loaded locally.
+
+    Decoding follows a named profile from `decoding.DECODING_PROFILES`;
+    `decode_options` override individual settings of the profile.
+
+    `unload` frees the model's memory; the next transcription, or
+    `reload_async`, loads it again.
+
+    `switch_language` and `switch_model` change settings at runtime. Up to
+    `max_loaded_models` models within `max_models_memory_mb` stay loaded, so
+    switching back to a recently used model size does not reload it.
+
+    With `dynamic_context`, clips of up to 30 seconds are first decoded with
+    an encoder context sized to the audio plus `context_margin` seconds
+    instead of a full 30-second window, and again with the full window if
+    that result fails the quality checks.
+    """
+    def __init__(
+        self,
+        model_size: str,
+        language: str,
+        initial_prompt: str,
+        use_cuda: bool = True,
+        backend: str = "whisper",
+        compute_type: str = "auto",
+        cache_dir: Optional[Path] = None,
+        decode_options: Optional[Dict[str, Any]] = None,
+        profile: str = "standard",
+        out_of_process: bool = False,
+        daemon_url: Optional[str] = None,
+        daemon_timeout: float = 120.0,
+        dynamic_context: bool = False,
+        context_margin: float = 1.0,
+        cpu_threads: int = 0,
+        interop_threads: int = 0,
+        max_loaded_models: int = 1,
+        max_models_memory_mb: float = 0.0
+    ):
+        self.model_size = model_size
+        # Replaced as a whole by switch_language(), so a transcription reads
+        # a matching language and prompt without taking a lock
+        self._speech = (language, initial_prompt)
+        self.use_cuda = use_cuda
+        self.profile = profile
+        self.dynamic_context = dynamic_context
+        self.context_margin = context_margin
+        self.decode_options = {**get_profile(profile).options(), **(decode_options or {})}
+        self.daemon_url = daemon_url
+        self._backend_settings = dict(
+            backend=backend, use_cuda=use_cuda, compute_type=compute_type, cache_dir=cache_dir,
+            cpu_threads=cpu_threads, interop_threads=interop_threads, out_of_process=out_of_process,
+            daemon_timeout=daemon_timeout
+        )
+        self.backend = self._create_backend(model_size)
+        self.model_cache = ModelCache(max_loaded_models, max_models_memory_mb)
+        self.model_memory_mb = 0.0
+        self.is_loaded = False
+        self.ready = Event()
+        self.load_error: Optional[Exception] = None
+        self.evicted = False
+        self.last_used = time.monotonic()
+        self._load_lock = Lock()
+        self.load_timings = StageTimer()
+        # Whisper's decoder installs kv-cache hooks per call, so model calls
+        # from the pipeline worker and a streaming session must not overlap
+        self._model_lock = Lock()
+        self._mel_filters: Optional[np.ndarray] = None
+
+    @property
+    def language(self) -> str:
+        """Language code used for transcription."""
+        return self._speech[0]
+
+    @property
+    def initial_prompt(self) -> str:
+        """Prompt given to the model with every transcription."""
+        return self._speech[1]
+
+    def _create_backend(self, model_size: str):
+        """Create the configured kind of backend for a model size."""
+        settings = self._backend_settings
+        if self.daemon_url:
+            from daemon import DaemonBackend
+            return DaemonBackend(self.daemon_url, timeout=settings["daemon_timeout"])
+        kwargs = dict(
+            use_cuda=settings["use_cuda"], compute_type=settings["compute_type"], cache_dir=settings["cache_dir"],
+            cpu_threads=settings["cpu_threads"], interop_threads=settings["interop_threads"]
+        )
+        if settings["out_of_process"]:
+            from worker import ProcessBackend
+            return ProcessBackend(settings["backend"], model_size, **kwargs)
+        return create_backend(settings["backend"], model_size, **kwargs)
+
+    @classmethod
+    def from_config(cls, config, daemon_url: Optional[str] = None, daemon_timeout: float = 120.0) -> 'Transcriber':
+        """Create a transcriber from transcriber settings.
+
+        Args:
+            config: TranscriberConfig instance.
+            daemon_url: URL of a transcription daemon to use instead of a
+                local model.
+            daemon_timeout: Seconds to wait for the daemon.
+
+        Returns:
+            Transcriber with the configured backend, not loaded yet.
+        """
+        return cls(
+            model_size=config.model_size,
+            language=config.language,
+            initial_prompt=config.initial_prompt,
+            use_cuda=config.use_cuda,
+            backend=config.backend,
+            compute_type=config.compute_type,
+            cache_dir=config.cache_dir,
+            profile=config.decoding_profile,
+            out_of_process=config.out_of_process,
+            daemon_url=daemon_url,
+            daemon_timeout=daemon_timeout,
+            dynamic_context=config.dynamic_context,
+            context_margin=config.context_margin,
+            cpu_threads=config.cpu_threads,
+            interop_threads=config.interop_threads,
+            max_loaded_models=config.max_loaded_models,
+            max_models_memory_mb=config.max_models_memory_mb
+        )
+
+    def load(self) -> None:
+        """Import the inference engine and load the model.
+
+        Raises:
+            Exception: If the model cannot be loaded.
+        """
+        timer = StageTimer()
+        self.load_error = None
+        memory_before = process_memory_mb()
+        try:
+            self.backend.load(timer)
+            memory_after = process_memory_mb()
+            measured = memory_after - memory_before if memory_before is not None and memory_after is not None else 0.0
+            # A model in a worker process or on the GPU barely shows up here
+            self.model_memory_mb = measured if measured > 0 else estimate_memory_mb(self.model_size)
+            self.is_loaded = True
+        except Exception as e:
+            self.load_error = e
+            logger.error(f"Failed to initialize {self.backend.name} model: {e}")
+            logger.debug(traceback.format_exc())
+            raise
+        finally:
+            self.load_timings = timer
+            self.ready.set()
+
+    def load_async(self, callback: Optional[Callable[[bool], None]] = None) -> Thread:
+        """Load the model on a background thread.
+
+        Args:
+            callback: Called with True on success or False on failure.
+
+        Returns:
+            The loader thread.
+        """
+        def run():
+            try:
+                self.load()
+                success = True
+            except Exception:
+                success = False
+            if callback:
+                callback(success)
+
+        thread = Thread(target=run, name="model-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def unload(self) -> bool:
+        """Free the model's memory until it is needed again.
+
+        Waits for a running transcription to finish first.
+
+        Returns:
+            True if a loaded model was unloaded.
+        """
+        with self._load_lock, self._model_lock:
+            if not self.is_loaded:
+                return False
+            self.ready.clear()
+            self.is_loaded = False
+            self.backend.unload()
+            self.evicted = True
+        self.model_cache.clear()
+        return True
+
+    def switch_language(self, language: str, initial_prompt: str) -> None:
+        """Transcribe in another language from the next recording on.
+
+        Does not wait for a running transcription, which keeps the settings
+        it started with.
+
+        Args:
+            language: Language code.
+            initial_prompt: Prompt written in that language.
+        """
+        self._speech = (language, initial_prompt)
+        logger.info(f"Switched language to '{language}'")
+
+    def switch_model(self, model_size: str, callback: Optional[Callable[[bool], None]] = None) -> Optional[Thread]:
+        """Use another model size, keeping the current model in the cache.
+
+        The switch happens on a background thread once a running
+        transcription has finished, so the caller never waits for the model.
+        A cached model is used right away; otherwise the new model is loaded
+        and transcriptions wait for it.
+
+        Args:
+            model_size: Whisper model size name.
+            callback: Called with True on success or False on failure once
+                the switched model is ready.
+
+        Returns:
+            The switching thread, or None if the model is chosen by a
+            transcription daemon.
+        """
+        if self.daemon_url:
+            logger.warning("The model is chosen by the transcription daemon, not switching")
+            return None
+
+        def run():
+            success = self._switch_model(model_size)
+            if success is not None and callback:
+                callback(success)
+
+        thread = Thread(target=run, name="model-switch", daemon=True)
+        thread.start()
+        return thread
+
+    def _switch_model(self, model_size: str) -> Optional[bool]:
+        """Swap in another model size, loading it if it is not cached.
+
+        Returns:
+            True if the model is ready, False if loading it failed, None if
+            no switch was made.
+        """
+        with self._load_lock:
+            if model_size == self.model_size:
+                return None
+            if not self.ready.is_set() and not self.evicted:
+                logger.warning("Model is still loading, try switching again when it is ready")
+                return None
+            with self._model_lock:
+                previous = self.model_size
+                cached = self.model_cache.take(model_size)
+                if self.is_loaded:
+                    active_memory = cached[1] if cached is not None else estimate_memory_mb(model_size)
+                    self.model_cache.put(previous, self.backend, self.model_memory_mb, active_memory)
+                self.model_size = model_size
+                self._mel_filters = None
+                self.evicted = False
+                if cached is not None:
+                    self.backend, self.model_memory_mb = cached
+                    self.is_loaded = True
+                    self.ready.set()
+                else:
+                    self.backend = self._create_backend(model_size)
+                    self.is_loaded = False
+                    self.ready.clear()
+        if cached is not None:
+            logger.info(f"Switched model from '{previous}' to cached '{model_size}'")
+            return True
+        logger.info(f"Switching model from '{previous}' to '{model_size}', loading it")
+        try:
+            self.load()
+        except Exception:
+            return False
+        return True
+
+    def reload_async(self, callback: Optional[Callable[[bool], None]] = None) -> Optional[Thread]:
+        """Load an unloaded model again in the background.
+
+        Args:
+            callback: Called with True on success or False on failure.
+
+        Returns:
+            The loader thread, or None if the model was not unloaded or is
+            already being reloaded.
+        """
+        with self._load_lock:
+            if not self.evicted:
+                return None
+            self.evicted = False
+        return self.load_async(callback)
+
+    def _wait_for_model(self) -> bool:
+        """Block until the model has loaded, reloading it if it was unloaded.
+
+        Returns:
+            True if the model is usable, False if loading failed.
+        """
+        self.last_used = time.monotonic()
+        if not self.ready.is_set():
+            self.reload_async()
+            logger.info("Waiting for model to finish loading")
+            self.ready.wait()
+        return self.is_loaded
+
+    def feature_stream(self) -> Optional[MelStream]:
+        """Create a stream computing the loaded model's features during recording.
+
+        Returns:
+            A MelStream, or None if the model is not loaded or its backend
+            only accepts audio.
+        """
+        if not self.is_loaded:
+            return None
+        filters = self._model_filters()
+        return MelStream(filters) if filters is not None else None
+
+    def _model_filters(self) -> Optional[np.ndarray]:
+        """Mel filters of the loaded model, cached until the model is switched."""
+        if self._mel_filters is None:
+            self._mel_filters = self.backend.mel_filters()
+        return self._mel_filters
+
+    def transcribe(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        features: Optional[np.ndarray] = None
+    ) -> Optional[str]:
+        """Transcribe audio data to text.
+
+        Args:
+            audio_data: Audio data as numpy array, (frames,) or
+                (frames, channels). Converted to 16 kHz mono float32 if needed.
+            sample_rate: Sample rate of the audio.
+            features: Log-mel features of the audio computed in advance, see
+                `features.MelFeatures.for_speech`. Used for clips of up to 30
+                seconds; the model then skips its own feature extraction.
+
+        Returns:
+            Transcribed text if successful, None otherwise.
+        """
+        try:
+            duration = len(audio_data) / sample_rate
+            logger.debug(f"Processing audio: {duration:.2f} seconds")
+            audio_data = prepare_audio(audio_data, sample_rate)
+
+            if duration < 0.5:
+                logger.warning("Audio too short for transcription")
+                return None
+
+            if not self._wait_for_model():
+                logger.error("Model is not available")
+                return None
+
+            with self._model_lock:
+                result = self._run_model(audio_data, duration, features)
+
+            text = result.text
+            passes = count_decode_passes(result.segments, self._temperatures())
+            logger.info(
+                f"Transcription completed: {len(text)} characters, "
+                f"profile '{self.profile}', {passes} decode pass{'es' if passes != 1 else ''}"
+            )
+            return text
+
+        except Exception as e:
+            logger.error(f"Transcription error: {e}")
+            logger.debug(traceback.format_exc())
+            return None
+
+    def _run_model(self, audio: np.ndarray, duration: float, features: Optional[np.ndarray]):
+        """Transcribe prepared audio with the cheapest path the backend allows."""
+        language, initial_prompt = self._speech
+        options = dict(language=language, initial_prompt=initial_prompt, **self.decode_options)
+        if features is not None:
+            filters = self._model_filters()
+            if filters is None or len(filters) != len(features):
+                # Computed for the model in use before a switch_model()
+                logger.debug("Features do not match the model's mel bands, computing them again")
+                features = None
+        if duration > MAX_FEATURE_SECONDS:
+            return self.backend.transcribe(audio, **options)
+        if self.dynamic_context:
+            result = self.backend.transcribe_short(audio, features, self.context_margin, **options)
+            if result is not None:
+                return result
+            logger.debug("Shortened encoder context not used, decoding with full context")
+        if features is not None:
+            return self.backend.transcribe_features(features, duration, **options)
+        return self.backend.transcribe(audio, **options)
+
+    def transcribe_batch(
+        self,
+        audio_list: List[np.ndarray],
+        sample_rate: int,
+        batch_size: int = 16
+    ) -> List[Optional[str]]:
+        """Transcribe several recordings in batched model passes.
+
+        Args:
+            audio_list: Audio arrays, each (frames,) or (frames, channels).
+            sample_rate: Sample rate shared by all recordings.
+            batch_size: Maximum number of recordings per model pass.
+
+        Returns:
+            Text for each recording in input order, None where a recording
+            was too short or transcription failed.
+        """
+        texts: List[Optional[str]] = [None] * len(audio_list)
+        try:
+            prepared = [prepare_audio(audio, sample_rate) for audio in audio_list]
+            valid = [i for i, audio in enumerate(prepared) if len(audio) >= 0.5 * TARGET_SAMPLE_RATE]
+            if len(valid) < len(prepared):
+                logger.warning(f"{len(prepared) - len(valid)} recordings too short for transcription")
+            if not valid:
+                return texts
+            if not self._wait_for_model():
+                logger.error("Model is not available")
+                return texts
+
+            language, initial_prompt = self._speech
+            passes = 0
+            for start in range(0, len(valid), batch_size):
+                indices = valid[start:start + batch_size]
+                with self._model_lock:
+                    results = self.backend.transcribe_batch(
+                        [prepared[i] for i in indices],
+                        language=language,
+                        initial_prompt=initial_prompt,
+                        **self.decode_options
+                    )
+                for i, result in zip(indices, results):
+                    texts[i] = result.text
+                    passes += count_decode_passes(result.segments, self._temperatures())
+            logger.info(
+                f"Batch transcription completed: {len(valid)} recordings in batches of up to {batch_size}, "
+                f"profile '{self.profile}', {passes} decode passes"
+            )
+        except Exception as e:
+            logger.error(f"Batch transcription error: {e}")
+            logger.debug(traceback.format_exc())
+        return texts
+
+    def transcribe_words(self, audio_data: np.ndarray, sample_rate: int, prompt: str = "") -> List[Word]:
+        """Transcribe audio data to words with timestamps.
+
+        Args:
+            audio_data: Audio data as numpy array.
+            sample_rate: Sample rate of the audio.
+            prompt: Previously transcribed text to condition on.
+
+        Returns:
+            Words with times relative to the start of the audio.
+        """
+        language, initial_prompt = self._speech
+        initial_prompt = f"{initial_prompt} {prompt}".strip()
+        audio_data = prepare_audio(audio_data, sample_rate)
+        if not self._wait_for_model():
+            return []
+        with self._model_lock:
+            result = self.backend.transcribe(
+                audio_data,
+                language=language,
+                initial_prompt=initial_prompt,
+                word_timestamps=True,
+                **{**self.decode_options, "condition_on_previous_text": False}
+            )
+        return result.words
+
+    def _temperatures(self) -> List[float]:
+        """Fallback temperature ladder of the decoding settings."""
+        temperature = self.decode_options.get("temperature", (0.0,))
+        return list(temperature) if isinstance(temperature, (list, tuple)) else [temperature]
+
+    def close(self) -> None:
+        """Release the backend and cached models, stopping worker processes."""
+        self.model_cache.clear()
+        self.backend.close()
+
+    def start_streaming(
+        self,
+        get_audio: Callable[[], np.ndarray],
+        sample_rate: int,
+        step: float = 1.0,
+        max_window: float = 20.0
+    ) -> StreamingSession:
+        """Start decoding a recording while it is still being captured.
+
+        Args:
+            get_audio: Function returning the mono audio captured so far.
+            sample_rate: Sample rate of the audio.
+            step: Seconds of new audio between decoding passes.
+            max_window: Maximum seconds of uncommitted audio per pass.
+
+        Returns:
+            Running session. Call `finish` with the full recording at stop.
+        """
+        session = StreamingSession(self.transcribe_words, get_audio, sample_rate, step, max_window)
+        session.start()
+        return session
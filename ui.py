@@ -3,7 +3,7 @@
 This module handles the system tray icon and menu functionality.
 """
 
-from typing import Callable, Dict
+from typing import Callable, Dict, List, Sequence
 from PIL import Image, ImageDraw
 import pystray
 from threading import Event, Thread
@@ -15,12 +15,18 @@ class TrayIcon:
         self.status = "idle"
         self.hotkey = hotkey
         self.update_event = Event()
+        self._stats_provider: Callable[[], List[str]] = lambda: ["Belum ada data"]
+        # Choices per switchable setting: (options, current value, callback)
+        self._choices: Dict[str, tuple] = {}
         
         # Generate icon images
         self.images = {
             "idle": self._create_image("green"),
             "recording": self._create_image("red"),
-            "processing": self._create_image("yellow")
+            "processing": self._create_image("yellow"),
+            "loading": self._create_image("gray"),
+            "listening": self._create_image("blue"),
+            "unloaded": self._create_image("lightgray")
         }
         
         self._init_menu()
@@ -71,6 +77,18 @@ class TrayIcon:
                 lambda: None,
                 enabled=False
             ),
+            pystray.MenuItem(
+                "Bahasa",
+                pystray.Menu(lambda: self._choice_items("language"))
+            ),
+            pystray.MenuItem(
+                "Model",
+                pystray.Menu(lambda: self._choice_items("model"))
+            ),
+            pystray.MenuItem(
+                "Statistik",
+                pystray.Menu(self._stats_items)
+            ),
             pystray.Menu.SEPARATOR,
             pystray.MenuItem(
                 "Keluar",
@@ -78,6 +96,65 @@ class TrayIcon:
             )
         )
     
+    def _stats_items(self):
+        """Generate one disabled menu item per statistics line."""
+        for line in self._stats_provider():
+            yield pystray.MenuItem(line, lambda: None, enabled=False)
+
+    def _choice_items(self, setting: str):
+        """Generate one radio menu item per option of a switchable setting."""
+        if setting not in self._choices:
+            yield pystray.MenuItem("Tidak tersedia", lambda: None, enabled=False)
+            return
+        options, current, callback = self._choices[setting]
+        for option in options:
+            yield pystray.MenuItem(
+                option,
+                self._choice_action(callback, option),
+                checked=self._choice_checked(current, option),
+                radio=True
+            )
+
+    @staticmethod
+    def _choice_action(callback: Callable[[str], None], option: str):
+        """Menu action selecting an option; pystray passes (icon, item)."""
+        def action(icon, item):
+            callback(option)
+        return action
+
+    @staticmethod
+    def _choice_checked(current: Callable[[], str], option: str):
+        """Menu check state that is on while the option is selected."""
+        def checked(item):
+            return current() == option
+        return checked
+
+    def set_choices(
+        self,
+        setting: str,
+        options: Sequence[str],
+        current: Callable[[], str],
+        callback: Callable[[str], None]
+    ) -> None:
+        """Offer a setting that can be switched from the menu.
+
+        Args:
+            setting: 'language' or 'model'.
+            options: Values to choose from.
+            current: Returns the value in use.
+            callback: Called with the chosen value.
+        """
+        self._choices[setting] = (list(options), current, callback)
+
+    def set_stats_provider(self, provider: Callable[[], List[str]]) -> None:
+        """Set the source of the lines shown in the statistics submenu.
+
+        Args:
+            provider: Function returning the lines to display. Called each
+                time the menu is opened.
+        """
+        self._stats_provider = provider
+
     def set_exit_callback(self, callback: Callable[[], None]) -> None:
         """Set callback for exit menu item.
 
@@ -90,7 +167,8 @@ class TrayIcon:
         """Update tray icon status.
 
         Args:
-            status: New status to display ('idle', 'recording', or 'processing').
+            status: New status to display ('idle', 'recording', 'processing',
+                'loading', 'listening' or 'unloaded').
         """
         self.status = status
         if self.icon:
@@ -107,9 +185,9 @@ class TrayIcon:
         """Start the system tray icon."""
         self.icon = pystray.Icon(
             "hotkey_dikte",
-            icon=self.images["idle"],
+            icon=self.images[self.status],
             menu=self.menu,
-            title="Hotkey Dikte - Ready"
+            title="Hotkey Dikte - Ready" if self.status == "idle" else f"Hotkey Dikte - {self.status.capitalize()}"
         )
         self.icon.run()
 
@@ -0,0 +1,384 @@
+"""Voice activity detection for Hotkey Dikte application.
+
+This module trims silence from recordings before transcription. The default
+detector is a vectorized energy and zero-crossing-rate classifier; a local
+model such as WebRTC VAD can be plugged in instead. For hands-free dictation,
+an online segmenter splits the live input stream into utterances at pauses.
+"""
+
+import time
+import traceback
+from collections import deque
+from queue import SimpleQueue
+from threading import Lock, Thread
+from typing import Callable, Deque, List, Optional
+
+import numpy as np
+
+from logger import get_logger
+from preprocess import to_float32
+
+logger = get_logger(__name__)
+
+# Function taking (frames, sample_rate) with frames shaped (n_frames, frame_len)
+# and returning a boolean speech flag per frame
+SpeechDetector = Callable[[np.ndarray, int], np.ndarray]
+
+def frame_signal(audio: np.ndarray, frame_len: int) -> np.ndarray:
+    """Split audio into non-overlapping frames without copying.
+
+    Args:
+        audio: Mono audio as numpy array.
+        frame_len: Samples per frame. Trailing samples that do not fill a
+            frame are dropped.
+
+    Returns:
+        Array view shaped (n_frames, frame_len).
+    """
+    n_frames = len(audio) // frame_len
+    return audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+
+class EnergyDetector:
+    """Energy and zero-crossing-rate speech classifier.
+
+    A frame is speech when its level is well above the estimated noise floor,
+    or moderately above it with a high zero-crossing rate (unvoiced sounds
+    such as 's' and 'f' are quiet but noisy).
+
+    Args:
+        threshold_db: Minimum level above the noise floor for speech.
+        min_level_db: Absolute level in dBFS below which frames are silence.
+        zcr_threshold: Zero-crossing rate marking unvoiced speech.
+    """
+    def __init__(self, threshold_db: float = 12.0, min_level_db: float = -45.0, zcr_threshold: float = 0.25):
+        self.threshold_db = threshold_db
+        self.min_level_db = min_level_db
+        self.zcr_threshold = zcr_threshold
+
+    def __call__(self, frames: np.ndarray, sample_rate: int) -> np.ndarray:
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+        level_db = 20.0 * np.log10(rms + 1e-10)
+        noise_floor = np.percentile(level_db, 10)
+        # A clip that is speech from start to end has no silent frames to
+        # estimate the floor from, so never demand more than the peak allows
+        threshold = min(noise_floor + self.threshold_db, level_db.max() - self.threshold_db)
+        threshold = max(threshold, self.min_level_db)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+
+        voiced = level_db > threshold
+        unvoiced = (level_db > threshold - self.threshold_db / 2) & (zcr > self.zcr_threshold)
+        return voiced | unvoiced
+
+class WebRtcDetector:
+    """Speech classifier backed by the optional `webrtcvad` package.
+
+    Args:
+        aggressiveness: Filtering mode from 0 (least) to 3 (most aggressive).
+    """
+    def __init__(self, aggressiveness: int = 2):
+        import webrtcvad
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def __call__(self, frames: np.ndarray, sample_rate: int) -> np.ndarray:
+        pcm = (np.clip(frames, -1.0, 1.0) * 32767).astype(np.int16)
+        return np.array([self._vad.is_speech(frame.tobytes(), sample_rate) for frame in pcm], dtype=bool)
+
+class VoiceActivityDetector:
+    """Trim silence from recordings and detect clips without speech.
+
+    Args:
+        detector: Per-frame speech classifier. Defaults to EnergyDetector.
+        frame_ms: Frame length in milliseconds (10, 20 or 30 for WebRTC).
+        min_speech_ms: Shorter speech bursts are treated as noise.
+        padding_ms: Silence kept around each speech region.
+        max_pause_ms: Internal pauses are shortened to this length.
+    """
+    def __init__(
+        self,
+        detector: Optional[SpeechDetector] = None,
+        frame_ms: int = 30,
+        min_speech_ms: int = 90,
+        padding_ms: int = 200,
+        max_pause_ms: int = 600
+    ):
+        self.detector = detector or EnergyDetector()
+        self.frame_ms = frame_ms
+        self.min_speech_ms = min_speech_ms
+        self.padding_ms = padding_ms
+        self.max_pause_ms = max_pause_ms
+
+    def speech_mask(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Classify each frame of the audio as speech or silence.
+
+        Args:
+            audio: Mono audio as numpy array.
+            sample_rate: Sample rate of the audio.
+
+        Returns:
+            Boolean speech flag per frame, after removing short bursts and
+            padding speech regions.
+        """
+        frame_len = int(sample_rate * self.frame_ms / 1000)
+        frames = frame_signal(audio, frame_len)
+        if not len(frames):
+            return np.zeros(0, dtype=bool)
+        mask = np.asarray(self.detector(frames, sample_rate), dtype=bool)
+
+        # Drop speech runs shorter than min_speech_ms
+        min_frames = max(1, self.min_speech_ms // self.frame_ms)
+        starts, ends = _runs(mask)
+        for start, end in zip(starts, ends):
+            if end - start < min_frames:
+                mask[start:end] = False
+
+        # Pad speech regions on both sides
+        pad = self.padding_ms // self.frame_ms
+        if pad and mask.any():
+            kernel = np.ones(2 * pad + 1, dtype=int)
+            mask = np.convolve(mask.astype(int), kernel, mode="same") > 0
+        return mask
+
+    def process(self, audio: np.ndarray, sample_rate: int) -> Optional[np.ndarray]:
+        """Trim leading and trailing silence and shorten long pauses.
+
+        Args:
+            audio: Mono audio as numpy array.
+            sample_rate: Sample rate of the audio.
+
+        Returns:
+            Audio containing only speech regions and shortened pauses, or
+            None if the clip contains no speech.
+        """
+        keep = self.keep_mask(audio, sample_rate)
+        return None if keep is None else audio[keep]
+
+    def keep_mask(self, audio: np.ndarray, sample_rate: int) -> Optional[np.ndarray]:
+        """Select the samples that `process` keeps.
+
+        Args:
+            audio: Mono audio as numpy array.
+            sample_rate: Sample rate of the audio.
+
+        Returns:
+            Boolean flag per sample, or None if the clip contains no speech.
+        """
+        mask = self.speech_mask(audio, sample_rate)
+        if not mask.any():
+            return None
+
+        frame_len = int(sample_rate * self.frame_ms / 1000)
+        keep = mask.copy()
+        # Keep the first and last half of every long pause
+        max_pause = self.max_pause_ms // self.frame_ms
+        half = max_pause // 2
+        starts, ends = _runs(~mask)
+        for start, end in zip(starts, ends):
+            if start == 0 or end == len(mask):
+                continue
+            if end - start > max_pause:
+                keep[start:start + half] = True
+                keep[end - (max_pause - half):end] = True
+            else:
+                keep[start:end] = True
+
+        sample_keep = np.repeat(keep, frame_len)
+        # Samples after the last full frame follow the last frame's decision
+        if len(audio) > len(sample_keep):
+            sample_keep = np.concatenate([sample_keep, np.full(len(audio) - len(sample_keep), keep[-1])])
+        logger.debug(
+            f"VAD kept {np.count_nonzero(sample_keep) / sample_rate:.2f}s of {len(audio) / sample_rate:.2f}s "
+            f"({mask.mean():.0%} speech frames)"
+        )
+        return sample_keep
+
+class UtteranceSegmenter:
+    """Split a live audio stream into utterances at pauses.
+
+    Blocks from the audio callback are classified by their level against an
+    adaptive noise floor, which costs one RMS per block, so CPU use during
+    silence stays close to idle. An utterance starts after `min_speech_ms`
+    of speech and ends after `end_silence_ms` of silence, or when it reaches
+    `max_utterance_seconds`.
+
+    Between `start` and `stop` the audio callback only `push`es blocks;
+    classification and `on_utterance` run on the segmenter's own thread.
+
+    Args:
+        sample_rate: Sample rate of the stream.
+        on_utterance: Called with the utterance frames, shaped
+            (frames, channels), and the perf_counter() time speech ended.
+        threshold_db: Minimum level above the noise floor for speech.
+        min_level_db: Absolute level in dBFS below which blocks are silence.
+        min_speech_ms: Shorter speech bursts do not start an utterance.
+        padding_ms: Audio kept before the start of speech.
+        end_silence_ms: Pause length that ends an utterance.
+        max_utterance_seconds: Utterances are cut at this length.
+        floor_rise_db: Noise floor rise per second, so the floor follows
+            background noise that gets louder.
+    """
+    def __init__(
+        self,
+        sample_rate: int,
+        on_utterance: Callable[[np.ndarray, float], None],
+        threshold_db: float = 12.0,
+        min_level_db: float = -45.0,
+        min_speech_ms: int = 150,
+        padding_ms: int = 200,
+        end_silence_ms: int = 700,
+        max_utterance_seconds: float = 25.0,
+        floor_rise_db: float = 3.0
+    ):
+        self.sample_rate = sample_rate
+        self.on_utterance = on_utterance
+        self.threshold_db = threshold_db
+        self.min_level_db = min_level_db
+        self.min_speech = min_speech_ms / 1000
+        self.padding = padding_ms / 1000
+        self.end_silence = end_silence_ms / 1000
+        self.max_utterance = max_utterance_seconds
+        self.floor_rise_db = floor_rise_db
+        self.noise_floor_db: Optional[float] = None
+        self._lock = Lock()
+        self._preroll: Deque[np.ndarray] = deque()
+        self._preroll_seconds = 0.0
+        self._blocks: List[np.ndarray] = []
+        self._seconds = 0.0
+        self._speech_run = 0.0
+        self._silence = 0.0
+        self._block_time = 0.0
+        self._pending: SimpleQueue = SimpleQueue()
+        self._thread: Optional[Thread] = None
+        self.utterances = 0
+
+    @property
+    def in_utterance(self) -> bool:
+        """Whether speech is currently being collected."""
+        return bool(self._blocks)
+
+    def _is_speech(self, block: np.ndarray, duration: float) -> bool:
+        """Classify a block and update the noise floor."""
+        rms = np.sqrt(np.mean(np.square(to_float32(block), dtype=np.float64)))
+        level_db = 20.0 * np.log10(rms + 1e-10)
+        if self.noise_floor_db is None or level_db < self.noise_floor_db:
+            self.noise_floor_db = level_db
+        else:
+            self.noise_floor_db += self.floor_rise_db * duration
+        return level_db > max(self.noise_floor_db + self.threshold_db, self.min_level_db)
+
+    def start(self) -> None:
+        """Process pushed blocks on a background thread."""
+        self._thread = Thread(target=self._run, name="utterance-segmenter", daemon=True)
+        self._thread.start()
+
+    def push(self, block: np.ndarray) -> None:
+        """Queue a block for the segmenter thread; called from the audio callback.
+
+        Args:
+            block: Frames shaped (frames, channels), copied because the audio
+                driver reuses the buffer.
+        """
+        self._pending.put((block.copy(), time.perf_counter()))
+
+    def stop(self) -> None:
+        """Process the queued blocks, stop the thread and emit the utterance in progress."""
+        if self._thread:
+            self._pending.put(None)
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        """Feed queued blocks until stopped."""
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            try:
+                self.feed(*item)
+            except Exception as e:
+                logger.error(f"Error segmenting audio: {e}")
+                logger.debug(traceback.format_exc())
+
+    def feed(self, block: np.ndarray, arrived_at: Optional[float] = None) -> None:
+        """Process one block of the input stream.
+
+        Args:
+            block: Frames shaped (frames, channels). Copied if kept, so the
+                audio driver may reuse the buffer.
+            arrived_at: perf_counter() time the block was captured, now by
+                default.
+        """
+        duration = len(block) / self.sample_rate
+        with self._lock:
+            self._block_time = arrived_at if arrived_at is not None else time.perf_counter()
+            speech = self._is_speech(block, duration)
+            if not self._blocks:
+                self._preroll.append(block.copy())
+                self._preroll_seconds += duration
+                self._speech_run = self._speech_run + duration if speech else 0.0
+                if self._speech_run >= self.min_speech:
+                    self._blocks = list(self._preroll)
+                    self._seconds = self._preroll_seconds
+                    self._silence = 0.0
+                    self._preroll.clear()
+                    self._preroll_seconds = 0.0
+                    return
+                # Keep only the padding plus a possible speech onset
+                while self._preroll_seconds - len(self._preroll[0]) / self.sample_rate >= self.padding + self.min_speech:
+                    self._preroll_seconds -= len(self._preroll.popleft()) / self.sample_rate
+                return
+
+            self._blocks.append(block.copy())
+            self._seconds += duration
+            self._silence = 0.0 if speech else self._silence + duration
+            if self._silence >= self.end_silence or self._seconds >= self.max_utterance:
+                self._emit()
+
+    def flush(self) -> None:
+        """Emit the utterance in progress, if any."""
+        with self._lock:
+            if self._blocks:
+                self._emit()
+            self._preroll.clear()
+            self._preroll_seconds = 0.0
+            self._speech_run = 0.0
+
+    def _emit(self) -> None:
+        """Hand the collected utterance to the callback and reset."""
+        frames = np.concatenate(self._blocks)
+        # Keep only `padding` of the trailing pause
+        excess = int(max(0.0, self._silence - self.padding) * self.sample_rate)
+        if excess:
+            frames = frames[:len(frames) - excess]
+        ended_at = self._block_time - self._silence
+        self._blocks = []
+        self._seconds = 0.0
+        self._speech_run = 0.0
+        self.utterances += 1
+        logger.debug(f"Utterance {self.utterances}: {len(frames) / self.sample_rate:.2f}s")
+        self.on_utterance(frames, ended_at)
+
+def _runs(mask: np.ndarray):
+    """Return start and end indices of the True runs in a boolean array."""
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[::2], edges[1::2]
+
+def create_detector(backend: str = "energy") -> SpeechDetector:
+    """Create a per-frame speech classifier by name.
+
+    Args:
+        backend: 'energy' or 'webrtc'.
+
+    Returns:
+        Speech classifier. Falls back to the energy detector if the optional
+        model cannot be loaded.
+    """
+    if backend == "webrtc":
+        try:
+            return WebRtcDetector()
+        except Exception as e:
+            logger.warning(f"WebRTC VAD unavailable ({e}), using energy detector")
+    return EnergyDetector()
@@ -0,0 +1,270 @@
+"""Out-of-process inference for Hotkey Dikte application.
+
+This module runs an inference backend in a separate worker process, so
+Python-side decoding does not hold the GIL of the process that serves the
+audio callback, keyboard hook and tray icon. Audio is handed over through a
+`multiprocessing.shared_memory` block instead of being pickled; only the
+decoding options and the small result objects cross the pipe. A worker that
+crashes or runs out of memory is restarted and the request retried once.
+"""
+
+import multiprocessing
+import traceback
+from multiprocessing import shared_memory
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import timing
+from backends import InferenceBackend, TranscriptionResult, create_backend
+from timing import StageTimer
+from logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+def _worker_main(
+    conn,
+    backend_name: str,
+    model_size: str,
+    use_cuda: bool,
+    compute_type: str,
+    cache_dir,
+    cpu_threads: int = 0,
+    interop_threads: int = 0
+) -> None:
+    """Load a backend and serve transcription requests until told to stop.
+
+    Requests are tuples of (method, shared memory name, clip lengths,
+    keyword arguments); clips lie back to back in the shared memory block.
+    Replies are tuples of (status, payload, stage timings).
+    """
+    # Log to stderr only, the parent owns the log file
+    setup_logging()
+    backend = create_backend(
+        backend_name,
+        model_size,
+        use_cuda=use_cuda,
+        compute_type=compute_type,
+        cache_dir=cache_dir,
+        cpu_threads=cpu_threads,
+        interop_threads=interop_threads
+    )
+    timer = StageTimer()
+    try:
+        backend.load(timer)
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}", timer.stages))
+        return
+    conn.send(("ok", (backend.device, backend.compute_type), timer.stages))
+
+    shm: Optional[shared_memory.SharedMemory] = None
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        method, shm_name, lengths, kwargs = request
+        if shm is None or shm.name != shm_name:
+            if shm is not None:
+                shm.close()
+            shm = shared_memory.SharedMemory(name=shm_name)
+
+        timer = StageTimer()
+        audios = []
+        try:
+            offset = 0
+            for length in lengths:
+                audios.append(np.ndarray((length,), dtype=np.float32, buffer=shm.buf, offset=offset))
+                offset += length * 4
+            with timing.activate(timer):
+                if method == "transcribe":
+                    result = backend.transcribe(audios[0], **kwargs)
+                else:
+                    result = backend.transcribe_batch(audios, **kwargs)
+            reply = ("ok", result, timer.stages)
+        except MemoryError:
+            reply = ("memory", "out of memory", timer.stages)
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}\n{traceback.format_exc()}", timer.stages)
+        # Views must be released before the block can be closed
+        del audios
+        conn.send(reply)
+
+    if shm is not None:
+        shm.close()
+
+class ProcessBackend(InferenceBackend):
+    """Proxy that runs another backend in a worker process.
+
+    Args:
+        backend: Name of the backend to run in the worker.
+        model_size: Whisper model size name.
+        use_cuda: Use the GPU when available.
+        compute_type: Numeric precision, or 'auto' to pick per device.
+        cache_dir: Directory for converted model files.
+        cpu_threads: Threads used inside one CPU operation, 0 for default.
+        interop_threads: Threads running CPU operations in parallel, 0 for
+            default.
+        poll_interval: Seconds between worker liveness checks while waiting.
+    """
+    def __init__(
+        self,
+        backend: str,
+        model_size: str,
+        use_cuda: bool = True,
+        compute_type: str = "auto",
+        cache_dir=None,
+        cpu_threads: int = 0,
+        interop_threads: int = 0,
+        poll_interval: float = 0.5
+    ):
+        super().__init__(
+            model_size,
+            use_cuda=use_cuda,
+            compute_type=compute_type,
+            cache_dir=cache_dir,
+            cpu_threads=cpu_threads,
+            interop_threads=interop_threads
+        )
+        self.name = f"{backend} (worker process)"
+        self.backend_name = backend
+        self.requested_compute_type = compute_type
+        self.poll_interval = poll_interval
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._lock = Lock()
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Process id of the running worker, if any."""
+        return self._process.pid if self._process is not None and self._process.is_alive() else None
+
+    def load(self, timer: StageTimer) -> None:
+        with self._lock:
+            self._start_worker(timer)
+
+    def _start_worker(self, timer: StageTimer) -> None:
+        """Start a worker process and wait until its model is loaded."""
+        self._stop_worker()
+        parent_conn, child_conn = self._context.Pipe()
+        with timer.stage("start worker"):
+            self._process = self._context.Process(
+                target=_worker_main,
+                args=(child_conn, self.backend_name, self.model_size, self.use_cuda,
+                      self.requested_compute_type, self.cache_dir, self.cpu_threads, self.interop_threads),
+                name="transcription-worker",
+                daemon=True
+            )
+            self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+        reply = self._receive()
+        if reply is None:
+            raise RuntimeError(f"Transcription worker exited with code {self._process.exitcode} while loading")
+        status, payload, stages = reply
+        for name, seconds in stages.items():
+            timer.add(name, seconds)
+        if status != "ok":
+            raise RuntimeError(f"Transcription worker failed to load the model: {payload}")
+        self.device, self.compute_type = payload
+        logger.info(f"Transcription worker {self._process.pid} ready ({self.device}, {self.compute_type})")
+
+    def _stop_worker(self, timeout: float = 5.0) -> None:
+        """Ask the worker to exit, terminating it if it does not."""
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            try:
+                self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout)
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def _receive(self) -> Optional[Tuple[str, Any, Dict[str, float]]]:
+        """Wait for a reply, or return None if the worker died."""
+        while not self._conn.poll(self.poll_interval):
+            if not self._process.is_alive():
+                break
+        try:
+            return self._conn.recv() if self._conn.poll() else None
+        except (EOFError, OSError):
+            return None
+
+    def _write_audio(self, audios: List[np.ndarray]) -> List[int]:
+        """Copy clips back to back into the shared memory block."""
+        lengths = [len(audio) for audio in audios]
+        size = max(sum(lengths) * 4, 1)
+        if self._shm is None or self._shm.size < size:
+            capacity = size
+            if self._shm is not None:
+                # Grow geometrically so longer recordings rarely reallocate
+                capacity = max(size, 2 * self._shm.size)
+                self._shm.close()
+                self._shm.unlink()
+            self._shm = shared_memory.SharedMemory(create=True, size=capacity)
+        offset = 0
+        for audio in audios:
+            np.ndarray((len(audio),), dtype=np.float32, buffer=self._shm.buf, offset=offset)[:] = audio
+            offset += len(audio) * 4
+        return lengths
+
+    def _call(self, method: str, audios: List[np.ndarray], kwargs: Dict[str, Any]):
+        """Run a request in the worker, restarting it once if it dies."""
+        with self._lock:
+            for attempt in range(2):
+                if self._process is None or not self._process.is_alive():
+                    self._restart("is not running")
+                with timing.stage("worker.handoff"):
+                    lengths = self._write_audio(audios)
+                self._conn.send((method, self._shm.name, lengths, kwargs))
+                reply = self._receive()
+                if reply is None:
+                    self._restart(f"exited with code {self._process.exitcode}")
+                    continue
+                status, payload, stages = reply
+                for name, seconds in stages.items():
+                    timing.record(name, seconds)
+                if status == "ok":
+                    return payload
+                if status == "memory":
+                    self._restart("ran out of memory")
+                    continue
+                raise RuntimeError(f"Transcription worker error: {payload}")
+            raise RuntimeError("Transcription worker failed twice on the same request")
+
+    def _restart(self, reason: str) -> None:
+        """Replace a dead or broken worker with a fresh one."""
+        self.restarts += 1
+        logger.warning(f"Transcription worker {reason}, restarting (restart {self.restarts})")
+        timer = StageTimer()
+        self._start_worker(timer)
+        logger.info(timer.report("Worker restart"))
+
+    def transcribe(self, audio, language, initial_prompt, word_timestamps=False, **options) -> TranscriptionResult:
+        kwargs = dict(options, language=language, initial_prompt=initial_prompt, word_timestamps=word_timestamps)
+        return self._call("transcribe", [np.ascontiguousarray(audio, dtype=np.float32)], kwargs)
+
+    def transcribe_batch(self, audios, language, initial_prompt, **options) -> List[TranscriptionResult]:
+        kwargs = dict(options, language=language, initial_prompt=initial_prompt)
+        return self._call("transcribe_batch", [np.asarray(audio, dtype=np.float32) for audio in audios], kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop_worker()
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None